@@ -1,9 +1,19 @@
 from fastapi import FastAPI,HTTPException
 from pydantic import BaseModel
+import json
 import os
-from git import Repo
+import time
 from backend.db.data import user_repo_db
 from backend.db.repo_queries import get_repo_by_url, insert_repo
+from backend.agents.cloner.git_ops import GitError, run_git, head_commit, has_commit, objects_size
+from backend.agents.cloner.mirror_cache import CLONE_USE_MIRROR, get_mirror_cache
+from backend.agents.cloner.repo_retention import get_repo_retention
+from backend.utils.repo_locks import RepoBusy, get_repo_locks
+
+# Defaults for requests that don't set Depth / Filter / SparsePaths
+CLONE_DEPTH = int(os.getenv("CLONE_DEPTH", "0"))                # 0 = full history
+CLONE_FILTER = os.getenv("CLONE_FILTER", "blob:none")           # partial clone filter, "" = fetch every blob up front
+CLONE_SPARSE_PATHS = [p for p in os.getenv("CLONE_SPARSE_PATHS", "").split(",") if p]
 
 app=FastAPI()
 
@@ -12,10 +22,129 @@ class RepoModal(BaseModel):
     BranchName:str
     AuthToken:str|None=None
     ProjName:str
+    Commit:str|None=None              # exact commit to check out (default: tip of BranchName)
+    Depth:int|None=None               # shallow clone/fetch depth, 0 = full history
+    Filter:str|None=None              # e.g. "blob:none" (only used when cloning), "" = no filter
+    SparsePaths:list[str]|None=None   # cone-mode sparse checkout directories, [] = whole tree
+    Checkout:bool=True                # False: only fetch into the shared mirror, parse straight from its objects
+
+
+def _fetch_commit(repository:RepoModal, path:str, depth:int, timing:dict):
+    # not reachable from the fetched branch tip (older than `depth`, or on another ref): ask for it by id
+    if repository.Commit and not has_commit(path, repository.Commit):
+        args = ["fetch", "--no-tags"] + (["--depth", str(depth)] if depth else []) + ["origin", repository.Commit]
+        timing["fetch_commit_ms"] = run_git(args, cwd=path)["elapsed_ms"]
+
+
+def _clone(repository:RepoModal, path:str, depth:int, filter_spec:str, timing:dict):
+    args = ["clone", "--no-checkout", "--single-branch", "--branch", repository.BranchName]
+    if depth:
+        args += ["--depth", str(depth)]
+    if filter_spec:
+        args.append(f"--filter={filter_spec}")
+    timing["clone_ms"] = run_git(args + [repository.projUrl, path])["elapsed_ms"]
+    _fetch_commit(repository, path, depth, timing)
+
+
+def _update(repository:RepoModal, path:str, depth:int, timing:dict):
+    # only the target branch; other branches and tags are never downloaded
+    branch = repository.BranchName
+    args = ["fetch", "--no-tags", "--prune"] + (["--depth", str(depth)] if depth else [])
+    timing["fetch_ms"] = run_git(args + ["origin", f"+refs/heads/{branch}:refs/remotes/origin/{branch}"], cwd=path)["elapsed_ms"]
+    _fetch_commit(repository, path, depth, timing)
+
+
+def _sparse_enabled(path:str) -> bool:
+    try:
+        return run_git(["config", "--bool", "core.sparseCheckout"], cwd=path)["stdout"].strip() == "true"
+    except GitError:
+        return False  # unset
+
+
+def _checkout(path:str, target:str, branch:str|None, sparse_paths:list[str], timing:dict):
+    started = time.perf_counter()
+    if sparse_paths:
+        run_git(["sparse-checkout", "set", "--cone", *sparse_paths], cwd=path)
+    elif _sparse_enabled(path):
+        run_git(["sparse-checkout", "disable"], cwd=path)
+
+    # --force drops local edits, so no separate reset --hard is needed
+    # blobless clones download the blobs of the checked-out tree here
+    if branch:
+        run_git(["checkout", "--force", "-B", branch, target], cwd=path)
+    else:
+        run_git(["checkout", "--force", "--detach", target], cwd=path)
+    run_git(["clean", "-fd"], cwd=path)
+    timing["checkout_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _sync_worktree(repository:RepoModal, path:str, depth:int, filter_spec:str, sparse_paths:list[str], timing:dict) -> dict:
+    # checkout = detached worktree of the shared bare mirror of projUrl
+    mirrors = get_mirror_cache()
+    mirror = mirrors.mirror_path(repository.projUrl)
+    with mirrors.lock(repository.projUrl) as wait_ms:
+        timing["mirror_lock_wait_ms"] = wait_ms
+        size_before = mirrors.size(mirror) if os.path.isdir(mirror) else 0
+        info = mirrors.ensure(repository.projUrl, repository.BranchName, depth, filter_spec, repository.Commit)
+        timing["fetch_ms"] = info["fetch_ms"]
+        operation = "worktree-update" if os.path.exists(path) else "worktree-add"
+        if operation == "worktree-add":
+            mirrors.add_worktree(mirror, path, info["target"])
+        # worktrees stay detached: a branch can only be checked out in one worktree at a time
+        _checkout(path, info["target"], None, sparse_paths, timing)
+        received = max(0, mirrors.size(mirror) - size_before)
+    return {"operation": operation, "received": received, "mirror": {"path": mirror, "created": info["created"]}}
+
+
+def _sync_mirror_only(repository:RepoModal, depth:int, filter_spec:str, timing:dict) -> dict:
+    # no working tree at all: parsers read the commit's blobs from the mirror (see GitCommitSource)
+    mirrors = get_mirror_cache()
+    mirror = mirrors.mirror_path(repository.projUrl)
+    with mirrors.lock(repository.projUrl) as wait_ms:
+        timing["mirror_lock_wait_ms"] = wait_ms
+        size_before = mirrors.size(mirror) if os.path.isdir(mirror) else 0
+        info = mirrors.ensure(repository.projUrl, repository.BranchName, depth, filter_spec, repository.Commit)
+        timing["fetch_ms"] = info["fetch_ms"]
+        received = max(0, mirrors.size(mirror) - size_before)
+    return {"operation": "mirror-fetch", "received": received, "commit": info["target"], "path": mirror,
+            "mirror": {"path": mirror, "created": info["created"]}}
+
+
+def _sync_standalone(repository:RepoModal, path:str, depth:int, filter_spec:str, sparse_paths:list[str], timing:dict) -> dict:
+    # checkout with its own object database (CLONE_USE_MIRROR=0, or a checkout made before mirrors existed)
+    if not os.path.exists(path):
+        operation = "clone"
+        size_before = 0
+        _clone(repository, path, depth, filter_spec, timing)
+    else:
+        operation = "fetch"
+        size_before = objects_size(os.path.join(path, ".git", "objects"))
+        _update(repository, path, depth, timing)
+    if repository.Commit:
+        _checkout(path, repository.Commit, None, sparse_paths, timing)
+    else:
+        _checkout(path, f"refs/remotes/origin/{repository.BranchName}", repository.BranchName, sparse_paths, timing)
+    received = max(0, objects_size(os.path.join(path, ".git", "objects")) - size_before)
+    return {"operation": operation, "received": received, "mirror": None}
 
 ##CLONE OR PULL
 @app.post("/getRepo")
 def fetchRepo(repository: RepoModal):
+    # identical concurrent requests share one git operation; different ones for the same project queue on its lock
+    key = json.dumps(repository.model_dump(), sort_keys=True)
+    started = time.perf_counter()
+    try:
+        response, coalesced = get_repo_locks().single_flight(("getRepo", key), lambda: _fetch_repo(repository))
+    except RepoBusy as e:
+        raise HTTPException(status_code=409, detail=f"Repository {repository.ProjName} is busy: {e}")
+    if coalesced:
+        waited = round((time.perf_counter() - started) * 1000, 1)
+        print(f"[CloneAgent] Shared an in-flight fetch of {repository.ProjName} after {waited} ms")
+        response = {**response, "coalesced": True, "timing": {**response["timing"], "coalesced_wait_ms": waited}}
+    return response
+
+
+def _fetch_repo(repository: RepoModal):
     BASE_DIR = os.path.abspath(
         os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..")
     )
@@ -25,39 +154,96 @@ def fetchRepo(repository: RepoModal):
     path = os.path.join(basePath, repository.ProjName)
     # Check if repo already exists in DB
     existing = get_repo_by_url(repository.projUrl)
-    # Clone or pull repo
-    try:
-        if not os.path.exists(path):
-            Repo.clone_from(repository.projUrl, path)
+    depth = CLONE_DEPTH if repository.Depth is None else repository.Depth
+    filter_spec = CLONE_FILTER if repository.Filter is None else repository.Filter
+    sparse_paths = CLONE_SPARSE_PATHS if repository.SparsePaths is None else repository.SparsePaths
+    timing = {}
+    started = time.perf_counter()
+    # Fetch the target branch (into the shared mirror, or the checkout's own repo), then check out the exact commit
+    checkout = repository.Checkout or not CLONE_USE_MIRROR
+    # exclusive: nothing may parse or delete the checkout while it is being rewritten
+    with get_repo_locks().write(repository.ProjName) as wait_ms:
+        timing["lock_wait_ms"] = wait_ms
+        try:
+            use_mirror = CLONE_USE_MIRROR and (
+                not os.path.exists(path)
+                or get_mirror_cache().is_worktree_of(path, get_mirror_cache().mirror_path(repository.projUrl))
+            )
+            if not checkout:
+                sync = _sync_mirror_only(repository, depth, filter_spec, timing)
+                path = sync["path"]
+                commit = run_git(["rev-parse", f"{sync['commit']}^{{commit}}"], cwd=path)["stdout"].strip()
+            elif use_mirror:
+                sync = _sync_worktree(repository, path, depth, filter_spec, sparse_paths, timing)
+                commit = head_commit(path)
+            else:
+                sync = _sync_standalone(repository, path, depth, filter_spec, sparse_paths, timing)
+                commit = head_commit(path)
+        except GitError as e:
+            raise HTTPException(status_code=400, detail=f"Git operation failed: {str(e)}")
+        timing["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        print(f"[CloneAgent] {sync['operation']} {repository.ProjName} @ {commit[:12]} in {timing['total_ms']} ms, {sync['received']} bytes received")
+        git_report = {
+            "operation": sync["operation"],
+            "commit": commit,
+            "timing": timing,
+            "bytes_transferred": sync["received"],
+            "coalesced": False,
+            "mirror": sync["mirror"],
+            "options": {"depth": depth, "filter": filter_spec or None, "sparse_paths": sparse_paths, "checkout": checkout},
+        }
+        # Insert only if not exists
+        doesExists=False #flag to check if already exists in supabase
+        if len(existing.data) == 0:
+            insert_repo(
+                proj_name=repository.ProjName,
+                repo_url=repository.projUrl,
+                branch=repository.BranchName,
+                auth_token=repository.AuthToken
+            )
         else:
-            repo_obj = Repo(path)
-            repo_obj.git.reset("--hard")
-            repo_obj.git.clean("-fd")
-            repo_obj.remotes.origin.pull()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Git operation failed: {str(e)}")
-    # Insert only if not exists
-    doesExists=False #flag to check if already exists in supabase
-    if len(existing.data) == 0:
-        insert_repo(
-            proj_name=repository.ProjName,
-            repo_url=repository.projUrl,
-            branch=repository.BranchName,
-            auth_token=repository.AuthToken
-        )
-    else:
-        print("Repo already exists in Supabase, skipping insert.")
-        doesExists=True
-
-    #Store in-memory for parser
-    user_repo_db[repository.ProjName] = {
-        "local_path": path,
-        "repo_url": repository.projUrl,
-        "branch": repository.BranchName,
-        "auth_token": repository.AuthToken
-    }
-    if not doesExists:
-        print(f"[Memory] Saved {repository.ProjName} in user_repo_db")
-        return {"message": "Project cloned & stored in supabase successfully"}
-    else:
-        return {"message": "Project pulled & already exists in Supabase"}
\ No newline at end of file
+            print("Repo already exists in Supabase, skipping insert.")
+            doesExists=True
+
+        #Store in-memory for parser (without a checkout, local_path is the shared mirror: parse it with parse_commit, never delete it)
+        user_repo_db[repository.ProjName] = {
+            "local_path": path,
+            "repo_url": repository.projUrl,
+            "branch": repository.BranchName,
+            "auth_token": repository.AuthToken,
+            "commit": commit,
+            "checkout": checkout,
+            "sparse_paths": sparse_paths
+        }
+        get_repo_retention().touch(repository.ProjName, path, measure=True)
+        if not doesExists:
+            print(f"[Memory] Saved {repository.ProjName} in user_repo_db")
+            response = {"message": "Project cloned & stored in supabase successfully", **git_report}
+        else:
+            response = {"message": "Project pulled & already exists in Supabase", **git_report}
+
+    # the checkout stays for the next incremental fetch; cold ones are reclaimed when over quota
+    get_repo_retention().enforce(keep={repository.ProjName})
+    return response
+
+
+##SHARED MIRRORS
+@app.get("/mirrors")
+def listMirrors():
+    return {"enabled": CLONE_USE_MIRROR, "mirrors": get_mirror_cache().stats()}
+
+##IN-FLIGHT GIT WORK
+@app.get("/repo-locks")
+def listRepoLocks():
+    return get_repo_locks().stats()
+
+
+##CHECKOUT RETENTION
+@app.get("/repo-retention")
+def listRetainedRepos():
+    return get_repo_retention().stats()
+
+
+@app.post("/repo-retention/enforce")
+def enforceRetention():
+    return get_repo_retention().enforce()
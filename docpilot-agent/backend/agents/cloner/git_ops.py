@@ -0,0 +1,65 @@
+import os
+import subprocess
+import time
+
+GIT_TIMEOUT = int(os.getenv("GIT_TIMEOUT", "1800"))
+
+
+class GitError(Exception):
+    pass
+
+
+def run_git(args: list[str], cwd: str | None = None, timeout: int | None = None) -> dict:
+    """Run one git command. Returns {"stdout", "stderr", "elapsed_ms"}; raises GitError on failure."""
+    started = time.perf_counter()
+    # never fall back to an interactive credential prompt inside a worker
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    try:
+        proc = subprocess.run(["git", *args], cwd=cwd, env=env, capture_output=True, text=True,
+                              timeout=timeout or GIT_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        raise GitError(f"git {args[0]} timed out after {timeout or GIT_TIMEOUT}s")
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    if proc.returncode != 0:
+        raise GitError(f"git {args[0]} failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+    return {
+        "stdout": proc.stdout,
+        "stderr": proc.stderr,
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+def objects_size(objects_dir: str) -> int:
+    """
+    Bytes in a repository's object store (`.git/objects`, or `objects` of a bare repo). The growth across a clone/fetch/
+    checkout is what came over the wire: received packs are kept as-is and
+    small fetches are stored as compressed loose objects. It also counts the
+    blobs a partial clone fetches lazily during checkout, which git's
+    progress output does not report.
+    """
+    total = 0
+    stack = [objects_dir]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
+def head_commit(repo_path: str) -> str:
+    return run_git(["rev-parse", "HEAD"], cwd=repo_path)["stdout"].strip()
+
+
+def has_commit(repo_path: str, commit: str) -> bool:
+    try:
+        run_git(["cat-file", "-e", f"{commit}^{{commit}}"], cwd=repo_path)
+        return True
+    except GitError:
+        return False
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import re
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from backend.agents.cloner.git_ops import GitError, run_git, has_commit, objects_size
+from backend.utils.repo_locks import get_repo_locks
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+CLONE_USE_MIRROR = os.getenv("CLONE_USE_MIRROR", "1") == "1"
+MIRROR_DIR = os.getenv("MIRROR_DIR", os.path.join(BASE_DIR, ".cache", "mirrors"))
+
+
+def normalize_url(url: str) -> str:
+    """Remote URL identity: no credentials, lower-case host, no trailing "/" or ".git"."""
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme and parts.netloc:
+        host = parts.hostname.lower() if parts.hostname else ""
+        if parts.port:
+            host += f":{parts.port}"
+        url = urlunsplit((parts.scheme.lower(), host, parts.path, "", ""))
+    url = url.rstrip("/")
+    return url[:-4] if url.endswith(".git") else url
+
+
+class MirrorCache:
+    """
+    One bare repository per upstream (keyed by normalized remote URL) under
+    MIRROR_DIR. Projects and branches of the same upstream share its object
+    database: each checkout in UserRepos is a `git worktree` of the mirror,
+    detached at the commit it was asked for, so a second import only fetches
+    what the mirror does not have yet.
+
+    Branches are fetched on demand (refs/heads/<branch> only, no tags); a
+    mirror created with a partial-clone filter stays a promisor repo, and
+    blobs missing at checkout time are fetched into the mirror.
+    """
+
+    def __init__(self, mirror_dir: str | None = None):
+        self.mirror_dir = mirror_dir or MIRROR_DIR
+        os.makedirs(self.mirror_dir, exist_ok=True)
+
+    def mirror_path(self, url: str) -> str:
+        normalized = normalize_url(url)
+        name = re.sub(r"[^\w.-]", "_", normalized.rsplit("/", 1)[-1])[:40] or "repo"
+        return os.path.join(self.mirror_dir, f"{name}-{hashlib.sha256(normalized.encode()).hexdigest()[:16]}.git")
+
+    def lock(self, url: str):
+        # git writes into a mirror (fetch, worktree add) are serialized per upstream; yields the wait in ms
+        return get_repo_locks().write(f"mirror:{normalize_url(url)}")
+
+    def ensure(self, url: str, branch: str, depth: int = 0, filter_spec: str = "", commit: str | None = None) -> dict:
+        """
+        Create the mirror if needed and fetch `branch` (and `commit`, if the
+        branch does not contain it). Returns {"path", "created", "target",
+        "fetch_ms"}, where target is the commit to check out.
+        """
+        path = self.mirror_path(url)
+        created = not os.path.isdir(path)
+        if created:
+            run_git(["init", "--quiet", "--bare", path])
+            # no default refspec: only the branches we ask for are ever fetched
+            run_git(["config", "remote.origin.url", url], cwd=path)
+        elif run_git(["config", "remote.origin.url"], cwd=path)["stdout"].strip() != url:
+            # same upstream, different spelling (credentials, ".git" suffix...): fetch from the latest one
+            run_git(["config", "remote.origin.url", url], cwd=path)
+
+        # the filter can only be chosen by the first fetch (also after a first fetch that failed)
+        empty = created or not run_git(["for-each-ref", "--count=1"], cwd=path)["stdout"].strip()
+        args = ["fetch", "--no-tags", "--prune"]
+        if depth:
+            args += ["--depth", str(depth)]
+        if empty and filter_spec:
+            args.append(f"--filter={filter_spec}")
+        result = run_git(args + ["origin", f"+refs/heads/{branch}:refs/heads/{branch}"], cwd=path)
+        fetch_ms = result["elapsed_ms"]
+
+        if commit and not has_commit(path, commit):
+            args = ["fetch", "--no-tags"] + (["--depth", str(depth)] if depth else []) + ["origin", commit]
+            fetch_ms += run_git(args, cwd=path)["elapsed_ms"]
+
+        target = commit or run_git(["rev-parse", f"refs/heads/{branch}"], cwd=path)["stdout"].strip()
+        return {"path": path, "created": created, "target": target, "fetch_ms": round(fetch_ms, 1)}
+
+    def add_worktree(self, mirror: str, worktree: str, target: str):
+        # drop registrations of worktrees whose directory was deleted by hand
+        run_git(["worktree", "prune"], cwd=mirror)
+        run_git(["worktree", "add", "--force", "--detach", "--no-checkout", worktree, target], cwd=mirror)
+
+    @staticmethod
+    def is_worktree_of(worktree: str, mirror: str) -> bool:
+        dot_git = os.path.join(worktree, ".git")
+        if not os.path.isfile(dot_git):
+            return False
+        with open(dot_git, encoding="utf-8") as f:
+            gitdir = f.read().strip().removeprefix("gitdir:").strip()
+        return os.path.abspath(gitdir).startswith(os.path.abspath(mirror) + os.sep)
+
+    def size(self, mirror: str) -> int:
+        return objects_size(os.path.join(mirror, "objects"))
+
+    def stats(self) -> list[dict]:
+        mirrors = []
+        for entry in sorted(os.listdir(self.mirror_dir)):
+            path = os.path.join(self.mirror_dir, entry)
+            if not entry.endswith(".git") or not os.path.isdir(path):
+                continue
+            try:
+                url = run_git(["config", "remote.origin.url"], cwd=path)["stdout"].strip()
+                worktrees = run_git(["worktree", "list", "--porcelain"], cwd=path)["stdout"].count("worktree ") - 1
+            except GitError:
+                url, worktrees = None, 0
+            mirrors.append({
+                "path": path,
+                "url": normalize_url(url) if url else None,
+                "objects_bytes": self.size(path),
+                "worktrees": worktrees,
+                "updated": os.path.getmtime(os.path.join(path, "FETCH_HEAD")) if os.path.exists(os.path.join(path, "FETCH_HEAD")) else None,
+            })
+        return mirrors
+
+
+_mirror_cache = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror_cache() -> MirrorCache:
+    global _mirror_cache
+    if _mirror_cache is None:
+        with _mirror_lock:
+            if _mirror_cache is None:
+                _mirror_cache = MirrorCache()
+    return _mirror_cache
@@ -0,0 +1,222 @@
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+
+from backend.agents.cloner.git_ops import GitError, run_git
+from backend.db.data import user_repo_db
+from backend.utils.repo_locks import RepoBusy, get_repo_locks
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+USER_REPOS_DIR = os.path.join(BASE_DIR, "UserRepos")
+RETENTION_DB_PATH = os.getenv("RETENTION_DB_PATH", os.path.join(BASE_DIR, ".cache", "retention", "checkouts.sqlite3"))
+# Disk quota for all checkouts in UserRepos (shared mirrors are not counted), 0 = unlimited
+REPO_RETENTION_MAX_BYTES = int(os.getenv("REPO_RETENTION_MAX_BYTES", str(5 * 1024 ** 3)))
+# Most checkouts kept at once, 0 = unlimited
+REPO_RETENTION_MAX_REPOS = int(os.getenv("REPO_RETENTION_MAX_REPOS", "0"))
+# Checkouts used more recently than this are never evicted, even over quota
+REPO_RETENTION_MIN_IDLE = float(os.getenv("REPO_RETENTION_MIN_IDLE", "600"))
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def _remove_readonly(func, path, excinfo):
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+class RepoRetention:
+    """
+    Keeps UserRepos checkouts around between imports so the next commit is
+    an incremental fetch instead of a full clone, within a disk quota.
+
+    Every fetch and parse records a last-access time; fetches also record
+    the checkout's size on disk. enforce() evicts the least recently used
+    checkouts until the total is under REPO_RETENTION_MAX_BYTES (and
+    REPO_RETENTION_MAX_REPOS). Checkouts that are in use (their repo lock is
+    held) or were used in the last REPO_RETENTION_MIN_IDLE seconds are left
+    alone. Directories in UserRepos that were never recorded (e.g. from
+    before a restart) are picked up with their mtime as last access.
+    """
+
+    def __init__(self, db_path: str | None = None, repos_dir: str | None = None):
+        self.path = db_path or RETENTION_DB_PATH
+        self.repos_dir = repos_dir or USER_REPOS_DIR
+        self._local = threading.local()
+        self._lock = threading.Lock()  # one enforce() at a time
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkouts ("
+                " project TEXT PRIMARY KEY,"
+                " path TEXT NOT NULL,"
+                " size_bytes INTEGER,"
+                " last_access REAL NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _managed(self, path: str) -> bool:
+        # Checkout=False entries point at the shared mirror, which is not ours to evict
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.repos_dir)
+
+    # ------------------ Access tracking ------------------
+    def touch(self, project: str, path: str, measure: bool = False):
+        """Record an access; with `measure` (after a fetch) also the checkout's size."""
+        if not self._managed(path):
+            return
+        now = time.time()
+        size = dir_size(path) if measure else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO checkouts (project, path, size_bytes, last_access, created) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(project) DO UPDATE SET path = excluded.path, last_access = excluded.last_access,"
+                " size_bytes = COALESCE(excluded.size_bytes, checkouts.size_bytes)",
+                (project, os.path.abspath(path), size, now, now),
+            )
+
+    def forget(self, project: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM checkouts WHERE project = ?", (project,))
+
+    def _scan(self):
+        """Sync the table with what is actually in UserRepos."""
+        present = {}
+        if os.path.isdir(self.repos_dir):
+            for entry in os.scandir(self.repos_dir):
+                if entry.is_dir(follow_symlinks=False):
+                    present[entry.name] = entry.path
+
+        conn = self._connect()
+        rows = {r["project"]: r for r in conn.execute("SELECT project, path, size_bytes FROM checkouts")}
+        with conn:
+            for project, row in rows.items():
+                if not os.path.isdir(row["path"]):
+                    conn.execute("DELETE FROM checkouts WHERE project = ?", (project,))
+            for name, path in present.items():
+                if name not in rows:
+                    mtime = os.path.getmtime(path)
+                    conn.execute(
+                        "INSERT OR IGNORE INTO checkouts (project, path, size_bytes, last_access, created) VALUES (?, ?, ?, ?, ?)",
+                        (name, os.path.abspath(path), dir_size(path), mtime, mtime),
+                    )
+                elif rows[name]["size_bytes"] is None:
+                    conn.execute("UPDATE checkouts SET size_bytes = ? WHERE project = ?", (dir_size(path), name))
+
+    def list(self) -> list[dict]:
+        rows = self._connect().execute("SELECT * FROM checkouts ORDER BY last_access DESC").fetchall()
+        return [dict(r) for r in rows]
+
+    # ------------------ Eviction ------------------
+    def _evict(self, project: str, path: str):
+        entry = user_repo_db.get(project)
+        # a worktree is removed through its mirror so the mirror forgets it too
+        try:
+            with open(os.path.join(path, ".git"), encoding="utf-8") as f:
+                gitdir = f.read().strip().removeprefix("gitdir:").strip()
+            mirror = os.path.dirname(os.path.dirname(gitdir))  # <mirror>/worktrees/<name>
+        except OSError:
+            mirror = None  # standalone clone (.git is a directory)
+        if mirror:
+            try:
+                run_git(["worktree", "remove", "--force", "--force", path], cwd=mirror)
+            except GitError as e:
+                print(f"[Retention] worktree remove failed for {path}, deleting it instead: {e}")
+        if os.path.exists(path):
+            shutil.rmtree(path, onerror=_remove_readonly)
+            if mirror:
+                run_git(["worktree", "prune"], cwd=mirror)
+
+        if entry is not None and os.path.abspath(entry.get("local_path", "")) == path:
+            if mirror and entry.get("commit"):
+                # still parseable straight from the mirror's objects (see GitCommitSource)
+                user_repo_db[project] = {**entry, "local_path": mirror, "checkout": False}
+            else:
+                del user_repo_db[project]
+        self.forget(project)
+
+    def enforce(self, keep: set[str] | None = None) -> dict:
+        """Evict least recently used checkouts until the quota holds; `keep` are never evicted."""
+        keep = keep or set()
+        with self._lock:
+            self._scan()
+            rows = self.list()
+            total = sum(r["size_bytes"] or 0 for r in rows)
+            count = len(rows)
+            evicted = []
+            now = time.time()
+            for row in reversed(rows):  # oldest access first
+                over_bytes = REPO_RETENTION_MAX_BYTES and total > REPO_RETENTION_MAX_BYTES
+                over_count = REPO_RETENTION_MAX_REPOS and count > REPO_RETENTION_MAX_REPOS
+                if not (over_bytes or over_count):
+                    break
+                if row["project"] in keep or now - row["last_access"] < REPO_RETENTION_MIN_IDLE:
+                    continue
+                try:
+                    # skip checkouts that are being fetched or parsed right now
+                    with get_repo_locks().write(row["project"], timeout=0):
+                        self._evict(row["project"], row["path"])
+                except RepoBusy:
+                    continue
+                except (OSError, GitError) as e:
+                    print(f"[Retention] Could not evict {row['project']}: {e}")
+                    continue
+                total -= row["size_bytes"] or 0
+                count -= 1
+                evicted.append(row["project"])
+                print(f"[Retention] Evicted {row['project']} ({row['size_bytes'] or 0} bytes, idle {round(now - row['last_access'])} s)")
+
+        return {"evicted": evicted, "total_bytes": total, "checkouts": count}
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._scan()
+            rows = self.list()
+        return {
+            "max_bytes": REPO_RETENTION_MAX_BYTES,
+            "max_repos": REPO_RETENTION_MAX_REPOS,
+            "min_idle": REPO_RETENTION_MIN_IDLE,
+            "total_bytes": sum(r["size_bytes"] or 0 for r in rows),
+            "checkouts": rows,
+        }
+
+
+_retention = None
+_retention_lock = threading.Lock()
+
+
+def get_repo_retention() -> RepoRetention:
+    global _retention
+    if _retention is None:
+        with _retention_lock:
+            if _retention is None:
+                _retention = RepoRetention()
+    return _retention
@@ -1,22 +1,26 @@
 import os
-def generate_tree(root_dir: str, prefix: str = "") -> list[str]:
-    entries = sorted(
-        e for e in os.listdir(root_dir)
-        if e not in {".git", "__pycache__"}
-    )
+from backend.utils.repo_walker import RepoWalker
+
+TREE_SKIP_DIRS = {".git", "__pycache__"}
+
+
+def generate_tree(root_dir: str, prefix: str = "", walker: RepoWalker | None = None,
+                  rel_dir: str = "", rules=None) -> list[str]:
+    # one scandir per directory; .gitignore'd entries are neither listed nor descended into
+    walker = walker or RepoWalker(root_dir, skip_dirs=TREE_SKIP_DIRS)
+    entries, child_rules = walker.list_dir(rel_dir, rules)
 
     lines = []
 
     for i, entry in enumerate(entries):
-        path = os.path.join(root_dir, entry)
         is_last = i == len(entries) - 1
 
         connector = "└── " if is_last else "├── "
-        lines.append(prefix + connector + entry)
+        lines.append(prefix + connector + entry.name)
 
-        if os.path.isdir(path):
+        if entry.is_dir:
             extension = "    " if is_last else "│   "
-            lines.extend(generate_tree(path, prefix + extension))
+            lines.extend(generate_tree(root_dir, prefix + extension, walker, entry.rel_path, child_rules))
 
     return lines
 
@@ -1,95 +1,46 @@
-from openai import OpenAI
 from dotenv import load_dotenv
-from backend.agents.kg_builder.Kg_reader import dataRetrive as kg_dataRetrive
+from starlette.concurrency import run_in_threadpool
+from backend.agents.kg_builder.Kg_reader import get_project_graph
+from backend.agents.docgen.map_reduce import HierarchicalDocGenerator
+from backend.agents.docgen.doc_store import DocStore
 import os
-import re
 
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    base_url="https://openrouter.ai/api/v1"
-)
+# Reuse module summaries / sections whose KG inputs did not change since the last run
+DOCGEN_INCREMENTAL = os.getenv("DOCGEN_INCREMENTAL", "1") == "1"
+doc_store = DocStore() if DOCGEN_INCREMENTAL else None
 
-def  generate_docs(projName:str):
-    data=kg_dataRetrive(projName)
-    prompt=f"""
-You are a senior software engineer and technical documentation expert.
+def  generate_docs(projName:str, bypass_cache:bool=False):
+    """
+    README for the project, built map-reduce style from its KG (see
+    HierarchicalDocGenerator). Returns {"markdown", "sections", "summaries",
+    "stats", "incremental"}, where "incremental" lists reused vs regenerated
+    modules and sections.
+    `bypass_cache` forces fresh model answers (which then replace the cached ones).
+    """
+    graph=get_project_graph(projName)
+    print(f"[DocGen] Loaded KG for {projName} in {graph['query_ms']} ms: {graph['counts']}")
 
-Your task is to generate a CLEAN, PROFESSIONAL, and FRAMEWORK-AGNOSTIC
-README.md file using the provided knowledge graph data extracted from source code.
+    result=HierarchicalDocGenerator(projName, bypass_cache=bypass_cache, store=doc_store).generate(graph["files"])
+    print(f"[DocGen] Generated docs for {projName}: {result['stats']}")
 
-STRICT RULES:
-1. Output ONLY valid GitHub-flavored Markdown.
-2. Do NOT mention specific programming languages or frameworks explicitly.
-3. Do NOT include raw AST data, internal IDs, or database-specific details.
-4. Use clean, relative file paths (remove repository root prefixes).
-5. Do NOT list getters/setters or trivial utility methods.
-6. Summarize functionality based on architectural roles and behavior.
-7. Keep content concise, readable, and suitable for open-source repositories.
+    return result
 
-README STRUCTURE (MUST FOLLOW EXACTLY):
 
-# {projName}
+async def stream_docs(projName:str, bypass_cache:bool=False):
+    """Streaming generate_docs: yields (event, data) pairs, see HierarchicalDocGenerator.astream."""
+    # the KG read is a blocking driver call; keep it off the event loop
+    graph=await run_in_threadpool(get_project_graph, projName)
+    yield "start", {"project": projName, "heading": f"# {projName}", "kg": graph["counts"]}
 
-## Overview
-Describe the purpose of the project in 2–3 sentences, focusing on functionality.
+    generator=HierarchicalDocGenerator(projName, bypass_cache=bypass_cache, store=doc_store)
+    async for event, data in generator.astream(graph["files"]):
+        yield event, data
 
-## Architecture Overview
-Explain the high-level architectural pattern and separation of concerns.
 
-## Project Structure
-Describe major directories and their responsibilities without listing every file.
 
-## Core Components
-Summarize the responsibilities of key components:
-- Entry point / bootstrap module
-- Controllers / handlers
-- Services / business logic layer
-- Data models
-- Persistence / repositories
-- Test modules
 
-## Application Flow
-Explain how a typical request or operation moves through the system.
 
-## Running the Project
-Provide generic, stack-agnostic steps to run the application.
-
-## Testing
-Describe how tests are organized and their purpose.
-
-## Notes
-Include any important architectural or design observations.
-
-
-INPUT DATA (DO NOT REPEAT THIS IN OUTPUT):
-{data}
-
-Now generate the documentation.
-"""
-    result=client.chat.completions.create(
-    model="tngtech/deepseek-r1t-chimera:free",
-    messages=[
-        {"role":"user","content":prompt}
-    ],
-    extra_body={"reasoning":{"enabled":True}}
-
-
-    )
-    content= result.choices[0].message.content
-
-    clean_content=re.sub(r'^```markdown\n|```$', '', content, flags=re.MULTILINE).strip()
-
-    clean_content=clean_content.replace("\\n","\n")
-
-    print(clean_content)
-
-    return clean_content
-
-
-
-
-
-# print(kg_dataRetrive("emp"))
+# print(generate_docs("emp")["markdown"])
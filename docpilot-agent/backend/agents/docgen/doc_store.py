@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+DOCGEN_STORE_DIR = os.getenv("DOCGEN_STORE_DIR", os.path.join(BASE_DIR, ".cache", "docs"))
+
+
+class DocStore:
+    """
+    Generated documentation fragments of each project: module summaries
+    (kind "module", name = directory path) and README sections (kind
+    "section", name = section title).
+
+    Every fragment is stored with the hash of the inputs that produced it
+    (KG subgraph + prompt version + model); `get` only returns it while the
+    caller's hash still matches, so stale text is never reused. One row per
+    fragment: a regenerated fragment replaces the old one.
+    """
+
+    def __init__(self, store_dir: str | None = None):
+        self.store_dir = store_dir or DOCGEN_STORE_DIR
+        self.path = os.path.join(self.store_dir, "docs.sqlite3")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fragments ("
+                " project TEXT NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " input_hash TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " updated REAL NOT NULL,"
+                " PRIMARY KEY (project, kind, name))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, project: str, kind: str, name: str, input_hash: str) -> str | None:
+        row = self._connect().execute(
+            "SELECT text FROM fragments WHERE project = ? AND kind = ? AND name = ? AND input_hash = ?",
+            (project, kind, name, input_hash)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, project: str, kind: str, name: str, input_hash: str, text: str):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fragments(project, kind, name, input_hash, text, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (project, kind, name, input_hash, text, time.time())
+            )
+
+    def delete_project(self, project: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM fragments WHERE project = ?", (project,))
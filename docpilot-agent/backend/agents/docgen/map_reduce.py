@@ -0,0 +1,451 @@
+import asyncio
+import hashlib
+import os
+import time
+
+from openai import AsyncOpenAI
+from services.llm_engine.response_cache import get_response_cache
+from .doc_store import DocStore
+from .postprocess import clean_markdown, MarkdownStreamCleaner
+
+BASE_URL = "https://openrouter.ai/api/v1"
+# Part of every stored fragment's input hash: bump when a prompt or the digest format changes
+PROMPT_VERSION = "2"
+DOCGEN_MODEL = os.getenv("DOCGEN_MODEL", "tngtech/deepseek-r1t-chimera:free")
+# Module / package summaries are short and numerous; a faster model can be used for them
+DOCGEN_SUMMARY_MODEL = os.getenv("DOCGEN_SUMMARY_MODEL", DOCGEN_MODEL)
+DOCGEN_CONCURRENCY = int(os.getenv("DOCGEN_CONCURRENCY", "8"))
+# Upper bound on the input packed into a single summary prompt
+DOCGEN_CHUNK_TOKENS = int(os.getenv("DOCGEN_CHUNK_TOKENS", "6000"))
+
+# README layout: (section title, what the section must cover, summaries it is written from).
+# "project" is the root summary, "modules" the top-level package summaries; a section is only
+# regenerated when one of the summaries it uses changes.
+SECTIONS = [
+    ("Overview", "Describe the purpose of the project in 2–3 sentences, focusing on functionality.",
+     ("project",)),
+    ("Architecture Overview", "Explain the high-level architectural pattern and separation of concerns.",
+     ("project", "modules")),
+    ("Project Structure", "Describe major directories and their responsibilities without listing every file.",
+     ("modules",)),
+    ("Core Components", "Summarize the responsibilities of key components: entry point / bootstrap module, "
+                        "controllers / handlers, services / business logic layer, data models, "
+                        "persistence / repositories, test modules.",
+     ("modules",)),
+    ("Application Flow", "Explain how a typical request or operation moves through the system.",
+     ("project", "modules")),
+    ("Running the Project", "Provide generic, stack-agnostic steps to run the application.",
+     ("project",)),
+    ("Testing", "Describe how tests are organized and their purpose.",
+     ("modules",)),
+    ("Notes", "Include any important architectural or design observations.",
+     ("project", "modules")),
+]
+
+STYLE_RULES = """STRICT RULES:
+1. Output ONLY valid GitHub-flavored Markdown.
+2. Do NOT mention specific programming languages or frameworks explicitly.
+3. Do NOT include raw AST data, internal IDs, or database-specific details.
+4. Use clean, relative file paths.
+5. Do NOT list getters/setters or trivial utility methods.
+6. Summarize functionality based on architectural roles and behavior.
+7. Keep content concise, readable, and suitable for open-source repositories."""
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def file_digest(f: dict) -> str:
+    """Compact text form of one file's KG entry (much cheaper than JSON in a prompt)."""
+    lines = [f"file {f.get('filePath')}"]
+    for c in f.get("classes") or []:
+        methods = [m["name"] for m in c.get("methods") or []]
+        line = f"  {c.get('kind') or 'class'} {c['name']}"
+        if methods:
+            line += ": " + ", ".join(methods)
+        lines.append(line)
+        for m in c.get("methods") or []:
+            if m.get("calls"):
+                lines.append(f"    {m['name']} -> " + ", ".join(_call_name(t) for t in m["calls"]))
+    functions = f.get("functions") or []
+    if functions:
+        lines.append("  functions: " + ", ".join(fn["name"] for fn in functions))
+        for fn in functions:
+            if fn.get("calls"):
+                lines.append(f"    {fn['name']} -> " + ", ".join(_call_name(t) for t in fn["calls"]))
+    return "\n".join(lines)
+
+
+def _hash(*parts: str) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p.encode("utf-8", errors="surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _call_name(target: dict) -> str:
+    return f"{target['parentClass']}.{target['name']}" if target.get("parentClass") else target["name"]
+
+
+# ------------------ Module tree ------------------
+class _Dir:
+    def __init__(self, path: str):
+        self.path = path
+        self.files = []
+        self.children = {}
+        self.subgraph_hash = None
+
+    @property
+    def depth(self) -> int:
+        return 1 + max((c.depth for c in self.children.values()), default=0)
+
+
+def build_tree(files: list[dict]) -> _Dir:
+    root = _Dir("")
+    for f in files:
+        parts = (f.get("filePath") or "").split("/")
+        node = root
+        for part in parts[:-1]:
+            path = f"{node.path}/{part}" if node.path else part
+            node = node.children.setdefault(part, _Dir(path))
+        node.files.append(f)
+    return root
+
+
+def hash_subgraphs(node: _Dir) -> str:
+    """Bottom-up hash of every directory's KG subgraph (its file digests and its subdirectories' hashes)."""
+    parts = [file_digest(f) for f in sorted(node.files, key=lambda f: f.get("filePath") or "")]
+    parts += [f"{name}={hash_subgraphs(child)}" for name, child in sorted(node.children.items())]
+    node.subgraph_hash = _hash(node.path, *parts)
+    return node.subgraph_hash
+
+
+# ------------------ Generator ------------------
+class HierarchicalDocGenerator:
+    """
+    Map-reduce README generation over the project's directory tree.
+
+    Map: every directory is summarized from compact digests of its own files
+    plus the summaries of its subdirectories; siblings run concurrently, so
+    the number of sequential model round trips follows the depth of the
+    tree, not the number of files. Inputs bigger than `chunk_tokens` are
+    split and summarized in parts first.
+
+    Reduce: the README sections are composed concurrently, each from the
+    root summary and/or the top-level package summaries (see SECTIONS).
+
+    Every call goes through the shared LLM response cache; at most
+    `concurrency` calls are in flight.
+
+    Incremental: with a DocStore, each module summary is stored under the
+    hash of its KG subgraph and each section under the hash of the summaries it
+    is written from (both including PROMPT_VERSION and the model). A directory whose subgraph
+    hash is unchanged is reused without visiting anything below it, so only
+    changed modules, their ancestors and sections whose inputs moved are
+    regenerated. `bypass_cache` regenerates everything.
+
+    `astream` is the streaming variant: it yields (event, data) pairs for
+    module progress and then the sections in README order, token by token,
+    while all sections are still generated concurrently.
+    """
+
+    def __init__(self, project: str, model: str | None = None, summary_model: str | None = None,
+                 concurrency: int | None = None, chunk_tokens: int | None = None, bypass_cache: bool = False,
+                 store: DocStore | None = None):
+        self.project = project
+        self.model = model or DOCGEN_MODEL
+        self.summary_model = summary_model or DOCGEN_SUMMARY_MODEL
+        self.concurrency = max(1, concurrency or DOCGEN_CONCURRENCY)
+        self.chunk_tokens = chunk_tokens or DOCGEN_CHUNK_TOKENS
+        self.bypass_cache = bypass_cache
+        self.store = store
+        self.summaries = {}
+        self.stats = {"llm_calls": 0, "summaries": 0, "chunked": 0}
+        self.report = {
+            "modules": {"reused": [], "regenerated": []},
+            "sections": {"reused": [], "regenerated": []},
+        }
+        self._client = None
+        self._semaphore = None
+        self._on_module = None
+
+    # ------------------ Model calls ------------------
+    async def _complete(self, model: str, prompt: str) -> str:
+        async def call():
+            async with self._semaphore:
+                self.stats["llm_calls"] += 1
+                result = await self._client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    extra_body={"reasoning": {"enabled": True}}
+                )
+            return result.choices[0].message.content
+
+        content = await get_response_cache().aget_or_call(
+            model, prompt, call, bypass=self.bypass_cache, validate=bool, reasoning=True
+        )
+        return clean_markdown(content)
+
+    async def _stream(self, model: str, prompt: str, on_token) -> str:
+        """Like _complete, but passes cleaned text to `on_token` as it arrives."""
+        cache = get_response_cache()
+        key, cached = cache.lookup(model, prompt, bypass=self.bypass_cache, reasoning=True)
+        if cached is not None:
+            text = clean_markdown(cached)
+            on_token(text)
+            return text
+
+        cleaner = MarkdownStreamCleaner()
+        raw = []
+        async with self._semaphore:
+            self.stats["llm_calls"] += 1
+            stream = await self._client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                extra_body={"reasoning": {"enabled": True}},
+                stream=True
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    raw.append(delta)
+                    text = cleaner.feed(delta)
+                    if text:
+                        on_token(text)
+        tail = cleaner.flush()
+        if tail:
+            on_token(tail)
+
+        content = "".join(raw)
+        if content:
+            cache.put(key, model, content)
+        return clean_markdown(content)
+
+    async def _summarize(self, label: str, parts: list[str]) -> str:
+        prompt = f"""
+You are a senior software engineer documenting the project "{self.project}".
+Below is structural data for {label}: files with their classes, methods and call edges,
+and/or summaries of its sub-parts.
+
+Write a plain-text summary of at most 120 words covering its responsibilities, its key
+components and how it interacts with the rest of the project. No headings, no lists of
+every file, no language or framework names.
+
+{chr(10).join(parts)}
+"""
+        self.stats["summaries"] += 1
+        return await self._complete(self.summary_model, prompt)
+
+    async def _fit(self, label: str, parts: list[str]) -> list[str]:
+        """Summarize groups of parts until they fit in one prompt."""
+        while sum(_estimate_tokens(p) for p in parts) > self.chunk_tokens and len(parts) > 1:
+            groups, current, used = [], [], 0
+            for p in parts:
+                cost = _estimate_tokens(p)
+                if current and used + cost > self.chunk_tokens:
+                    groups.append(current)
+                    current, used = [], 0
+                current.append(p)
+                used += cost
+            groups.append(current)
+            self.stats["chunked"] += len(groups)
+            parts = await asyncio.gather(*(
+                self._summarize(f"part {i + 1} of {label}", g) for i, g in enumerate(groups)
+            ))
+        return list(parts)
+
+    # ------------------ Stored fragments ------------------
+    def _module_key(self, node: _Dir) -> str:
+        return _hash(PROMPT_VERSION, self.summary_model, str(self.chunk_tokens), self.project, node.subgraph_hash)
+
+    def _stored(self, kind: str, name: str, key: str) -> str | None:
+        if self.store is None or self.bypass_cache:
+            return None
+        return self.store.get(self.project, kind, name, key)
+
+    def _save(self, kind: str, name: str, key: str, text: str):
+        if self.store is not None:
+            self.store.put(self.project, kind, name, key, text)
+
+    def _module_event(self, name: str, status: str):
+        if self._on_module is not None:
+            self._on_module(name, status)
+
+    # ------------------ Map ------------------
+    async def _summarize_dir(self, node: _Dir) -> str | None:
+        name = node.path or "."
+        key = self._module_key(node)
+        stored = self._stored("module", name, key)
+        if stored is not None:
+            # unchanged subgraph: nothing below this directory needs a visit
+            self.report["modules"]["reused"].append(name)
+            self._module_event(name, "reused")
+            self.summaries[name] = stored
+            return stored or None
+
+        child_results = await asyncio.gather(*(self._summarize_dir(c) for c in node.children.values()))
+        children = [(c, s) for c, s in zip(node.children.values(), child_results) if s]
+
+        if not node.files and not children:
+            self._save("module", name, key, "")
+            return None
+        if not node.files and len(children) == 1 and node.path:
+            # pass-through directory (e.g. src/main/java/...): reuse the only child's summary
+            summary = children[0][1]
+        else:
+            label = f"the directory `{node.path or '.'}`"
+            parts = [file_digest(f) for f in node.files]
+            parts += [f"subdirectory {c.path}: {s}" for c, s in children]
+            summary = await self._summarize(label, await self._fit(label, parts))
+            self.report["modules"]["regenerated"].append(name)
+            self._module_event(name, "regenerated")
+
+        self.summaries[name] = summary
+        self._save("module", name, key, summary)
+        return summary
+
+    # ------------------ Reduce ------------------
+    async def _compose_section(self, title: str, instruction: str, context: str, on_token=None) -> str:
+        key = _hash(PROMPT_VERSION, self.model, self.project, title, instruction, context)
+        stored = self._stored("section", title, key)
+        if stored is not None:
+            self.report["sections"]["reused"].append(title)
+            if on_token is not None:
+                on_token(stored)
+            return stored
+
+        prompt = f"""
+You are a senior software engineer and technical documentation expert writing the README
+of the project "{self.project}" from summaries of its modules.
+
+{STYLE_RULES}
+
+Write ONLY the body of the "## {title}" section (do not repeat the heading).
+{instruction}
+
+MODULE SUMMARIES (DO NOT REPEAT THIS IN OUTPUT):
+{context}
+"""
+        if on_token is None:
+            body = await self._complete(self.model, prompt)
+        else:
+            body = await self._stream(self.model, prompt, on_token)
+        self.report["sections"]["regenerated"].append(title)
+        self._save("section", title, key, body)
+        return body
+
+    def _section_inputs(self, root: _Dir) -> dict[str, list[str]]:
+        """The summary lines sections are written from, by SECTIONS scope."""
+        modules = []
+        for child in root.children.values():
+            # a reused root was not descended into; its packages' summaries are in the store
+            summary = self.summaries.get(child.path)
+            if summary is None:
+                summary = self._stored("module", child.path, self._module_key(child))
+            if summary:
+                modules.append(f"{child.path}: {summary}")
+        return {"project": [f"project: {self.summaries.get('.', '')}"], "modules": modules}
+
+    @staticmethod
+    def _section_context(inputs: dict[str, list[str]], uses: tuple[str, ...]) -> str:
+        return "\n".join(line for scope in uses for line in inputs[scope])
+
+    async def agenerate(self, files: list[dict]) -> dict:
+        started = time.perf_counter()
+        self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=BASE_URL)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            root = build_tree(files)
+            hash_subgraphs(root)
+            await self._summarize_dir(root)
+            map_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            inputs = self._section_inputs(root)
+            bodies = await asyncio.gather(*(self._compose_section(t, i, self._section_context(inputs, u))
+                                            for t, i, u in SECTIONS))
+        finally:
+            await self._client.close()
+
+        return self._result(root, started, map_ms, bodies)
+
+    def _result(self, root: _Dir, started: float, map_ms: float, bodies: list[str]) -> dict:
+        sections = {title: body for (title, _, _), body in zip(SECTIONS, bodies)}
+        markdown = f"# {self.project}\n\n" + "\n\n".join(f"## {t}\n\n{b}" for t, b in sections.items())
+        self.stats.update({
+            "tree_depth": root.depth,
+            "map_ms": map_ms,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+        print(f"[DocGen] {self.project}: modules reused {len(self.report['modules']['reused'])}, "
+              f"regenerated {len(self.report['modules']['regenerated'])}; sections reused "
+              f"{len(self.report['sections']['reused'])}, regenerated {len(self.report['sections']['regenerated'])}")
+        return {"markdown": markdown, "sections": sections, "summaries": self.summaries, "stats": self.stats,
+                "incremental": self.report}
+
+    async def astream(self, files: list[dict]):
+        """
+        Yields ("module", {path, status}) while summaries complete, then per
+        section ("section_start", {title, heading}), ("token", {title, text})
+        pieces and ("section_end", {title}), and finally ("done", {stats,
+        incremental}). Section text is post-processed incrementally, so the
+        tokens of a section concatenate to its final body.
+        """
+        started = time.perf_counter()
+        self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=BASE_URL)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        try:
+            root = build_tree(files)
+            hash_subgraphs(root)
+
+            # ---- map: forward module progress as it happens
+            events = asyncio.Queue()
+            self._on_module = lambda path, status: events.put_nowait({"path": path, "status": status})
+
+            async def run_map():
+                try:
+                    await self._summarize_dir(root)
+                finally:
+                    events.put_nowait(None)
+
+            map_task = asyncio.create_task(run_map())
+            tasks.append(map_task)
+            while (event := await events.get()) is not None:
+                yield "module", event
+            await map_task
+            map_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            # ---- reduce: generate every section at once, emit them in README order
+            inputs = self._section_inputs(root)
+            queues = [asyncio.Queue() for _ in SECTIONS]
+
+            async def run_section(q, title, instruction, uses):
+                try:
+                    return await self._compose_section(title, instruction, self._section_context(inputs, uses),
+                                                       on_token=q.put_nowait)
+                finally:
+                    q.put_nowait(None)
+
+            section_tasks = [asyncio.create_task(run_section(q, t, i, u)) for q, (t, i, u) in zip(queues, SECTIONS)]
+            tasks.extend(section_tasks)
+            for (title, _, _), q, task in zip(SECTIONS, queues, section_tasks):
+                yield "section_start", {"title": title, "heading": f"## {title}"}
+                while (text := await q.get()) is not None:
+                    yield "token", {"title": title, "text": text}
+                await task  # re-raises a failed section
+                yield "section_end", {"title": title}
+
+            result = self._result(root, started, map_ms, [t.result() for t in section_tasks])
+            yield "done", {"stats": result["stats"], "incremental": result["incremental"]}
+        finally:
+            # client went away or a step failed: stop the remaining calls
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            self._on_module = None
+            await self._client.close()
+
+    def generate(self, files: list[dict]) -> dict:
+        return asyncio.run(self.agenerate(files))
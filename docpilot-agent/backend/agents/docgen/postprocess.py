@@ -0,0 +1,86 @@
+import re
+
+FENCE_OPEN = "```markdown"
+FENCE = "```"
+
+
+def clean_markdown(content: str) -> str:
+    """Strip ```markdown fences and literal \\n sequences from a model answer."""
+    clean = re.sub(r'^```markdown\n|```$', '', content or "", flags=re.MULTILINE).strip()
+    return clean.replace("\\n", "\n")
+
+
+class MarkdownStreamCleaner:
+    """
+    Incremental clean_markdown for streamed model output.
+
+    feed() returns the text that is safe to emit so far; only the few
+    characters that could still turn out to be a fence, a literal "\\n" or
+    trailing whitespace are held back. flush() returns whatever is left at
+    the end. Concatenating every returned piece gives the same text as
+    clean_markdown() on the whole answer.
+    """
+
+    def __init__(self):
+        self.pending = ""         # text not yet emitted
+        self.at_line_start = True
+        self.started = False      # leading whitespace is dropped until the first visible character
+        self.held_ws = ""         # whitespace that is only emitted once more text follows
+
+    def feed(self, chunk: str) -> str:
+        self.pending += chunk
+        return self._drain(final=False)
+
+    def flush(self) -> str:
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> str:
+        out = []
+        while self.pending:
+            newline = self.pending.find("\n")
+            if newline == -1:
+                if not final:
+                    # partial line: emit what cannot be the start of a fence / "\n" / trailing "```"
+                    safe = self._safe_prefix(self.pending)
+                    if safe:
+                        out.append(self._emit(safe))
+                        self.pending = self.pending[len(safe):]
+                        self.at_line_start = False
+                    break
+                line, self.pending, ended = self.pending, "", False
+            else:
+                line, self.pending, ended = self.pending[:newline], self.pending[newline + 1:], True
+
+            if self.at_line_start and line == FENCE_OPEN and ended:
+                continue  # "```markdown\n" disappears entirely
+            if line.endswith(FENCE):
+                line = line[:-len(FENCE)]
+            out.append(self._emit(line + ("\n" if ended else "")))
+            self.at_line_start = ended
+        return "".join(out)
+
+    def _safe_prefix(self, partial: str) -> str:
+        if self.at_line_start and FENCE_OPEN.startswith(partial):
+            return ""
+        cut = len(partial)
+        # a trailing run of backticks / a lone backslash may still become "```" or "\n"
+        while cut > 0 and partial[cut - 1] == "`" and len(partial) - cut < len(FENCE):
+            cut -= 1
+        if cut > 0 and partial[cut - 1] == "\\":
+            cut -= 1
+        return partial[:cut]
+
+    def _emit(self, text: str) -> str:
+        # edge whitespace is judged before "\n" is expanded, as in clean_markdown
+        if not self.started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self.started = True
+        stripped = text.rstrip()
+        if not stripped:
+            self.held_ws += text
+            return ""
+        result = self.held_ws + stripped
+        self.held_ws = text[len(stripped):]
+        return result.replace("\\n", "\n")
@@ -1,125 +1,95 @@
 from backend.db.neo4j_connect import driver
-from fastapi import APIRouter
+from backend.agents.kg_builder.kg_snapshot_cache import get_snapshot_cache, KG_SNAPSHOT_CACHE_ENABLED
+from fastapi import APIRouter, HTTPException
+import time
 
 router=APIRouter()
 
-
-def getFile(project):
-    with driver.session() as session:
-        result=session.run(
-            "MATCH (f:File{project:$project}) return f",
-            project=project
+# How far below each File the retrieval goes
+DEPTHS = ["files", "classes", "methods", "calls"]
+
+
+# ------------------ Query building ------------------
+# One query per project: the File lookup is an index seek, everything below
+# it is a relationship expand collected with pattern comprehensions, so the
+# round-trip count no longer grows with the number of classes/methods.
+def _method_projection(var: str, depth: str) -> str:
+    if depth == "calls":
+        calls = f"[({var})-[:CALLS]->(t:Method) | t {{.name, .parentClass, .filePath}}]"
+        return f"{var} {{.name, .kind, calls: {calls}}}"
+    return f"{var} {{.name, .kind}}"
+
+
+def project_graph_query(depth: str = "calls") -> str:
+    if depth not in DEPTHS:
+        raise ValueError(f"depth must be one of {DEPTHS}")
+
+    fields = [".filePath", ".language"]
+    if depth != "files":
+        cls_fields = ".name, .kind"
+        if depth in ("methods", "calls"):
+            cls_fields += f", methods: [(c)-[:HAS_METHOD]->(m:Method) | {_method_projection('m', depth)}]"
+        fields.append(f"classes: [(f)-[:CONTAINS_CLASS]->(c:Class) | c {{{cls_fields}}}]")
+    if depth in ("methods", "calls"):
+        fields.append(
+            "functions: [(f)-[:CONTAINS_METHOD]->(fn:Method) WHERE fn.parentClass = '' | "
+            f"{_method_projection('fn', depth)}]"
         )
 
-        return [record["f"] for record in result]
-
-def getClasses(project, file_path):
-    with driver.session() as session:
-        result = session.run(
-            """
-            MATCH (c:Class {filePath: $file, project: $project})
-            RETURN c
-            """,
-            file=file_path,
-            project=project
-        )
-        return [record["c"] for record in result]
-
-    
-def getMethods(project, class_name):
-    with driver.session() as session:
-        result = session.run(
-            """
-            MATCH (m:Method {parentClass: $class_name, project: $project})
-            RETURN m
-            """,
-            class_name=class_name,
-            project=project
-        )
-        return [record["m"] for record in result]
-
-
-def get_method_calls(project, class_name, method_name):
-    with driver.session() as session:
-        query = """
-        MATCH (m:Method {name: $method, parentClass: $parentClass, project: $project})
-        MATCH (m)-[:CALLS]->(target:Method)
-        RETURN target
-        """
-
-        result = session.run(
-            query,
-            method=method_name,
-            parentClass=class_name,  
-            project=project
-        )
+    return (
+        "MATCH (f:File {project: $project}) "
+        f"RETURN f {{{', '.join(fields)}}} AS file "
+        "ORDER BY file.filePath"
+    )
+
+
+PROJECT_GRAPH_QUERIES = {depth: project_graph_query(depth) for depth in DEPTHS}
+
+
+def get_project_graph(project: str, depth: str = "calls", use_cache: bool = KG_SNAPSHOT_CACHE_ENABLED) -> dict:
+    """
+    The project's subgraph as nested dicts:
+    {"project", "depth", "files": [{filePath, language, classes: [{name, kind,
+    methods: [{name, kind, calls}]}], functions: [...]}], "counts", "query_ms"}
+
+    Served from the snapshot cache until the KG writer next touches the
+    project. Snapshots are shared, so treat the result as read-only.
+    """
+    cache = get_snapshot_cache() if use_cache else None
+    if cache is not None:
+        version = cache.version(project)
+        snapshot = cache.get(project, depth)
+        if snapshot is not None:
+            return {**snapshot, "cache": "hit"}
+
+    query = PROJECT_GRAPH_QUERIES.get(depth) or project_graph_query(depth)
+    started = time.perf_counter()
+    records, _, _ = driver.execute_query(query, project=project, routing_="r")
+    files = [record["file"] for record in records]
+    query_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    classes = [c for f in files for c in f.get("classes", [])]
+    methods = [m for c in classes for m in c.get("methods", [])] + [fn for f in files for fn in f.get("functions", [])]
+    snapshot = {
+        "project": project,
+        "depth": depth,
+        "files": files,
+        "counts": {
+            "files": len(files),
+            "classes": len(classes),
+            "methods": len(methods),
+            "calls": sum(len(m.get("calls", [])) for m in methods),
+        },
+        "query_ms": query_ms,
+    }
+    if cache is not None:
+        cache.put(project, depth, version, snapshot)
+        return {**snapshot, "cache": "miss"}
+    return snapshot
 
-        return [record["target"] for record in result]
-    
 
 @router.get("/testingDataRetrive")
-def dataRetrive(projectName: str):
-
-    data = []
-
-    files = getFile(projectName)
-    data.extend(files)
-
-    for f in files:
-        file_path = f["filePath"]
-
-        classes = getClasses(projectName, file_path)
-        data.extend(classes)
-
-        for c in classes:
-            class_name = c["name"]
-
-            methods = getMethods(projectName, class_name)
-            data.extend(methods)
-
-            # Will be empty until CALLS relationships exist
-            for m in methods:
-                method_calls = get_method_calls(
-                    projectName,
-                    class_name,
-                    m["name"]
-                )
-                data.extend(method_calls)
-
-    return data
-
-
-    # print("Classes:", getClasses(projectName, file_path))
-    # print("Methods:", getMethods(projectName, class_name))
-    # print("Method calls:", get_method_calls(projectName, class_name, method_name))
-
-    data=[]
-
-      
-    files = getFile(projectName)
-    data.extend(files)
-
-    
-    for f in files:
-        file_path = f["filePath"]
-        classes = getClasses(projectName, file_path)
-        print(classes)
-        data.extend(classes)
-
-        
-        for c in classes:
-            class_name = c["name"]
-            methods = getMethods(projectName, class_name)
-            print(methods)
-            data.extend(methods)
-
-            
-            for m in methods:
-                method_name = m["name"]
-                method_calls = get_method_calls(projectName, class_name, method_name)
-                print(method_calls)
-                data.extend(method_calls)
-                
-    return data
-
-    
\ No newline at end of file
+def dataRetrive(projectName: str, depth: str = "calls"):
+    if depth not in DEPTHS:
+        raise HTTPException(status_code=400, detail=f"depth must be one of {DEPTHS}")
+    return get_project_graph(projectName, depth)
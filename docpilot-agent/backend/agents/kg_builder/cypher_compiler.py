@@ -0,0 +1,286 @@
+import os
+
+# ------------------ Graph schema ------------------
+# (:File {filePath, project})
+# (:Class {name, filePath, project})
+# (:Method {name, parentClass, filePath, project})   parentClass = "" for module-level functions
+# (File)-[:CONTAINS_CLASS]->(Class), (File)-[:CONTAINS_METHOD]->(Method),
+# (Class)-[:HAS_METHOD]->(Method), (Method)-[:CALLS]->(Method)
+# Every node and relationship carries `project`.
+#
+# Each statement body reads one parameter row as `row`; the KG writer runs
+# it for a whole batch with "UNWIND $rows AS row " in front.
+
+NODE_STATEMENTS = {
+    "File": (
+        "MERGE (n:File {filePath: row.filePath, project: $project}) "
+        "SET n.language = row.language"
+    ),
+    "Class": (
+        "MERGE (n:Class {name: row.name, filePath: row.filePath, project: $project}) "
+        "SET n.kind = row.kind"
+    ),
+    "Method": (
+        "MERGE (n:Method {name: row.name, parentClass: row.parentClass, filePath: row.filePath, project: $project}) "
+        "SET n.kind = row.kind"
+    ),
+}
+
+RELATIONSHIP_STATEMENTS = {
+    "CONTAINS_CLASS": (
+        "MATCH (f:File {filePath: row.filePath, project: $project}) "
+        "MATCH (c:Class {name: row.className, filePath: row.filePath, project: $project}) "
+        "MERGE (f)-[:CONTAINS_CLASS {project: $project}]->(c)"
+    ),
+    "CONTAINS_METHOD": (
+        "MATCH (f:File {filePath: row.filePath, project: $project}) "
+        "MATCH (m:Method {name: row.methodName, parentClass: row.parentClass, filePath: row.filePath, project: $project}) "
+        "MERGE (f)-[:CONTAINS_METHOD {project: $project}]->(m)"
+    ),
+    "HAS_METHOD": (
+        "MATCH (c:Class {name: row.parentClass, filePath: row.filePath, project: $project}) "
+        "MATCH (m:Method {name: row.methodName, parentClass: row.parentClass, filePath: row.filePath, project: $project}) "
+        "MERGE (c)-[:HAS_METHOD {project: $project}]->(m)"
+    ),
+    "CALLS": (
+        "MATCH (a:Method {name: row.callerName, parentClass: row.callerClass, filePath: row.callerFile, project: $project}) "
+        "MATCH (b:Method {name: row.calleeName, parentClass: row.calleeClass, filePath: row.calleeFile, project: $project}) "
+        "MERGE (a)-[:CALLS {project: $project}]->(b)"
+    ),
+}
+
+# Write order: every relationship MATCHes nodes written before it
+NODE_ORDER = ["File", "Class", "Method"]
+RELATIONSHIP_ORDER = ["CONTAINS_CLASS", "CONTAINS_METHOD", "HAS_METHOD", "CALLS"]
+
+# result keys holding class-like types, and the `kind` they map to
+TYPE_KEYS = [
+    ("classes", "class"), ("interfaces", "interface"), ("enums", "enum"), ("records", "record"),
+    ("structs", "struct"), ("traits", "trait"), ("objects", "object"), ("modules", "module"),
+    ("implementations", "class"),
+]
+
+# `x.get(...)`, `x.append(...)`: far more likely a builtin container / str call
+# than the one project method that happens to share the name
+BUILTIN_METHOD_NAMES = {n for t in (dict, list, set, str, bytes, tuple) for n in dir(t) if not n.startswith("_")}
+
+
+class CompiledGraph:
+    """
+    Parameter rows for one project, grouped by node label and relationship
+    type. Rows are de-duplicated and kept in first-seen order, so the same
+    parse output always compiles to the same rows.
+    """
+
+    def __init__(self, project: str):
+        self.project = project
+        self.nodes = {label: [] for label in NODE_ORDER}
+        self.relationships = {rel_type: [] for rel_type in RELATIONSHIP_ORDER}
+        self._seen = set()
+
+    def _add(self, group: dict, name: str, row: dict):
+        key = (name, tuple(sorted(row.items())))
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        group[name].append(row)
+
+    def add_node(self, label: str, row: dict):
+        self._add(self.nodes, label, row)
+
+    def add_relationship(self, rel_type: str, row: dict):
+        self._add(self.relationships, rel_type, row)
+
+    def counts(self) -> dict:
+        return {
+            "nodes": {label: len(rows) for label, rows in self.nodes.items()},
+            "relationships": {rel_type: len(rows) for rel_type, rows in self.relationships.items()},
+        }
+
+    def batches(self):
+        """(label or type, statement body, rows) per group, in write order."""
+        for label in NODE_ORDER:
+            if self.nodes[label]:
+                yield label, NODE_STATEMENTS[label], self.nodes[label]
+        for rel_type in RELATIONSHIP_ORDER:
+            if self.relationships[rel_type]:
+                yield rel_type, RELATIONSHIP_STATEMENTS[rel_type], self.relationships[rel_type]
+
+
+# ------------------ Per-language extraction ------------------
+def _name(entry):
+    if isinstance(entry, str):
+        return entry.strip() or None
+    if isinstance(entry, dict):
+        name = entry.get("name")
+        return name.strip() if isinstance(name, str) and name.strip() else None
+    return None
+
+
+def _calls(entry) -> list:
+    calls = entry.get("calls") if isinstance(entry, dict) else None
+    return [c for c in calls if isinstance(c, str)] if isinstance(calls, list) else []
+
+
+def _receiver_type(receiver: str) -> str | None:
+    # Go receivers: "r *Router", "Router", "s *Store[T]"
+    parts = receiver.replace("*", " ").split()
+    if not parts:
+        return None
+    return parts[-1].split("[")[0] or None
+
+
+def _structure(result: dict):
+    """
+    Normalizes one parser result into
+    ([(class name, kind)], [(method name, parent class or "", calls)]).
+    """
+    # LLM fallback results keep their structure one level down
+    if isinstance(result.get("parsed"), dict):
+        source = result["parsed"]
+    elif isinstance(result.get("heuristic"), dict):
+        source = result["heuristic"]
+    else:
+        source = result
+
+    classes = []
+    methods = []
+
+    for key, kind in TYPE_KEYS:
+        entries = source.get(key)
+        if not isinstance(entries, list):
+            continue
+        for entry in entries:
+            cls = _name(entry)
+            if not cls:
+                continue
+            classes.append((cls, kind))
+            # Python-style nested methods (Java lists method names here; its
+            # full entries live in result["methods"] and are handled below)
+            if isinstance(entry, dict) and isinstance(entry.get("methods"), list) and kind != "interface":
+                for m in entry["methods"]:
+                    if isinstance(m, dict) and _name(m):
+                        methods.append((_name(m), cls, _calls(m)))
+
+    # TypeScript: {"class_methods": {ClassName: [method names]}}
+    if isinstance(source.get("class_methods"), dict):
+        for cls, names in source["class_methods"].items():
+            for m in names or []:
+                if _name(m) and _name(m) != "constructor":
+                    methods.append((_name(m), cls, []))
+
+    # Java: flat "methods" list whose entries name their owning type
+    if isinstance(source.get("methods"), list):
+        for m in source["methods"]:
+            if isinstance(m, dict) and _name(m):
+                methods.append((_name(m), m.get("class") or "", _calls(m)))
+
+    # functions; Go methods carry their receiver type
+    if isinstance(source.get("functions"), list):
+        for fn in source["functions"]:
+            name = _name(fn)
+            if not name:
+                continue
+            parent = ""
+            if isinstance(fn, dict) and isinstance(fn.get("receiver"), str):
+                parent = _receiver_type(fn["receiver"]) or ""
+            methods.append((name, parent, _calls(fn)))
+
+    return classes, methods
+
+
+def _rel_path(file_path: str, repo_root: str | None) -> str:
+    if repo_root:
+        try:
+            file_path = os.path.relpath(file_path, repo_root)
+        except ValueError:
+            pass
+    return file_path.replace(os.sep, "/")
+
+
+# ------------------ Compiler ------------------
+def compile_graph(parsed_files: list[dict], project: str, repo_root: str | None = None) -> CompiledGraph:
+    """
+    Compile parser output into the KG schema above. With `repo_root`, file
+    paths are stored relative to it, so a re-clone at another location maps
+    to the same nodes.
+
+    CALLS edges are resolved from each method's "calls" list (where the
+    parser provides one): `self.x` / `cls.x` / `this.x` resolve to the same
+    class, a bare name to a function in the same file, and anything else to
+    the project-wide method of that name when exactly one exists.
+    Unresolvable calls (library code, ambiguous names) are dropped.
+    """
+    graph = CompiledGraph(project)
+    pending_calls = []  # (caller row, call target)
+
+    for result in parsed_files:
+        if not isinstance(result, dict) or not result.get("file"):
+            continue
+        file_path = _rel_path(result["file"], repo_root)
+        graph.add_node("File", {"filePath": file_path, "language": result.get("language") or "unknown"})
+
+        classes, methods = _structure(result)
+        class_names = set()
+        for cls, kind in classes:
+            class_names.add(cls)
+            graph.add_node("Class", {"name": cls, "filePath": file_path, "kind": kind})
+            graph.add_relationship("CONTAINS_CLASS", {"filePath": file_path, "className": cls})
+
+        for name, parent, calls in methods:
+            if parent and parent not in class_names:
+                # receiver / owner declared in another file of the same package
+                class_names.add(parent)
+                graph.add_node("Class", {"name": parent, "filePath": file_path, "kind": "class"})
+                graph.add_relationship("CONTAINS_CLASS", {"filePath": file_path, "className": parent})
+            graph.add_node("Method", {
+                "name": name,
+                "parentClass": parent,
+                "filePath": file_path,
+                "kind": "method" if parent else "function",
+            })
+            graph.add_relationship("CONTAINS_METHOD", {"filePath": file_path, "methodName": name, "parentClass": parent})
+            if parent:
+                graph.add_relationship("HAS_METHOD", {"filePath": file_path, "methodName": name, "parentClass": parent})
+            for target in calls:
+                pending_calls.append(((name, parent, file_path), target))
+
+    if pending_calls:
+        _resolve_calls(graph, pending_calls)
+    return graph
+
+
+def _resolve_calls(graph: CompiledGraph, pending_calls):
+    by_name = {}
+    for row in graph.nodes["Method"]:
+        by_name.setdefault(row["name"], []).append((row["name"], row["parentClass"], row["filePath"]))
+    known = {m for ms in by_name.values() for m in ms}
+
+    for caller, target in pending_calls:
+        caller_name, caller_class, caller_file = caller
+        receiver, _, attr = target.rpartition(".")
+
+        callee = None
+        if receiver in ("self", "cls", "this") and caller_class:
+            candidate = (attr, caller_class, caller_file)
+            callee = candidate if candidate in known else None
+        elif not receiver:
+            candidate = (attr, "", caller_file)
+            if candidate in known:
+                callee = candidate
+        if callee is None:
+            matches = by_name.get(attr, [])
+            if receiver and receiver[:1].isupper():
+                # ClassName.method(...)
+                matches = [m for m in matches if m[1] == receiver.rpartition(".")[2]] or matches
+            elif receiver and attr in BUILTIN_METHOD_NAMES:
+                matches = []
+            if len(matches) == 1:
+                callee = matches[0]
+
+        if callee is None:
+            continue
+        graph.add_relationship("CALLS", {
+            "callerName": caller_name, "callerClass": caller_class, "callerFile": caller_file,
+            "calleeName": callee[0], "calleeClass": callee[1], "calleeFile": callee[2],
+        })
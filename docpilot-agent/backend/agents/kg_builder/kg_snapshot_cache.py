@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+KG_SNAPSHOT_CACHE_ENABLED = os.getenv("KG_SNAPSHOT_CACHE_ENABLED", "1") == "1"
+KG_SNAPSHOT_CACHE_MAX_BYTES = int(os.getenv("KG_SNAPSHOT_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+# Optional: also keep snapshots (and version counters) on disk so they survive restarts
+KG_SNAPSHOT_DIR = os.getenv("KG_SNAPSHOT_DIR")
+
+
+class KGSnapshotCache:
+    """
+    Per-project snapshots of the KG reader's output, keyed by (project, depth).
+
+    Each project has a version counter that the KG writer bumps after every
+    write; a snapshot is only served while its version matches, so a
+    rebuilt graph is never answered from stale data. The version is read
+    before the query runs, so a read that overlaps a write is stored under
+    the old version and discarded on the next lookup.
+
+    Memory is bounded by `max_bytes` (serialized JSON size) across all
+    projects with least-recently-used eviction. With `disk_dir` snapshots are
+    written through to JSON files and reloaded on a memory miss.
+    """
+
+    def __init__(self, max_bytes: int | None = None, disk_dir: str | None = None):
+        self.max_bytes = max_bytes or KG_SNAPSHOT_CACHE_MAX_BYTES
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # (project, depth) -> entry dict
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            try:
+                with open(self._versions_path(), "r", encoding="utf-8") as f:
+                    self._versions = json.load(f)
+            except (OSError, ValueError):
+                self._versions = {}
+
+    # ------------------ Versions ------------------
+    def version(self, project: str) -> int:
+        with self._lock:
+            return self._versions.get(project, 0)
+
+    def bump(self, project: str) -> int:
+        """Called by the KG writer: invalidates every snapshot of `project`."""
+        with self._lock:
+            version = self._versions.get(project, 0) + 1
+            self._versions[project] = version
+            for key in [k for k in self._entries if k[0] == project]:
+                self._drop(key)
+            if self.disk_dir:
+                self._save_versions()
+        print(f"[KGSnapshotCache] {project} is now at version {version}")
+        return version
+
+    # ------------------ Reads / writes ------------------
+    def get(self, project: str, depth: str):
+        key = (project, depth)
+        with self._lock:
+            current = self._versions.get(project, 0)
+            entry = self._entries.get(key)
+            if entry is None and self.disk_dir:
+                entry = self._load(key)
+                if entry is not None:
+                    self._insert(key, entry)
+            if entry is None or entry["version"] != current:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry["hits"] += 1
+            entry["last_access"] = time.time()
+            self.hits += 1
+            return entry["snapshot"]
+
+    def put(self, project: str, depth: str, version: int, snapshot: dict):
+        key = (project, depth)
+        raw = json.dumps(snapshot, default=str)
+        entry = {"version": version, "snapshot": snapshot, "size": len(raw), "created": time.time(),
+                 "last_access": time.time(), "hits": 0}
+        with self._lock:
+            if version != self._versions.get(project, 0):
+                return  # a write finished while this snapshot was being read
+            if entry["size"] > self.max_bytes:
+                return
+            if key in self._entries:
+                self._drop(key, remove_file=False)
+            self._insert(key, entry)
+            if self.disk_dir:
+                with open(self._snapshot_path(key), "w", encoding="utf-8") as f:
+                    json.dump({"version": version, "created": entry["created"], "snapshot": snapshot}, f, default=str)
+
+    def evict(self, project: str | None = None) -> int:
+        """Drop snapshots of one project (or all of them); returns how many were dropped."""
+        with self._lock:
+            keys = [k for k in self._entries if project is None or k[0] == project]
+            for key in keys:
+                self._drop(key)
+            if self.disk_dir:
+                for name in os.listdir(self.disk_dir):
+                    if name.endswith(".snapshot.json") and (project is None or name.startswith(self._file_prefix(project))):
+                        os.remove(os.path.join(self.disk_dir, name))
+            return len(keys)
+
+    # ------------------ Internals (lock held) ------------------
+    def _insert(self, key, entry):
+        self._entries[key] = entry
+        self.size += entry["size"]
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            # evicted from memory only; the disk copy stays reloadable
+            self._drop(oldest, remove_file=False)
+            self.evictions += 1
+
+    def _drop(self, key, remove_file: bool = True):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry["size"]
+        if remove_file and self.disk_dir:
+            try:
+                os.remove(self._snapshot_path(key))
+            except OSError:
+                pass
+
+    def _file_prefix(self, project: str) -> str:
+        return hashlib.sha1(project.encode()).hexdigest()[:16]
+
+    def _snapshot_path(self, key) -> str:
+        return os.path.join(self.disk_dir, f"{self._file_prefix(key[0])}-{key[1]}.snapshot.json")
+
+    def _versions_path(self) -> str:
+        return os.path.join(self.disk_dir, "versions.json")
+
+    def _save_versions(self):
+        tmp = self._versions_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._versions, f)
+        os.replace(tmp, self._versions_path())
+
+    def _load(self, key):
+        try:
+            with open(self._snapshot_path(key), "r", encoding="utf-8") as f:
+                raw = f.read()
+            data = json.loads(raw)
+        except (OSError, ValueError):
+            return None
+        return {"version": data["version"], "snapshot": data["snapshot"], "size": len(raw),
+                "created": data.get("created", time.time()), "last_access": time.time(), "hits": 0}
+
+    # ------------------ Admin ------------------
+    def stats(self) -> dict:
+        with self._lock:
+            entries = [
+                {
+                    "project": project,
+                    "depth": depth,
+                    "version": e["version"],
+                    "current_version": self._versions.get(project, 0),
+                    "bytes": e["size"],
+                    "hits": e["hits"],
+                    "age_seconds": round(time.time() - e["created"], 1),
+                }
+                for (project, depth), e in self._entries.items()
+            ]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "disk_dir": self.disk_dir,
+                "entries": entries,
+            }
+
+
+_snapshot_cache = None
+_snapshot_cache_lock = threading.Lock()
+
+
+def get_snapshot_cache() -> KGSnapshotCache:
+    global _snapshot_cache
+    with _snapshot_cache_lock:
+        if _snapshot_cache is None:
+            _snapshot_cache = KGSnapshotCache(disk_dir=KG_SNAPSHOT_DIR)
+        return _snapshot_cache
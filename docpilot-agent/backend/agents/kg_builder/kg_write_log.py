@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+KG_WRITE_LOG_PATH = os.getenv("KG_WRITE_LOG_PATH", os.path.join(BASE_DIR, ".cache", "kg", "writes.sqlite3"))
+
+
+class KGWriteLog:
+    """
+    The id of the last write to each project's graph, on disk. Unlike the
+    snapshot cache's version counter it survives restarts and never repeats,
+    so "has the graph been rewritten since X" can be answered by comparing ids.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or KG_WRITE_LOG_PATH
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS writes ("
+                " project TEXT PRIMARY KEY,"
+                " write_id TEXT NOT NULL,"
+                " written REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, project: str) -> str:
+        write_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO writes(project, write_id, written) VALUES (?, ?, ?)",
+                         (project, write_id, time.time()))
+        return write_id
+
+    def last(self, project: str) -> str | None:
+        row = self._connect().execute("SELECT write_id FROM writes WHERE project = ?", (project,)).fetchone()
+        return row[0] if row else None
+
+
+_write_log = None
+_write_log_lock = threading.Lock()
+
+
+def get_kg_write_log() -> KGWriteLog:
+    global _write_log
+    if _write_log is None:
+        with _write_log_lock:
+            if _write_log is None:
+                _write_log = KGWriteLog()
+    return _write_log
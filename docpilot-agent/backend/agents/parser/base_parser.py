@@ -1,3 +1,6 @@
+import io
+
+
 class BaseParser:
     """
     A base class for all parser implementations.
@@ -7,6 +10,23 @@ class BaseParser:
         "language": <language>,
         ...
     }
+
+    VERSION is stamped into parse-cache keys; bump it whenever a parser's
+    output changes so cached results from the old version are not reused.
     """
+    VERSION = "1"
+    # how undecodable UTF-8 is handled when reading a file ("ignore" drops the bytes)
+    ENCODING_ERRORS = "ignore"
+
     def parse_file(self, file_path: str) -> dict:
-        raise NotImplementedError("parse_file() must be implemented by subclasses")
+        with open(file_path, "r", encoding="utf-8", errors=self.ENCODING_ERRORS) as f:
+            return self.parse_source(f.read(), file_path)
+
+    def parse_source(self, code: str, file_path: str) -> dict:
+        """Parse source that is already in memory (e.g. a git blob); `file_path` only labels the result."""
+        raise NotImplementedError("parse_source() must be implemented by subclasses")
+
+
+def decode_source(data: bytes, errors: str = "ignore") -> str:
+    """Bytes -> text exactly as parse_file's open() would read them (UTF-8, universal newlines)."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors=errors).read()
@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class CParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         includes = re.findall(r"^\s*#include\s+[<\"]([^>\"]+)[>\"]", code, re.M)
         structs = re.findall(r"^\s*struct\s+([A-Za-z0-9_]+)", code, re.M)
@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class CppParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         includes = re.findall(r"^\s*#include\s+[<\"]([^>\"]+)[>\"]", code, re.M)
         namespaces = re.findall(r"^\s*namespace\s+([a-zA-Z0-9_]+)", code, re.M)
@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class CSharpParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         usings = re.findall(r"^\s*using\s+([A-Za-z0-9_\.]+)\s*;", code, re.M)
         namespaces = re.findall(r"^\s*namespace\s+([A-Za-z0-9_.]+)", code, re.M)
@@ -0,0 +1,153 @@
+import os
+from pathlib import PurePosixPath
+
+from backend.utils.ignore_rules import IgnoreRules
+from .language_detector import detect_language
+
+# Decisions
+SKIP = "skip"
+STATIC = "static"
+FALLBACK = "fallback"
+
+MAX_STATIC_BYTES = int(os.getenv("PARSE_MAX_STATIC_BYTES", str(2 * 1024 * 1024)))
+# Fallback files are embedded in an LLM prompt, so the cap is much tighter
+MAX_FALLBACK_BYTES = int(os.getenv("PARSE_MAX_FALLBACK_BYTES", str(100 * 1024)))
+SNIFF_BYTES = 8192
+
+VENDORED_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "bower_components", "vendor", "dist", "build", "target",
+    "__pycache__", ".venv", "venv", ".tox", ".nox", ".mypy_cache", ".pytest_cache",
+    ".idea", ".vscode", ".next", ".nuxt", ".gradle", "coverage", "site-packages", "Pods",
+}
+
+LOCKFILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "npm-shrinkwrap.json", "poetry.lock",
+    "Pipfile.lock", "Cargo.lock", "Gemfile.lock", "composer.lock", "go.sum", "mix.lock",
+    "pubspec.lock", "packages.lock.json", "flake.lock", "uv.lock",
+}
+
+BINARY_EXTENSIONS = {
+    # images / media
+    "png", "jpg", "jpeg", "gif", "bmp", "ico", "icns", "webp", "tiff", "psd", "svgz",
+    "mp3", "mp4", "wav", "ogg", "flac", "avi", "mov", "mkv", "webm",
+    # fonts
+    "ttf", "otf", "woff", "woff2", "eot",
+    # archives / packages
+    "zip", "gz", "tgz", "bz2", "xz", "7z", "rar", "tar", "jar", "war", "ear", "whl", "egg", "apk", "dmg", "iso",
+    # compiled / native
+    "class", "pyc", "pyo", "o", "a", "so", "dll", "dylib", "exe", "bin", "obj", "lib", "wasm",
+    # documents / data
+    "pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "sqlite", "sqlite3", "db", "parquet", "pkl",
+}
+
+# repository plumbing that carries no code structure
+METADATA_FILES = {".git", ".gitignore", ".gitattributes", ".gitmodules", ".gitkeep", ".keep", ".DS_Store", "Thumbs.db"}
+
+GENERATED_SUFFIXES = (".min.js", ".min.css", ".map", ".bundle.js", ".chunk.js", "_pb2.py", ".pb.go", ".g.dart")
+
+
+class FileClassifier:
+    """
+    Decides, before a file is read in full, whether it should be skipped,
+    parsed by a static parser, or sent to the LLM fallback.
+
+    `classify_path` only looks at the path (vendored directories, lockfiles,
+    generated and binary extensions, .gitignore) and costs no I/O.
+    `classify_file` adds a size check and sniffs the first few KB for binary
+    content. Both return a `(decision, reason)` tuple.
+    """
+
+    def __init__(self, repo_path: str | None = None, ignore_rules: IgnoreRules | None = None):
+        self.repo_path = repo_path
+        if ignore_rules is None and repo_path:
+            ignore_rules = IgnoreRules.for_repo(repo_path)
+        self.ignore_rules = ignore_rules
+
+    def classify_path(self, file_path: str) -> tuple[str, str]:
+        rel = os.path.relpath(file_path, self.repo_path) if self.repo_path else file_path
+        rel = rel.replace(os.sep, "/")
+        parts = PurePosixPath(rel).parts
+        name = parts[-1] if parts else rel
+        lower = name.lower()
+
+        if any(p in VENDORED_DIRS for p in parts[:-1]):
+            return SKIP, "vendored"
+        if name in METADATA_FILES:
+            return SKIP, "metadata"
+        if name in LOCKFILES or lower.endswith(".lock"):
+            return SKIP, "lockfile"
+        if lower.endswith(GENERATED_SUFFIXES):
+            return SKIP, "generated"
+        ext = lower.rsplit(".", 1)[-1] if "." in lower else ""
+        if ext in BINARY_EXTENSIONS:
+            return SKIP, "binary_extension"
+        if self.ignore_rules is not None and self.ignore_rules.is_ignored(rel):
+            return SKIP, "gitignored"
+
+        return (STATIC, "known_language") if detect_language(file_path) else (FALLBACK, "unknown_language")
+
+    def classify_file(self, file_path: str, size: int | None = None) -> tuple[str, str]:
+        decision, reason = self.classify_path(file_path)
+        if decision == SKIP:
+            return decision, reason
+        return self.classify_content(file_path, decision, reason, size)
+
+    def classify_content(self, file_path: str, decision: str, reason: str, size: int | None = None) -> tuple[str, str]:
+        """Size cap and binary sniffing for a file that already passed `classify_path`."""
+        try:
+            if size is None:
+                size = os.path.getsize(file_path)
+            decision, reason = self.classify_size(decision, reason, size)
+            if decision == SKIP:
+                return decision, reason
+
+            with open(file_path, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return SKIP, "unreadable"
+
+        return self.classify_head(decision, reason, head)
+
+    # The two halves of classify_content, for content that does not come from a file on disk
+    # (git blobs: the size is known from the tree listing before the blob is read).
+    @staticmethod
+    def classify_size(decision: str, reason: str, size: int) -> tuple[str, str]:
+        if size == 0:
+            return SKIP, "empty"
+        if size > (MAX_STATIC_BYTES if decision == STATIC else MAX_FALLBACK_BYTES):
+            return SKIP, "too_large"
+        return decision, reason
+
+    @staticmethod
+    def classify_head(decision: str, reason: str, head: bytes) -> tuple[str, str]:
+        if is_binary(head[:SNIFF_BYTES]):
+            return SKIP, "binary_content"
+        return decision, reason
+
+
+def is_binary(head: bytes) -> bool:
+    if b"\0" in head:
+        return True
+    try:
+        head.decode("utf-8")
+        return False
+    except UnicodeDecodeError as e:
+        # a multi-byte character cut off at the sniff boundary is still text
+        if e.start >= len(head) - 4:
+            return False
+    # mostly-printable latin-1 text (old source files) is still worth parsing
+    control = sum(1 for b in head if b < 32 and b not in (9, 10, 12, 13))
+    return control / max(len(head), 1) > 0.1
+
+
+def record_decision(stats: dict | None, decision: str, reason: str | None = None, count: int = 1):
+    """Tally a decision into stats["classification"]; reason "pruned_dir" counts whole directories."""
+    if stats is None:
+        return
+    summary = stats.setdefault("classification", {STATIC: 0, FALLBACK: 0, SKIP: 0, "skip_reasons": {}, "pruned_dirs": 0})
+    if reason == "pruned_dir":
+        summary["pruned_dirs"] += count
+        return
+    summary[decision] += count
+    if decision == SKIP:
+        summary["skip_reasons"][reason] = summary["skip_reasons"].get(reason, 0) + count
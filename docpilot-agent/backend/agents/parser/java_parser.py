@@ -1,245 +1,503 @@
 import re
 from .base_parser import BaseParser
 
+# One regex alternation tokenizes the whole file in a single left-to-right pass.
+# Comments and string literals are matched as whole tokens, so braces, `//`
+# and keywords inside them never confuse the scanner.
+TOKEN_RE = re.compile(r'''
+      (?P<javadoc>/\*\*(?!/)[\s\S]*?\*/)
+    | (?P<block>/\*[\s\S]*?\*/)
+    | (?P<line>//[^\n]*)
+    | (?P<text>"""[\s\S]*?""")
+    | (?P<string>"(?:\\.|[^"\\\n])*")
+    | (?P<char>'(?:\\.|[^'\\\n])*')
+    | (?P<ident>[A-Za-z_$][\w$]*)
+    | (?P<number>\d[\w.]*)
+    | (?P<op>\S)
+''', re.VERBOSE)
+
+MODIFIERS = {
+    "public", "private", "protected", "abstract", "final", "static", "sealed", "non-sealed",
+    "strictfp", "synchronized", "native", "transient", "volatile", "default",
+}
+ACCESS_MODIFIERS = ("public", "private", "protected")
+TYPE_KEYWORDS = {"class": "classes", "interface": "interfaces", "enum": "enums", "record": "records"}
+HTTP_MAPPINGS = ("GetMapping", "PostMapping", "PutMapping", "DeleteMapping", "PatchMapping")
+JAXRS_METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH")
+
+
+class _Frame:
+    """One open `{` on the brace stack. Only "type" frames are declaration contexts."""
+    __slots__ = ("kind", "type", "base_path", "enum_constants")
+
+    def __init__(self, kind, type_entry=None, base_path="", enum_constants=False):
+        self.kind = kind
+        self.type = type_entry
+        self.base_path = base_path
+        self.enum_constants = enum_constants
 
-class JavaParser(BaseParser):
-
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
 
-        return {
+class JavaParser(BaseParser):
+    """
+    Single-pass Java scanner.
+
+    The source is tokenized once, then walked once with a brace-depth stack.
+    Declarations (types, fields, constructors, methods) are only recognised
+    directly inside a type body, method bodies are skipped by brace counting,
+    and every member is attached to its enclosing type. Work is linear in the
+    size of the file.
+    """
+    VERSION = "2"
+
+    def parse_source(self, code: str, file_path: str = "") -> dict:
+        result = {
             "file": file_path,
             "language": "java",
-            "package": self._parse_package(code),
-            "imports": self._parse_imports(code),
-            "annotations": self._parse_annotations(code),
-            "classes": self._parse_classes(code),
-            "interfaces": self._parse_interfaces(code),
-            "enums": self._parse_enums(code),
-            "records": self._parse_records(code),
-            "fields": self._parse_fields(code),
-            "constructors": self._parse_constructors(code),
-            "methods": self._parse_methods(code),
-            "apis": self._parse_apis(code),
-            "comments": self._parse_comments(code),
+            "package": None,
+            "imports": [],
+            "annotations": [],
+            "classes": [],
+            "interfaces": [],
+            "enums": [],
+            "records": [],
+            "fields": [],
+            "constructors": [],
+            "methods": [],
+            "apis": [],
+            "comments": {"javadoc": [], "single_line": []},
         }
 
-    # -------------------------
-    # Package & Imports
-    # -------------------------
-    def _parse_package(self, code):
-        match = re.search(r'package\s+([\w\.]+)\s*;', code)
-        return match.group(1) if match else None
-
-    def _parse_imports(self, code):
-        return re.findall(r'import\s+(static\s+)?([\w\.]+)\s*;', code)
+        tokens = []
+        for m in TOKEN_RE.finditer(code):
+            kind = m.lastgroup
+            if kind == "javadoc":
+                result["comments"]["javadoc"].append(m.group())
+            elif kind == "line":
+                result["comments"]["single_line"].append(m.group())
+            elif kind != "block":
+                tokens.append((kind, m.group(), m.start(), m.end()))
+
+        self._scan(code, tokens, result)
+        return result
 
     # -------------------------
-    # Annotations
+    # Scanner
     # -------------------------
-    def _parse_annotations(self, code):
-        return re.findall(r'@\w+(?:\([^)]*\))?', code)
+    def _scan(self, code, tokens, result):
+        frames = []
+        stmt = []              # tokens of the declaration being read
+        stmt_annotations = []  # annotations in front of that declaration
+        paren_depth = 0        # inside stmt, so parameter annotations are not taken as method annotations
+        n = len(tokens)
+        i = 0
+
+        while i < n:
+            kind, text, start, end = tokens[i]
+            top = frames[-1] if frames else None
+
+            # Method bodies, initializer blocks, field initializers: only track braces
+            if top is not None and top.kind != "type":
+                if text == "{" and kind == "op":
+                    frames.append(_Frame("block"))
+                elif text == "}" and kind == "op":
+                    frames.pop()
+                i += 1
+                continue
+
+            if kind == "ident" and top is None and not stmt and text in ("package", "import"):
+                i = self._read_header(tokens, i, result)
+                continue
+
+            if text == "@" and kind == "op":
+                if i + 1 < n and tokens[i + 1][1] == "interface":
+                    i += 1  # `@interface` declares an annotation type
+                    continue
+                ann, i = self._read_annotation(code, tokens, i)
+                if ann:
+                    result["annotations"].append(ann)
+                    if paren_depth == 0:
+                        stmt_annotations.append(ann)
+                continue
+
+            if kind == "op" and text == "{":
+                if top is not None and top.enum_constants:
+                    # enum constant with a body: `A { ... }`
+                    frames.append(_Frame("block"))
+                    i += 1
+                    continue
+                frame, keep_stmt = self._open_block(code, stmt, stmt_annotations, top, result)
+                frames.append(frame)
+                if not keep_stmt:
+                    stmt, stmt_annotations, paren_depth = [], [], 0
+                i += 1
+                continue
+
+            if kind == "op" and text == "}":
+                if top is not None and top.enum_constants:
+                    self._add_enum_constant(stmt, top)
+                if frames:
+                    frames.pop()
+                stmt, stmt_annotations, paren_depth = [], [], 0
+                i += 1
+                continue
+
+            if kind == "op" and text == ";" and paren_depth == 0:
+                if top is not None:
+                    if top.enum_constants:
+                        self._add_enum_constant(stmt, top)
+                        top.enum_constants = False
+                    elif stmt:
+                        self._close_member(code, stmt, stmt_annotations, top, result)
+                stmt, stmt_annotations, paren_depth = [], [], 0
+                i += 1
+                continue
+
+            if kind == "op" and text == "," and top is not None and top.enum_constants and paren_depth == 0:
+                self._add_enum_constant(stmt, top)
+                stmt, stmt_annotations = [], []
+                i += 1
+                continue
+
+            if kind == "op":
+                if text == "(":
+                    paren_depth += 1
+                elif text == ")":
+                    paren_depth = max(0, paren_depth - 1)
+            stmt.append(tokens[i])
+            i += 1
+
+    def _read_header(self, tokens, i, result):
+        """`package a.b;` / `import [static] a.b.C;` — returns the index after the `;`."""
+        keyword = tokens[i][1]
+        j = i + 1
+        is_static = False
+        parts = []
+        while j < len(tokens) and tokens[j][1] != ";":
+            if keyword == "import" and tokens[j][1] == "static" and not parts:
+                is_static = True
+            else:
+                parts.append(tokens[j][1])
+            j += 1
+        name = "".join(parts)
+        if keyword == "package":
+            result["package"] = name
+        elif name:
+            result["imports"].append(("static " if is_static else "", name))
+        return j + 1
+
+    def _read_annotation(self, code, tokens, i):
+        """`@Name`, `@a.b.Name` or `@Name(...)` — returns (source text, index after it)."""
+        n = len(tokens)
+        j = i + 1
+        if j >= n or tokens[j][0] != "ident":
+            return None, j
+        end = tokens[j][3]
+        j += 1
+        while j + 1 < n and tokens[j][1] == "." and tokens[j + 1][0] == "ident":
+            end = tokens[j + 1][3]
+            j += 2
+        if j < n and tokens[j][1] == "(":
+            depth = 0
+            while j < n:
+                t = tokens[j][1]
+                if tokens[j][0] == "op":
+                    if t == "(":
+                        depth += 1
+                    elif t == ")":
+                        depth -= 1
+                        if depth == 0:
+                            end = tokens[j][3]
+                            j += 1
+                            break
+                j += 1
+        return code[tokens[i][2]:end], j
 
     # -------------------------
-    # Classes / Interfaces / Enums / Records
+    # Declarations
     # -------------------------
-    def _parse_classes(self, code):
-        return self._parse_types(code, "class")
-
-    def _parse_interfaces(self, code):
-        return self._parse_types(code, "interface")
-
-    def _parse_enums(self, code):
-        return self._parse_types(code, "enum")
-
-    def _parse_records(self, code):
-        return self._parse_types(code, "record")
-
-    def _parse_types(self, code, type_name):
-        pattern = rf'''
-            ((public|private|protected|abstract|final|static)\s+)*
-            {type_name}\s+
-            (\w+)
-            (?:\s+extends\s+([\w<>.,\s]+))?
-            (?:\s+implements\s+([\w<>.,\s]+))?
-        '''
-        matches = re.finditer(pattern, code, re.VERBOSE)
-        results = []
-
-        for m in matches:
-            results.append({
-                "name": m.group(3),
-                "modifiers": m.group(1).strip().split() if m.group(1) else [],
-                "extends": m.group(4).split(",") if m.group(4) else [],
-                "implements": m.group(5).split(",") if m.group(5) else [],
-            })
-        return results
+    def _open_block(self, code, stmt, annotations, top, result):
+        """Classify the declaration in front of a `{`. Returns (frame to push, keep stmt)."""
+        type_pos = self._find_type_keyword(stmt)
+        if type_pos is not None:
+            entry = self._build_type(code, stmt, type_pos, top)
+            result[TYPE_KEYWORDS[stmt[type_pos][1]]].append(entry)
+            base_path = ""
+            for ann in annotations:
+                if re.match(r'@(?:RequestMapping|Path)\b', ann):
+                    base_path = self._extract_path_from_annotation(ann) or ""
+            return _Frame("type", entry, base_path, enum_constants=stmt[type_pos][1] == "enum"), False
+
+        if top is None:
+            return _Frame("block"), False
+
+        paren = self._top_level_index(stmt, "(")
+        equals = self._top_level_index(stmt, "=")
+        if paren is not None and (equals is None or paren < equals):
+            self._add_callable(code, stmt, paren, annotations, top, result)
+            return _Frame("block"), False
+        if equals is not None:
+            # array / lambda initializer of a field: the field ends at the following `;`
+            return _Frame("init"), True
+        # instance or static initializer block
+        return _Frame("block"), False
+
+    def _close_member(self, code, stmt, annotations, top, result):
+        """A declaration in a type body that ends with `;` (field or body-less method)."""
+        paren = self._top_level_index(stmt, "(")
+        equals = self._top_level_index(stmt, "=")
+        if paren is not None and (equals is None or paren < equals):
+            self._add_callable(code, stmt, paren, annotations, top, result)
+        else:
+            self._add_fields(code, stmt, equals, top, result)
+
+    def _find_type_keyword(self, stmt):
+        for k, (kind, text, _, _) in enumerate(stmt):
+            if kind != "ident" or text not in TYPE_KEYWORDS:
+                continue
+            if k > 0 and stmt[k - 1][1] == ".":
+                continue  # Foo.class
+            if k + 1 >= len(stmt) or stmt[k + 1][0] != "ident":
+                continue  # `record(...)` method call / name
+            if text == "record" and (k + 2 >= len(stmt) or stmt[k + 2][1] not in ("(", "<")):
+                continue
+            return k
+        return None
 
-    # -------------------------
-    # Fields
-    # -------------------------
-    def _parse_fields(self, code):
-        pattern = r'''
-            (public|private|protected)?\s*
-            (static|final|transient|volatile)?\s*
-            ([\w<>[\]]+)\s+
-            (\w+)\s*
-            (=.*)?;
-        '''
-        matches = re.finditer(pattern, code, re.VERBOSE)
-        fields = []
-
-        for m in matches:
-            fields.append({
-                "name": m.group(4),
-                "type": m.group(3),
-                "modifiers": [g for g in m.groups()[:2] if g],
+    def _build_type(self, code, stmt, pos, top):
+        modifiers = [t[1] for t in stmt[:pos] if t[1] in MODIFIERS]
+        name = stmt[pos + 1][1]
+        clauses = {"extends": [], "implements": [], "permits": []}
+        current = None
+        depth = 0
+        for tok in stmt[pos + 2:]:
+            t = tok[1]
+            if tok[0] == "op" and t in "(<":
+                depth += 1
+            elif tok[0] == "op" and t in ")>":
+                depth -= 1
+            elif depth == 0 and t in clauses:
+                current = t
+                continue
+            if current is not None:
+                clauses[current].append(tok)
+
+        entry = {
+            "name": name,
+            "modifiers": modifiers,
+            "extends": self._split_types(code, clauses["extends"]),
+            "implements": self._split_types(code, clauses["implements"]),
+            "enclosing": top.type["name"] if top is not None and top.type else None,
+            "fields": [],
+            "methods": [],
+        }
+        if stmt[pos][1] == "enum":
+            entry["constants"] = []
+        return entry
+
+    def _add_enum_constant(self, stmt, top):
+        if stmt and stmt[0][0] == "ident":
+            top.type.setdefault("constants", []).append(stmt[0][1])
+
+    def _add_callable(self, code, stmt, paren, annotations, top, result):
+        if paren == 0 or stmt[paren - 1][0] != "ident":
+            return
+        owner = top.type
+        name = stmt[paren - 1][1]
+        close = self._matching(stmt, paren, "(", ")")
+        parameters = self._parse_param_tokens(code, stmt[paren + 1:close])
+
+        k = 0
+        modifiers = []
+        while k < paren - 1 and stmt[k][1] in MODIFIERS:
+            modifiers.append(stmt[k][1])
+            k += 1
+        if k < paren - 1 and stmt[k][1] == "<":
+            k = self._matching(stmt, k, "<", ">") + 1
+        return_tokens = stmt[k:paren - 1]
+
+        if not return_tokens:
+            access = next((m for m in modifiers if m in ACCESS_MODIFIERS), None)
+            result["constructors"].append({
+                "name": name,
+                "access": access,
+                "parameters": parameters,
+                "class": owner["name"],
             })
-        return fields
+            return
+
+        throws = []
+        for t in range(close + 1, len(stmt)):
+            if stmt[t][1] == "throws":
+                throws = self._split_types(code, [tok for tok in stmt[t + 1:] if tok[1] != "default"])
+                break
+
+        return_type = self._source(code, return_tokens)
+        result["methods"].append({
+            "name": name,
+            "return_type": return_type,
+            "modifiers": modifiers,
+            "parameters": parameters,
+            "throws": throws,
+            "class": owner["name"],
+        })
+        owner["methods"].append(name)
+
+        if annotations:
+            result["apis"].extend(self._api_entries(name, return_type, parameters, annotations, top.base_path))
+
+    def _add_fields(self, code, stmt, equals, top, result):
+        k = 0
+        modifiers = []
+        while k < len(stmt) and stmt[k][1] in MODIFIERS:
+            modifiers.append(stmt[k][1])
+            k += 1
+
+        # the type ends at the identifier in front of the first top-level `=`, `,` or `[`
+        end = len(stmt) if equals is None else equals
+        angle = 0
+        for t in range(k, end):
+            tok = stmt[t][1]
+            if tok == "<":
+                angle += 1
+            elif tok == ">":
+                angle -= 1
+            elif angle == 0 and tok == ",":
+                end = t
+                break
+        name_pos = end - 1
+        while name_pos > k and stmt[name_pos][1] in ("[", "]"):
+            name_pos -= 1
+        if name_pos <= k or stmt[name_pos][0] != "ident":
+            return
+
+        field_type = self._source(code, stmt[k:name_pos])
+        names = [stmt[name_pos][1]]
+
+        # further declarators: `int a = 1, b, c = 2;`
+        depth = 0
+        for t in range(end, len(stmt)):
+            tok = stmt[t]
+            if tok[0] == "op" and tok[1] in "([{":
+                depth += 1
+            elif tok[0] == "op" and tok[1] in ")]}":
+                depth -= 1
+            elif depth == 0 and tok[1] == "," and t + 1 < len(stmt) and stmt[t + 1][0] == "ident":
+                after = stmt[t + 2][1] if t + 2 < len(stmt) else None
+                if after in (None, "=", ",", "["):
+                    names.append(stmt[t + 1][1])
+
+        for name in names:
+            result["fields"].append({
+                "name": name,
+                "type": field_type,
+                "modifiers": modifiers,
+                "class": top.type["name"],
+            })
+            top.type["fields"].append(name)
 
     # -------------------------
-    # Constructors
+    # Token helpers
     # -------------------------
-    def _parse_constructors(self, code):
-        pattern = r'''
-            (public|private|protected)\s+
-            (\w+)\s*
-            \(([^)]*)\)
-        '''
-        matches = re.finditer(pattern, code, re.VERBOSE)
-        return [{
-            "name": m.group(2),
-            "access": m.group(1),
-            "parameters": self._parse_parameters(m.group(3))
-        } for m in matches]
+    def _top_level_index(self, stmt, symbol):
+        depth = 0
+        for k, (kind, text, _, _) in enumerate(stmt):
+            if kind != "op":
+                continue
+            if text == symbol and depth == 0:
+                return k
+            if text in "([{":
+                depth += 1
+            elif text in ")]}":
+                depth -= 1
+        return None
 
-    # -------------------------
-    # Methods
-    # -------------------------
-    def _parse_methods(self, code):
-        pattern = r'''
-            (public|private|protected)?\s*
-            (static|final|abstract|synchronized)?\s*
-            ([\w<>[\]]+)\s+
-            (\w+)\s*
-            \(([^)]*)\)
-            (?:\s+throws\s+([\w.,\s]+))?
-        '''
-        matches = re.finditer(pattern, code, re.VERBOSE)
-        methods = []
-
-        for m in matches:
-            methods.append({
-                "name": m.group(4),
-                "return_type": m.group(3),
-                "modifiers": [g for g in m.groups()[:2] if g],
-                "parameters": self._parse_parameters(m.group(5)),
-                "throws": m.group(6).split(",") if m.group(6) else []
-            })
-        return methods
-
-    def _parse_parameters(self, params):
-        if not params.strip():
-            return []
-        result = []
-        for p in params.split(","):
-            parts = p.strip().split()
-            if len(parts) >= 2:
-                result.append({
-                    "type": " ".join(parts[:-1]),
-                    "name": parts[-1]
-                })
-        return result
-    
-    # -------------------------
-    # Comments
-    # -------------------------
-    def _parse_comments(self, code):
-        javadoc = re.findall(r'/\*\*[\s\S]*?\*/', code)
-        single_line = re.findall(r'//.*', code)
-        return {
-            "javadoc": javadoc,
-            "single_line": single_line
-        }
+    def _matching(self, stmt, open_pos, open_sym, close_sym):
+        depth = 0
+        for k in range(open_pos, len(stmt)):
+            t = stmt[k][1]
+            if t == open_sym:
+                depth += 1
+            elif t == close_sym:
+                depth -= 1
+                if depth == 0:
+                    return k
+        return len(stmt) - 1
+
+    def _source(self, code, toks):
+        if not toks:
+            return ""
+        return " ".join(code[toks[0][2]:toks[-1][3]].split())
+
+    def _split_top_level(self, toks):
+        parts, current, depth = [], [], 0
+        for tok in toks:
+            t = tok[1]
+            if tok[0] == "op" and t in "(<[":
+                depth += 1
+            elif tok[0] == "op" and t in ")>]":
+                depth -= 1
+            elif depth == 0 and t == ",":
+                parts.append(current)
+                current = []
+                continue
+            current.append(tok)
+        if current:
+            parts.append(current)
+        return parts
+
+    def _split_types(self, code, toks):
+        return [self._source(code, p) for p in self._split_top_level(toks) if p]
+
+    def _parse_param_tokens(self, code, toks):
+        params = []
+        for part in self._split_top_level(toks):
+            part = [t for t in part if t[1] != "final"]
+            if len(part) >= 2 and part[-1][0] == "ident":
+                params.append({"type": self._source(code, part[:-1]), "name": part[-1][1]})
+        return params
 
     # -------------------------
     # APIs (Spring MVC / JAX-RS)
     # -------------------------
-    def _parse_apis(self, code):
-        """Parse API endpoints (Spring MVC and JAX-RS).
-        Returns a list of endpoints with name, http_methods, path, return_type, parameters, annotations."""
-        # class-level base paths
-        class_bases = {}
-        class_ann_pattern = r'@(?P<ann>RequestMapping|Path)\s*(\([^)]*\))?[\s\S]*?class\s+(?P<classname>\w+)'
-        for m in re.finditer(class_ann_pattern, code):
-            ann_block = m.group(0)
-            base_path = self._extract_path_from_annotation(ann_block)
-            classname = m.group('classname')
-            class_bases[classname] = base_path or ""
-
-        # collect class positions to map methods to classes
-        class_positions = [(cm.group(1), cm.start()) for cm in re.finditer(r'class\s+(\w+)', code)]
-
-        # method-level annotations and methods
-        method_pattern = r'(?P<annotations>(?:@[A-Za-z0-9_]+\s*(?:\([^)]*\))?\s*)+)\s*(?:public|private|protected)?\s*(?:static|final|synchronized)?\s*([\w<>\[\]]+)\s+(?P<name>\w+)\s*\((?P<params>[^)]*)\)'
+    def _api_entries(self, method_name, return_type, parameters, annotations, base_path):
+        """Endpoints declared by one method's annotations, joined with the class-level base path."""
         apis = []
-        for m in re.finditer(method_pattern, code):
-            ann_block = m.group('annotations')
-            method_name = m.group('name')
-            return_type = m.group(3)
-            params = m.group('params')
-            annotations = re.findall(r'@[\w]+(?:\([^)]*\))?', ann_block)
-
-            # find enclosing class name by position
-            method_pos = m.start()
-            cls_name = None
-            for cname, cpos in class_positions:
-                if cpos < method_pos:
-                    cls_name = cname
-                else:
-                    break
-            base_path = class_bases.get(cls_name, "")
-
-            # find mapping annotations
-            mapping_annos = []
-            for ann in annotations:
-                name_match = re.match(r'@([A-Za-z0-9_]+)', ann)
-                if not name_match:
-                    continue
-                ann_name = name_match.group(1)
-
-                http_methods = []
-                method_path = None
-
-                if ann_name in ("GetMapping", "PostMapping", "PutMapping", "DeleteMapping", "PatchMapping"):
-                    http_methods = [ann_name.replace('Mapping', '').upper()]
-                    method_path = self._extract_path_from_annotation(ann)
-                elif ann_name == 'RequestMapping':
-                    method_path = self._extract_path_from_annotation(ann)
-                    req_method = self._extract_method_from_requestmapping(ann)
-                    if req_method:
-                        http_methods = [req_method]
-                elif ann_name in ("GET", "POST", "PUT", "DELETE", "PATCH"):
-                    http_methods = [ann_name]
-                    # look for @Path in annotations
-                    for a in annotations:
-                        if a.startswith('@Path'):
-                            method_path = self._extract_path_from_annotation(a)
-                elif ann_name == 'Path':
-                    method_path = self._extract_path_from_annotation(ann)
-
-                if http_methods or method_path is not None:
-                    full_path = self._join_paths(base_path, method_path)
-                    apis.append({
-                        "name": method_name,
-                        "http_methods": http_methods if http_methods else [],
-                        "path": full_path,
-                        "return_type": return_type,
-                        "parameters": self._parse_parameters(params),
-                        "annotations": annotations
-                    })
-
+        for ann in annotations:
+            name_match = re.match(r'@([A-Za-z0-9_]+)', ann)
+            if not name_match:
+                continue
+            ann_name = name_match.group(1)
+
+            http_methods = []
+            method_path = None
+
+            if ann_name in HTTP_MAPPINGS:
+                http_methods = [ann_name.replace('Mapping', '').upper()]
+                method_path = self._extract_path_from_annotation(ann)
+            elif ann_name == 'RequestMapping':
+                method_path = self._extract_path_from_annotation(ann)
+                req_method = self._extract_method_from_requestmapping(ann)
+                if req_method:
+                    http_methods = [req_method]
+            elif ann_name in JAXRS_METHODS:
+                http_methods = [ann_name]
+                # look for @Path in annotations
+                for a in annotations:
+                    if a.startswith('@Path'):
+                        method_path = self._extract_path_from_annotation(a)
+            elif ann_name == 'Path' and not any(re.match(rf'@{m}\b', a) for a in annotations for m in JAXRS_METHODS):
+                # a method-level @Path next to @GET etc. was already used above
+                method_path = self._extract_path_from_annotation(ann)
+
+            if http_methods or method_path is not None:
+                apis.append({
+                    "name": method_name,
+                    "http_methods": http_methods,
+                    "path": self._join_paths(base_path, method_path),
+                    "return_type": return_type,
+                    "parameters": parameters,
+                    "annotations": annotations
+                })
         return apis
 
     def _extract_path_from_annotation(self, ann_str: str):
@@ -275,4 +533,3 @@ class JavaParser(BaseParser):
         if not parts:
             return ''
         return '/' + '/'.join(parts)
-
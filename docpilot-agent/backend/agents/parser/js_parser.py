@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class JSParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         imports = self._parse_imports(code)
         exports = self._parse_exports(code)
@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class KotlinParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         imports = re.findall(r"^\s*import\s+([\w\.]+)", code, re.M)
         packages = re.findall(r"^\s*package\s+([\w\.]+)", code, re.M)
@@ -1,15 +1,52 @@
+import asyncio
 import json
 import os
 import re
+import time
 import traceback
 from typing import Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from .base_parser import BaseParser
+from services.llm_engine.response_cache import get_response_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MODEL="gemini-2.5-flash"
+BASE_URL="https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+
+# Batched mode: how many tokens of source to pack into one request, how many
+# requests may be in flight, and how many may start per second.
+BATCH_TOKEN_BUDGET = int(os.getenv("LLM_FALLBACK_BATCH_TOKENS", "12000"))
+BATCH_MAX_FILES = int(os.getenv("LLM_FALLBACK_BATCH_MAX_FILES", "20"))
+BATCH_CONCURRENCY = int(os.getenv("LLM_FALLBACK_CONCURRENCY", "4"))
+BATCH_RATE_PER_SEC = float(os.getenv("LLM_FALLBACK_RATE_PER_SEC", "2"))
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for packing decisions
+    return len(text) // 4 + 1
+
+
+class _RateLimiter:
+    """Spaces request start times at least 1/rate seconds apart."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = asyncio.Lock()
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 class LLMFallbackParser(BaseParser):
     """
     Fallback parser that uses an LLM when available, otherwise uses a local
@@ -17,14 +54,17 @@ class LLMFallbackParser(BaseParser):
 
     Usage: parse_file(file_path, language)
       - language: a best-effort string (e.g., 'elixir', 'haskell', ...).
+
+    For many files use parse_files([(file_path, language), ...]): small files
+    are packed into multi-file requests and requests run concurrently.
     """
 
     def __init__(self):
-        api_key = os.getenv("gemini_api_key")
-        if api_key:
+        self.api_key = os.getenv("gemini_api_key")
+        if self.api_key:
             self.client = OpenAI(
-                api_key=api_key,
-                base_url="https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+                api_key=self.api_key,
+                base_url=BASE_URL
             )
         else:
             # don't raise here — prefer graceful heuristic fallback
@@ -76,11 +116,27 @@ class LLMFallbackParser(BaseParser):
             }
         }
 
+    def _extract_json(self, content: str):
+        # Try to parse JSON directly
+        try:
+            return json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            pass
+        # Attempt to extract a JSON blob from the returned text
+        m = re.search(r"(\{[\s\S]*\})", content or "")
+        if m:
+            try:
+                return json.loads(m.group(1))
+            except json.JSONDecodeError:
+                pass
+        return None
+
     # ------------------ Main parse ------------------
     def parse_file(self, file_path: str, language: str) -> dict:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+            return self.parse_source(f.read(), file_path, language)
 
+    def parse_source(self, code: str, file_path: str, language: str = "unknown") -> dict:
         # If LLM client is not configured, use heuristic immediately
         if not self.client:
             return {"status": "heuristic", **self._heuristic_parse(code, language, file_path)}
@@ -96,39 +152,32 @@ Code:
 {code}
 """
 
-        try:
+        def call():
             response = self.client.chat.completions.create(
                 model=MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0
             )
+            return response.choices[0].message.content
 
-            content = response.choices[0].message.content
+        try:
+            # only answers we could pull JSON out of are worth replaying
+            content = get_response_cache().get_or_call(
+                MODEL, prompt, call, validate=lambda c: self._extract_json(c) is not None, temperature=0
+            )
 
-            # Try to parse JSON directly
-            try:
-                parsed = json.loads(content)
+            parsed = self._extract_json(content)
+            if parsed is not None:
                 return {"status": "llm", "file": file_path, "language": language, "parsed": parsed}
-            except json.JSONDecodeError:
-                # Attempt to extract a JSON blob from the returned text
-                m = re.search(r"(\{[\s\S]*\})", content)
-                if m:
-                    blob = m.group(1)
-                    try:
-                        parsed = json.loads(blob)
-                        return {"status": "llm", "file": file_path, "language": language, "parsed": parsed}
-                    except json.JSONDecodeError:
-                        # fall through to heuristic
-                        pass
-
-                # If JSON can't be recovered, include raw LLM output and fallback
-                return {
-                    "status": "llm_error_fallback",
-                    "file": file_path,
-                    "language": language,
-                    "raw_llm": content,
-                    **self._heuristic_parse(code, language, file_path)
-                }
+
+            # If JSON can't be recovered, include raw LLM output and fallback
+            return {
+                "status": "llm_error_fallback",
+                "file": file_path,
+                "language": language,
+                "raw_llm": content,
+                **self._heuristic_parse(code, language, file_path)
+            }
 
         except Exception as e:
             # On any LLM error, fallback to heuristic parser and include error info
@@ -141,3 +190,106 @@ Code:
                 **self._heuristic_parse(code, language, file_path)
             }
 
+    # ------------------ Batched parse ------------------
+    def parse_files(self, items: list[tuple]) -> dict:
+        """Sync entry point for parse_files_async; returns {file_path: result}."""
+        return asyncio.run(self.parse_files_async(items))
+
+    async def parse_files_async(self, items: list[tuple]) -> dict:
+        """`items` are (file_path, language) or, for source not on disk, (file_path, language, code)."""
+        sources = []
+        for file_path, language, *code in items:
+            if code:
+                sources.append((file_path, language, code[0]))
+                continue
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                sources.append((file_path, language, f.read()))
+
+        if not self.client:
+            return {p: {"status": "heuristic", **self._heuristic_parse(code, lang, p)} for p, lang, code in sources}
+
+        client = AsyncOpenAI(api_key=self.api_key, base_url=BASE_URL)
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        limiter = _RateLimiter(BATCH_RATE_PER_SEC)
+
+        async def run(batch):
+            async with semaphore:
+                await limiter.wait()
+                return await self._parse_batch(client, batch)
+
+        results = {}
+        try:
+            for batch_results in await asyncio.gather(*(run(b) for b in self._pack_batches(sources))):
+                results.update(batch_results)
+        finally:
+            await client.close()
+        return results
+
+    def _pack_batches(self, sources):
+        """Greedy packing in input order: a batch closes when the next file would exceed the token budget."""
+        batches, current, used = [], [], 0
+        for item in sources:
+            cost = _estimate_tokens(item[2])
+            if current and (used + cost > BATCH_TOKEN_BUDGET or len(current) >= BATCH_MAX_FILES):
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _parse_batch(self, client, batch) -> dict:
+        # short ids instead of paths keep the response compact and easy to map back
+        blocks = []
+        for i, (file_path, language, code) in enumerate(batch):
+            blocks.append(f"=== FILE f{i} (language: {language}) ===\n{code}")
+
+        prompt = f"""
+You are an expert static code analyzer. Below are {len(batch)} source files, each introduced by a
+line of the form `=== FILE <id> (language: <lang>) ===`. For EACH file extract meaningful structured information.
+Return ONLY valid JSON of the form {{"files": {{"<id>": {{...}}, ...}}}} where each value has keys (optional when absent):
+- packages (list), file_structure (list), classes (list), functions (list), imports (list), api_endpoints (list), interfaces (list), comments (object)
+If you cannot analyze a file precisely, return a best-effort JSON for it; do not include extraneous text.
+
+{chr(10).join(blocks)}
+"""
+
+        async def call():
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0
+            )
+            return response.choices[0].message.content
+
+        results = {}
+        try:
+            content = await get_response_cache().aget_or_call(
+                MODEL, prompt, call, validate=lambda c: isinstance(self._extract_json(c), dict), temperature=0
+            )
+            parsed = self._extract_json(content)
+            per_file = parsed.get("files", {}) if isinstance(parsed, dict) else {}
+
+            for i, (file_path, language, code) in enumerate(batch):
+                file_parsed = per_file.get(f"f{i}")
+                if isinstance(file_parsed, dict):
+                    results[file_path] = {"status": "llm", "file": file_path, "language": language, "parsed": file_parsed}
+                else:
+                    results[file_path] = {
+                        "status": "llm_error_fallback",
+                        "file": file_path,
+                        "language": language,
+                        **self._heuristic_parse(code, language, file_path)
+                    }
+        except Exception as e:
+            # On any LLM error, fallback to heuristic parser per file and include error info
+            for file_path, language, code in batch:
+                results[file_path] = {
+                    "status": "llm_exception_fallback",
+                    "file": file_path,
+                    "language": language,
+                    "error": str(e),
+                    **self._heuristic_parse(code, language, file_path)
+                }
+        return results
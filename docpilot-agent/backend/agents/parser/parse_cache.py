@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..")
+)
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "parse"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") != "0"
+
+# Results in these states are transient (remote LLM failed) and must be retried next time
+UNCACHEABLE_STATUSES = {"llm_error_fallback", "llm_exception_fallback"}
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Same id git assigns to the file content (`git hash-object`)."""
+    h = hashlib.sha1()
+    h.update(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """
+    Persistent, content-addressed cache of parser output.
+
+    Entries are keyed by `<blob sha>:<parser version>` so a file is re-parsed
+    only when its content or the parser that handles it changes. The cache
+    lives in a single SQLite file and is bounded to `max_bytes`; when it grows
+    past the limit the least recently used entries are evicted.
+
+    Lookups are read-only so they can run concurrently from pool workers;
+    `put_many` / `touch` are expected to be called by the owning process.
+    """
+
+    def __init__(self, cache_dir: str | None = None, max_bytes: int | None = None):
+        self.cache_dir = cache_dir or PARSE_CACHE_DIR
+        self.max_bytes = max_bytes or PARSE_CACHE_MAX_BYTES
+        self.path = os.path.join(self.cache_dir, "parse_cache.sqlite3")
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # one connection per thread (and per process, since workers build their own ParseCache)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(blob_sha: str, parser_version: str) -> str:
+        return f"{blob_sha}:{parser_version}"
+
+    @staticmethod
+    def is_cacheable(result: dict | None) -> bool:
+        return bool(result) and "error" not in result and result.get("status") not in UNCACHEABLE_STATUSES
+
+    # ------------------ Reads ------------------
+    def get(self, key: str) -> dict | None:
+        row = self._connect().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def contains_many(self, keys: list[str]) -> set[str]:
+        """The subset of `keys` that is cached, without loading the values."""
+        found = set()
+        conn = self._connect()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = conn.execute(f"SELECT key FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(r[0] for r in rows)
+        return found
+
+    # ------------------ Writes ------------------
+    def touch(self, keys: list[str]):
+        if not keys:
+            return
+        now = time.time()
+        with self._write_lock, self._connect() as conn:
+            conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", [(now, k) for k in keys])
+
+    def put_many(self, items: list[tuple[str, dict]]):
+        rows = []
+        now = time.time()
+        for key, result in items:
+            if not self.is_cacheable(result):
+                continue
+            value = json.dumps(result, default=str)
+            rows.append((key, value, len(value), now))
+        if not rows:
+            return
+
+        with self._write_lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO entries(key, value, size, last_access) VALUES (?, ?, ?, ?)", rows)
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # trim to 90% of the budget so we do not evict on every single write
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= target:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        print(f"[ParseCache] Evicted {len(doomed)} entries ({freed} bytes)")
+
+    def clear(self):
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
@@ -0,0 +1,367 @@
+import os
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .parser_manager import ParserManager
+from .base_parser import decode_source
+from .parse_cache import ParseCache, PARSE_CACHE_ENABLED, git_blob_sha
+from .file_classifier import FileClassifier, SKIP, FALLBACK, VENDORED_DIRS, record_decision
+from backend.utils.repo_walker import RepoWalker, list_git_index
+from backend.utils.git_source import BlobReader, GitCommitSource
+from backend.utils.ignore_rules import IgnoreRules
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", "64"))
+# Below this many files the pool start-up / IPC cost outweighs the speedup
+PARSE_INLINE_THRESHOLD = int(os.getenv("PARSE_INLINE_THRESHOLD", "32"))
+# "scandir" walks the checkout, "git_index" lists files from the git index
+PARSE_WALK_MODE = os.getenv("PARSE_WALK_MODE", "scandir")
+# With git_index, also list untracked (not ignored) files; costs a walk of the working tree
+PARSE_INCLUDE_UNTRACKED = os.getenv("PARSE_INCLUDE_UNTRACKED", "0") == "1"
+# Collect LLM-fallback files and parse them in packed, concurrent batches at the end
+LLM_FALLBACK_BATCH = os.getenv("LLM_FALLBACK_BATCH", "1") != "0"
+
+# deferred: an LLM-fallback file the parent will parse in a batch (result is None until then)
+_Outcome = namedtuple("_Outcome", "path result key hit decision reason deferred")
+
+
+# ------------------ Worker side ------------------
+# Each worker process builds one ParserManager in the pool initializer and
+# keeps it warm for every chunk it receives (compiled regexes, LLM client).
+_worker_manager = None
+_worker_cache = None
+_worker_reader = None  # BlobReader of the repository the last git-sourced chunk came from
+_content_classifier = FileClassifier()
+
+
+def _init_worker(cache_dir: str | None = None, cache_max_bytes: int | None = None):
+    global _worker_manager, _worker_cache
+    _worker_manager = ParserManager()
+    if cache_dir:
+        _worker_cache = ParseCache(cache_dir, cache_max_bytes)
+
+
+def _get_worker_reader(repo_path: str) -> BlobReader:
+    global _worker_reader
+    if _worker_reader is None or _worker_reader.repo_path != repo_path:
+        if _worker_reader is not None:
+            _worker_reader.close()
+        _worker_reader = BlobReader(repo_path)
+    return _worker_reader
+
+
+def _parse_blob(manager: ParserManager, cache: ParseCache | None, item: tuple, reader: BlobReader,
+                defer_fallback: bool = False) -> _Outcome:
+    """_parse_one for a file of a GitCommitSource: the blob id is the cache key, so hits read nothing."""
+    file_path, decision, reason, (sha, size) = item
+    if size is not None:
+        decision, reason = _content_classifier.classify_size(decision, reason, size)
+        if decision == SKIP:
+            return _Outcome(file_path, None, None, False, decision, reason, False)
+
+    key = cache.make_key(sha, manager.parser_version(file_path)) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            cached["file"] = file_path
+            return _Outcome(file_path, cached, key, True, decision, reason, False)
+
+    try:
+        data = reader.read(sha)
+    except Exception:
+        return _Outcome(file_path, None, None, False, SKIP, "unreadable", False)
+    if size is None:
+        # not downloaded when the source was listed (batch prefetch failed): check the size now
+        decision, reason = _content_classifier.classify_size(decision, reason, len(data))
+        if decision == SKIP:
+            return _Outcome(file_path, None, None, False, decision, reason, False)
+    decision, reason = _content_classifier.classify_head(decision, reason, data)
+    if decision == SKIP:
+        return _Outcome(file_path, None, None, False, decision, reason, False)
+    if defer_fallback and decision == FALLBACK:
+        return _Outcome(file_path, None, key, False, decision, reason, True)
+
+    try:
+        return _Outcome(file_path, manager.parse_source(file_path, data), key, False, decision, reason, False)
+    except Exception as e:
+        return _Outcome(file_path, {"file": file_path, "error": str(e)}, None, False, decision, reason, False)
+
+
+def _parse_one(manager: ParserManager, cache: ParseCache | None, item: tuple[str, str, str], defer_fallback: bool = False) -> _Outcome:
+    """
+    `item` is (path, decision, reason) from the path classifier.
+    Workers only read the cache; the parent writes it.
+    """
+    file_path, decision, reason = item
+    # size cap + binary sniff before the file is read in full (or sent to the LLM)
+    decision, reason = _content_classifier.classify_content(file_path, decision, reason)
+    if decision == SKIP:
+        return _Outcome(file_path, None, None, False, decision, reason, False)
+
+    key = None
+    if cache is not None:
+        try:
+            with open(file_path, "rb") as f:
+                key = cache.make_key(git_blob_sha(f.read()), manager.parser_version(file_path))
+            cached = cache.get(key)
+            if cached is not None:
+                # same content can live at several paths, so the path is always the caller's
+                cached["file"] = file_path
+                return _Outcome(file_path, cached, key, True, decision, reason, False)
+        except OSError:
+            key = None
+
+    if defer_fallback and decision == FALLBACK:
+        return _Outcome(file_path, None, key, False, decision, reason, True)
+
+    try:
+        return _Outcome(file_path, manager.parse(file_path), key, False, decision, reason, False)
+    except Exception as e:
+        return _Outcome(file_path, {"file": file_path, "error": str(e)}, None, False, decision, reason, False)
+
+
+def _parse_chunk(items: list[tuple], defer_fallback: bool = False, git_repo: str | None = None) -> list[_Outcome]:
+    if git_repo is not None:
+        reader = _get_worker_reader(git_repo)
+        return [_parse_blob(_worker_manager, _worker_cache, item, reader, defer_fallback) for item in items]
+    return [_parse_one(_worker_manager, _worker_cache, item, defer_fallback) for item in items]
+
+
+# ------------------ Engine ------------------
+class ParseEngine:
+    """
+    Parses a repository by fanning files out to a process pool.
+
+    Files are sorted before being split into chunks of `chunk_size` paths,
+    and chunk results are yielded in submission order, so the output is
+    always in deterministic path order regardless of which worker finished
+    first. At most `workers * 2` chunks are in flight at any time.
+
+    Every file is classified first (see FileClassifier): vendored, generated,
+    ignored, oversized and binary files are skipped before they are read in
+    full, so they never reach a parser or the LLM fallback.
+
+    When a ParseCache is attached, unchanged files (same blob sha and parser
+    version) are served from it instead of being parsed again.
+
+    With `batch_fallback`, files that need the LLM fallback (and missed the
+    cache) are collected and parsed together at the end through
+    LLMFallbackParser.parse_files, so they are yielded after the statically
+    parsed files (still in path order among themselves).
+    """
+
+    def __init__(self, workers: int | None = None, chunk_size: int | None = None, cache: ParseCache | None = None,
+                 batch_fallback: bool = LLM_FALLBACK_BATCH):
+        self.workers = max(1, workers or PARSE_WORKERS)
+        self.chunk_size = max(1, chunk_size or PARSE_CHUNK_SIZE)
+        self.cache = cache
+        self.batch_fallback = batch_fallback
+        self._pool = None
+        self._local_manager = None
+        # request threads and job workers share one engine: create the pool / manager once
+        self._init_lock = threading.Lock()
+
+    # ------------------ Pool lifecycle ------------------
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._init_lock:
+                if self._pool is None:
+                    initargs = (self.cache.cache_dir, self.cache.max_bytes) if self.cache else ()
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                     initargs=initargs)
+        return self._pool
+
+    def _get_local_manager(self) -> ParserManager:
+        if self._local_manager is None:
+            with self._init_lock:
+                if self._local_manager is None:
+                    self._local_manager = ParserManager()
+        return self._local_manager
+
+    def parser_fingerprint(self) -> str:
+        return self._get_local_manager().fingerprint()
+
+    def shutdown(self):
+        with self._init_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # ------------------ File collection ------------------
+    def collect_files(self, repo_path: str, stats: dict | None = None) -> list[str]:
+        """
+        All files under `repo_path`, without descending into vendored or
+        git-ignored directories. With PARSE_WALK_MODE=git_index the list
+        comes straight from the git index (no directory stat calls at all;
+        untracked files only with PARSE_INCLUDE_UNTRACKED=1).
+        """
+        # .git is a file in a (mirror) worktree
+        if PARSE_WALK_MODE == "git_index" and os.path.exists(os.path.join(repo_path, ".git")):
+            try:
+                return [os.path.join(repo_path, p) for p in list_git_index(repo_path, PARSE_INCLUDE_UNTRACKED)]
+            except Exception as e:
+                print(f"[ParseEngine] git index listing failed, walking the tree instead: {e}")
+
+        walker = RepoWalker(repo_path, skip_dirs=VENDORED_DIRS)
+        files = sorted(e.path for e in walker.walk_files())
+        record_decision(stats, SKIP, "pruned_dir", walker.pruned_dirs)
+        return files
+
+    # ------------------ Parsing ------------------
+    def _record(self, outcomes: list[_Outcome], stats: dict | None, deferred: list[_Outcome] | None = None):
+        """Writes cache misses / refreshes hits in the parent and yields the results."""
+        hits = []
+        misses = []
+        parsed = 0
+        for o in outcomes:
+            record_decision(stats, o.decision, o.reason)
+            if o.decision == SKIP:
+                continue
+            parsed += 1
+            if o.hit:
+                hits.append(o.key)
+            elif o.deferred:
+                deferred.append(o)
+            elif o.key is not None:
+                misses.append((o.key, o.result))
+
+        if self.cache is not None:
+            self.cache.touch(hits)
+            self.cache.put_many(misses)
+        if stats is not None:
+            stats["cache_hits"] = stats.get("cache_hits", 0) + len(hits)
+            stats["cache_misses"] = stats.get("cache_misses", 0) + parsed - len(hits)
+
+        for o in outcomes:
+            if o.result:
+                yield o.result
+
+    def _parse_deferred(self, deferred: list[_Outcome], stats: dict | None, source: GitCommitSource | None = None):
+        """Parse the collected LLM-fallback files in packed, concurrent batches."""
+        manager = self._get_local_manager()
+        if source is None:
+            items = [(o.path, manager.fallback_language(o.path)) for o in deferred]
+        else:
+            items = [(o.path, manager.fallback_language(o.path), decode_source(source.read(o.path))) for o in deferred]
+        try:
+            results = manager.llm_fallback.parse_files(items)
+        except Exception as e:
+            results = {o.path: {"file": o.path, "error": str(e)} for o in deferred}
+
+        if self.cache is not None:
+            self.cache.put_many([(o.key, results.get(o.path)) for o in deferred if o.key is not None])
+        if stats is not None:
+            stats["fallback_batched"] = stats.get("fallback_batched", 0) + len(deferred)
+
+        for o in deferred:
+            if results.get(o.path):
+                yield results[o.path]
+
+    def _prefetch_blobs(self, paths: list[str], source: GitCommitSource, stats: dict | None):
+        """
+        One batch fetch for the blobs of `paths` a partial clone lacks; cached
+        files need none. (Sizes of missing blobs are unknown, so oversized
+        files are downloaded too, just never read.)
+        """
+        if not source.missing:
+            return
+        manager = self._get_local_manager()
+        if self.cache is not None:
+            keys = {path: self.cache.make_key(source.blob(path)[0], manager.parser_version(path)) for path in paths}
+            cached = self.cache.contains_many(list(keys.values()))
+            paths = [path for path in paths if keys[path] not in cached]
+        fetched = source.prefetch(paths)
+        if stats is not None:
+            stats["blobs_prefetched"] = stats.get("blobs_prefetched", 0) + fetched
+
+    def iter_parse(self, file_paths: list[str], stats: dict | None = None, repo_path: str | None = None,
+                   source: GitCommitSource | None = None):
+        """
+        Yield parse results (skipping empty ones) in the order of `file_paths`.
+        `repo_path` enables .gitignore-aware classification. If `stats` is
+        given it is filled with classification and cache hit/miss counters.
+        With a `source`, file contents come from that commit's blobs instead
+        of the disk (`file_paths` are source.files()).
+        """
+        if source is None:
+            classifier = FileClassifier(repo_path)
+        else:
+            # committed files are parsed whatever the .gitignore says (and it may not be checked out)
+            classifier = FileClassifier(source.repo_path, ignore_rules=IgnoreRules())
+        items = []
+        for p in file_paths:
+            decision, reason = classifier.classify_path(p)
+            if decision == SKIP:
+                record_decision(stats, decision, reason)
+            else:
+                items.append((p, decision, reason))
+        if source is not None:
+            self._prefetch_blobs([item[0] for item in items], source, stats)
+            items = [(*item, source.blob(item[0])) for item in items]
+
+        deferred = []
+        if self.workers == 1 or len(items) <= PARSE_INLINE_THRESHOLD:
+            manager = self._get_local_manager()
+            for i in range(0, len(items), self.chunk_size):
+                chunk = items[i:i + self.chunk_size]
+                if source is None:
+                    outcomes = [_parse_one(manager, self.cache, item, self.batch_fallback) for item in chunk]
+                else:
+                    outcomes = [_parse_blob(manager, self.cache, item, source.reader, self.batch_fallback) for item in chunk]
+                yield from self._record(outcomes, stats, deferred)
+        else:
+            yield from self._iter_pool(items, stats, deferred, source.repo_path if source else None)
+
+        if deferred:
+            yield from self._parse_deferred(deferred, stats, source)
+
+    def _iter_pool(self, items, stats, deferred, git_repo: str | None = None):
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        max_in_flight = self.workers * 2
+
+        try:
+            pool = self._get_pool()
+            pending = deque()
+            next_chunk = 0
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                    pending.append(pool.submit(_parse_chunk, chunks[next_chunk], self.batch_fallback, git_repo))
+                    next_chunk += 1
+
+                yield from self._record(pending.popleft().result(), stats, deferred)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge file); drop the pool so the next call starts fresh
+            with self._init_lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+
+    def parse_files(self, file_paths: list[str], stats: dict | None = None, repo_path: str | None = None,
+                    source: GitCommitSource | None = None) -> list[dict]:
+        # batched fallback results arrive last; restore the caller's path order
+        order = {p: i for i, p in enumerate(file_paths)}
+        results = list(self.iter_parse(file_paths, stats, repo_path, source))
+        results.sort(key=lambda r: order.get(r.get("file"), len(order)))
+        return results
+
+    def parse_repo(self, repo_path: str, stats: dict | None = None) -> list[dict]:
+        return self.parse_files(self.collect_files(repo_path, stats), stats, repo_path)
+
+    def parse_commit(self, repo_path: str, commit: str = "HEAD", stats: dict | None = None,
+                     sparse_paths: list[str] | None = None) -> list[dict]:
+        """
+        parse_repo for the tree of `commit`, read from the object database
+        (`repo_path` may be a checkout, a worktree or a bare mirror). Result
+        paths are the ones a checkout at `repo_path` would have; with
+        `sparse_paths` only the files a sparse checkout of them would have.
+        """
+        with GitCommitSource(repo_path, commit, sparse_paths) as source:
+            if stats is not None:
+                stats["commit"] = source.commit
+            return self.parse_files(source.files(), stats, repo_path, source)
+
+
+def default_cache() -> ParseCache | None:
+    return ParseCache() if PARSE_CACHE_ENABLED else None
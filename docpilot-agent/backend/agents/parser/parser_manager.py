@@ -1,4 +1,5 @@
 from .language_detector import detect_language
+from .base_parser import decode_source
 from .python_parser import PythonParser
 from .java_parser import JavaParser
 from .js_parser import JSParser
@@ -43,11 +44,40 @@ class ParserManager:
         lang = detect_language(file_path)
         if not lang:
             # Unknown extension — use LLM fallback with extension as a hint
-            from pathlib import Path
-            ext = Path(file_path).suffix.lstrip('.').lower() or 'unknown'
-            return self.llm_fallback.parse_file(file_path, ext)
+            return self.llm_fallback.parse_file(file_path, self.fallback_language(file_path))
 
         # Use static parser if available
         if lang in self.parsers:
             return self.parsers[lang].parse_file(file_path)
 
+    def parse_source(self, file_path: str, data: bytes) -> dict | None:
+        """parse() for content that is not read from `file_path` (e.g. a git blob); the path picks the parser."""
+        lang = detect_language(file_path)
+        if not lang:
+            return self.llm_fallback.parse_source(decode_source(data), file_path, self.fallback_language(file_path))
+
+        if lang in self.parsers:
+            parser = self.parsers[lang]
+            return parser.parse_source(decode_source(data, parser.ENCODING_ERRORS), file_path)
+
+    def parser_version(self, file_path: str) -> str:
+        """Version stamp of the parser that handles `file_path` (used in parse-cache keys)."""
+        lang = detect_language(file_path)
+        if lang in self.parsers:
+            parser = self.parsers[lang]
+            return f"{type(parser).__name__}:{parser.VERSION}"
+
+        # fallback output embeds the extension hint, so it is part of the stamp
+        return f"{type(self.llm_fallback).__name__}:{self.llm_fallback.VERSION}:{self.fallback_language(file_path)}"
+
+    def fingerprint(self) -> str:
+        """Versions of every parser, e.g. for invalidating whole-repo parse artifacts after a parser change."""
+        stamps = sorted(f"{type(p).__name__}:{p.VERSION}" for p in self.parsers.values())
+        stamps.append(f"{type(self.llm_fallback).__name__}:{self.llm_fallback.VERSION}")
+        return ",".join(stamps)
+
+    def fallback_language(self, file_path: str) -> str:
+        """Language hint handed to the LLM fallback: the file extension."""
+        from pathlib import Path
+        return Path(file_path).suffix.lstrip('.').lower() or 'unknown'
+
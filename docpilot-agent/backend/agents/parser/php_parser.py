@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class PHPParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         # strip opening <?php tag if present
         code_body = re.sub(r"^\s*<\?php", "", code, flags=re.I)
@@ -2,10 +2,11 @@ import ast
 from .base_parser import BaseParser
 
 class PythonParser(BaseParser):
+    VERSION = "2"
+    # undecodable source is reported as a failure instead of being parsed with bytes dropped
+    ENCODING_ERRORS = "strict"
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         try:
             tree = ast.parse(code)
@@ -73,6 +74,16 @@ class PythonParser(BaseParser):
                 decs.append({"name": name, "args": args, "kwargs": kwargs})
             return decs
 
+        def _parse_calls(fn_node):
+            # call targets in source order, e.g. "helper", "self.save", "db.session.add"
+            calls = []
+            for n in ast.walk(fn_node):
+                if isinstance(n, ast.Call):
+                    target = _expr_to_str(n.func)
+                    if target and "(" not in target and "[" not in target:
+                        calls.append(target)
+            return list(dict.fromkeys(calls))
+
         def _is_endpoint_decorator(dec):
             if not dec or 'name' not in dec:
                 return False
@@ -106,7 +117,8 @@ class PythonParser(BaseParser):
                             "params": _parse_parameters(cbody),
                             "returns": _expr_to_str(cbody.returns),
                             "decorators": _parse_decorators(cbody.decorator_list),
-                            "docstring": ast.get_docstring(cbody)
+                            "docstring": ast.get_docstring(cbody),
+                            "calls": _parse_calls(cbody)
                         }
                         class_obj['methods'].append(m)
                         # endpoint detection on methods
@@ -133,7 +145,8 @@ class PythonParser(BaseParser):
                     "params": _parse_parameters(node),
                     "returns": _expr_to_str(node.returns),
                     "decorators": _parse_decorators(node.decorator_list),
-                    "docstring": ast.get_docstring(node)
+                    "docstring": ast.get_docstring(node),
+                    "calls": _parse_calls(node)
                 }
                 functions.append(fn)
                 # endpoint detection on functions
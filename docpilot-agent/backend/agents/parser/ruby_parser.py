@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class RubyParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         imports = re.findall(r"^\s*(?:require|require_relative|load)\s+[\"']([^\"']+)[\"']", code, re.M)
         classes = re.findall(r"^\s*class\s+([A-Z]\w+)", code, re.M)
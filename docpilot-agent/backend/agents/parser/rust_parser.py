@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class RustParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         uses = re.findall(r"^\s*use\s+([^;]+);", code, re.M)
         extern_crates = re.findall(r"^\s*extern\s+crate\s+([\w_]+)", code, re.M)
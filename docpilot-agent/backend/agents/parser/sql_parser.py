@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class SQLParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         # Counts
         selects = len(re.findall(r"\bSELECT\b", code, re.I))
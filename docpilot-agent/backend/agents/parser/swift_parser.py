@@ -3,9 +3,7 @@ from .base_parser import BaseParser
 
 class SwiftParser(BaseParser):
 
-    def parse_file(self, file_path: str) -> dict:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            code = f.read()
+    def parse_source(self, code: str, file_path: str) -> dict:
 
         imports = re.findall(r"^\s*import\s+([A-Za-z0-9_\.]+)", code, re.M)
         classes = re.findall(r"^\s*(?:public\s+|internal\s+|private\s+)?class\s+([A-Z][A-Za-z0-9_]+)", code, re.M)
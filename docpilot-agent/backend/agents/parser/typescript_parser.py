@@ -44,6 +44,9 @@ class TypeScriptParser(BaseParser):
             raw = path.read_text(encoding='utf-8', errors='ignore')
         except Exception as e:
             return {"file": file_path, "language": "typescript", "error": f"could not read file: {e}"}
+        return self.parse_source(raw, file_path)
+
+    def parse_source(self, raw: str, file_path: str) -> dict:
 
         # quick normalize (remove long block comments to reduce false positives)
         code = re.sub(r'/\*[\s\S]*?\*/', '', raw)
@@ -1,11 +1,154 @@
-from fastapi import APIRouter 
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
 from git import Repo
+import os
+
+from backend.api.parser_api import engine, _checked_out, _resolve_repo_path, _shared_lock
+from backend.db.data import user_repo_db
+from backend.db.repo_queries import get_repo_by_url
+from backend.db.commit_queries import get_last_commit, insert_commit, update_commit
+from backend.utils.git_source import GitCommitSource
 
 router=APIRouter()
+
+
+class IncrementalParseRequest(BaseModel):
+    proj_name: str
+    base_commit: str | None = None  # defaults to the last processed commit stored in Supabase
+    update_last_commit: bool = True
+
+
+def compute_change_set(repo_path: str, base_commit: str | None, head: str = "HEAD") -> dict:
+    """
+    Files changed between `base_commit` and `head`, grouped by change type.
+    Paths are relative to the repository root. When there is no usable base
+    (first run, or the base is not in the local history) every tracked file
+    is reported as added and `full` is set.
+    """
+    repo = Repo(repo_path)
+    head_sha = repo.commit(head).hexsha
+    change_set = {
+        "base_commit": base_commit,
+        "head_commit": head_sha,
+        "full": False,
+        "added": [],
+        "modified": [],
+        "deleted": [],
+        "renamed": [],
+    }
+
+    base_sha = None
+    if base_commit:
+        try:
+            base_sha = repo.commit(base_commit).hexsha
+        except Exception:
+            print(f"[CodeWatcher] Base commit {base_commit} not found locally, falling back to full parse")
+
+    if base_sha is None:
+        change_set["full"] = True
+        change_set["added"] = [p for p in repo.git.ls_tree("-r", "--name-only", "-z", head_sha).split("\0") if p]
+        return change_set
+
+    if base_sha == head_sha:
+        return change_set
+
+    fields = repo.git.diff("--name-status", "-M", "-z", base_sha, head_sha).split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i][0]
+        if status in ("R", "C"):
+            old_path, new_path = fields[i + 1], fields[i + 2]
+            if status == "R":
+                change_set["renamed"].append({"from": old_path, "to": new_path})
+            else:
+                change_set["added"].append(new_path)
+            i += 3
+            continue
+
+        path = fields[i + 1]
+        if status == "A":
+            change_set["added"].append(path)
+        elif status == "D":
+            change_set["deleted"].append(path)
+        else:
+            # M (modified), T (type change), U (unmerged) all mean "re-parse this path"
+            change_set["modified"].append(path)
+        i += 2
+
+    return change_set
+
+
+def _get_repo_id(proj_name: str):
+    repo_url = user_repo_db.get(proj_name, {}).get("repo_url")
+    if not repo_url:
+        return None
+    existing = get_repo_by_url(repo_url)
+    return existing.data[0]["id"] if existing.data else None
+
+
+def _get_last_processed_commit(repo_id) -> str | None:
+    try:
+        row = get_last_commit(repo_id).data
+    except Exception:
+        # .single() raises when the repo has never been processed
+        return None
+    return row.get("last_commit") if row else None
+
+
 @router.get("/getChangedFiles")
-def codeWatcher(projUrl:str):
-    repo=Repo(projUrl)
-    files=repo.git.diff("--name-only","HEAD~1","HEAD")
-    final_list=files.split("\n")
+def codeWatcher(projUrl:str, base:str="HEAD~1", head:str="HEAD"):
+    change_set=compute_change_set(projUrl, base, head)
+    final_list=change_set["added"]+change_set["modified"]+change_set["deleted"]+[r["to"] for r in change_set["renamed"]]
     print(final_list)
-    return {"changed_Files":final_list}
\ No newline at end of file
+    return {"changed_Files":final_list, "change_set":change_set}
+
+
+# Re-parse only the files touched between the last processed commit and the checked-out commit
+@router.post("/parse-repo/incremental")
+def incremental_parse(request: IncrementalParseRequest):
+    proj_name = request.proj_name
+
+    repo_id = _get_repo_id(proj_name)
+    last_commit = _get_last_processed_commit(repo_id) if repo_id is not None else None
+    base_commit = request.base_commit or last_commit
+
+    stats = {}
+    # a /getRepo or an eviction must not rewrite the checkout between the diff and the parse
+    with _shared_lock(proj_name):
+        repo_path = _resolve_repo_path(proj_name)
+        entry = user_repo_db[proj_name]
+        checked_out = _checked_out(proj_name)
+        # Checkout=False: repo_path is the shared mirror, whose HEAD is not this project's commit
+        head = "HEAD" if checked_out else entry.get("commit") or "HEAD"
+
+        try:
+            change_set = compute_change_set(repo_path, base_commit, head)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not compute change set: {str(e)}")
+
+        to_parse = change_set["added"] + change_set["modified"] + [r["to"] for r in change_set["renamed"]]
+        if checked_out:
+            file_paths = [p for p in (os.path.join(repo_path, p) for p in sorted(to_parse)) if os.path.isfile(p)]
+            parsed_files = engine.parse_files(file_paths, stats, repo_path)
+        else:
+            with GitCommitSource(repo_path, change_set["head_commit"], entry.get("sparse_paths")) as source:
+                file_paths = [p for p in (os.path.join(source.repo_path, p) for p in sorted(to_parse))
+                              if p in source.entries]
+                parsed_files = engine.parse_files(file_paths, stats, repo_path, source)
+    print(f"[Incremental Parse] {proj_name}: {len(parsed_files)} files re-parsed, {len(change_set['deleted'])} deleted")
+
+    # head_commit is the tree that was just parsed, so the next run diffs from there
+    if request.update_last_commit and repo_id is not None:
+        if last_commit is None:
+            insert_commit(repo_id, change_set["head_commit"])
+        else:
+            update_commit(repo_id, change_set["head_commit"])
+
+    return {
+        "status": "success",
+        "project": proj_name,
+        "change_set": change_set,
+        "total_files": len(parsed_files),
+        "stats": stats,
+        "data": parsed_files
+    }
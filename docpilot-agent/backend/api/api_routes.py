@@ -2,6 +2,11 @@ from fastapi import APIRouter
 from backend.api.tree_structure_api import router as structure_router
 from backend.api.parser_api import router as parser_router
 from backend.api.docgen_api import do_gen_router
+from backend.api.llm_cache_api import llm_cache_router
+from backend.api.kg_schema_api import kg_schema_router
+from backend.api.kg_cache_api import kg_cache_router
+from backend.api.jobs_api import jobs_router
+from backend.api.pipeline_api import pipeline_router
 router = APIRouter()
 
 #Include Parser Router
@@ -9,4 +14,14 @@ router.include_router(parser_router)
 #Include DocGen Router
 router.include_router(do_gen_router)
 # Include Structure Router
-router.include_router(structure_router)
\ No newline at end of file
+router.include_router(structure_router)
+# Include LLM Cache Router
+router.include_router(llm_cache_router)
+# Include KG Schema Router
+router.include_router(kg_schema_router)
+# Include KG Snapshot Cache Router
+router.include_router(kg_cache_router)
+# Include Jobs Router
+router.include_router(jobs_router)
+# Include Pipeline Router
+router.include_router(pipeline_router)
\ No newline at end of file
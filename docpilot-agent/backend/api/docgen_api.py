@@ -1,25 +1,50 @@
 from fastapi import APIRouter, HTTPException
-from backend.agents.docgen.doc_generator import generate_docs
+from fastapi.responses import StreamingResponse
+from backend.agents.docgen.doc_generator import generate_docs, stream_docs
+import json
 
 from backend.api.parser_api import RepoNameRequest
 do_gen_router = APIRouter()
 
 #DocGen Integration Endpoint
 @do_gen_router.post("/generate-docs")
-def generate_documentation(request: RepoNameRequest):
+def generate_documentation(request: RepoNameRequest, refresh: bool = False):
     projName=request.proj_name
 
     # if projName not in user_repo_db:
     #     raise HTTPException(status_code=404, detail="Project not found in UserRepos")
     
     try:
-        documentation=generate_docs(projName)
+        result=generate_docs(projName, bypass_cache=refresh)
     except Exception as e:
         raise HTTPException(status_code=500,detail=f"Failed to generate documenetation with error: {str(e)} ")
     
     return{
         "message": "Documentation generated successfully",
-        "documentation": documentation,
+        "documentation": result["markdown"],
+        "stats": result["stats"],
+        "incremental": result["incremental"],
         "project": projName,
         "status": "success"
-    }
\ No newline at end of file
+    }
+
+
+# Server-sent events variant: module progress, then each README section token by token
+# (event: start | module | section_start | token | section_end | done | error)
+@do_gen_router.post("/generate-docs/stream")
+async def generate_documentation_stream(request: RepoNameRequest, refresh: bool = False):
+    projName=request.proj_name
+
+    async def sse_events():
+        try:
+            async for event, data in stream_docs(projName, bypass_cache=refresh):
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        except Exception as e:
+            print(f"[DocGen] Streaming failed for {projName}: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        sse_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from backend.jobs import handlers  # registers the built-in job kinds
+from backend.jobs.worker import HANDLERS, enqueue, get_job_store
+
+jobs_router = APIRouter()
+
+
+class JobRequest(BaseModel):
+    kind: str                   # clone | parse | cypher | docgen
+    payload: dict = {}
+    max_attempts: int | None = None
+
+
+def _public(job: dict) -> dict:
+    # never hand the clone token back out
+    payload = job["payload"]
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k != "AuthToken"}
+    return {**job, "payload": payload}
+
+
+# Queue a job and return right away; poll GET /jobs/{id} for status and progress
+@jobs_router.post("/jobs", status_code=202)
+def create_job(request: JobRequest):
+    if request.kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind '{request.kind}', expected one of {sorted(HANDLERS)}")
+    job = enqueue(request.kind, request.payload, max_attempts=request.max_attempts)
+    print(f"[Jobs] Queued {request.kind} job {job['id']}")
+    return {"status": "queued", "job_id": job["id"], "job": _public(job)}
+
+
+@jobs_router.get("/jobs")
+def list_jobs(status: str | None = None, kind: str | None = None, limit: int = 50):
+    store = get_job_store()
+    return {"status": "success", "counts": store.counts(), "jobs": [_public(j) for j in store.list(status, kind, min(limit, 500))]}
+
+
+@jobs_router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _public(job)
+
+
+@jobs_router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = get_job_store().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "success", "job": _public(job)}
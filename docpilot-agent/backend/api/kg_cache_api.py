@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from backend.agents.kg_builder.kg_snapshot_cache import get_snapshot_cache
+
+kg_cache_router = APIRouter()
+
+
+@kg_cache_router.get("/kg/cache")
+def kg_cache_stats():
+    return {"status": "success", "stats": get_snapshot_cache().stats()}
+
+
+@kg_cache_router.delete("/kg/cache")
+def evict_all_kg_snapshots():
+    evicted = get_snapshot_cache().evict()
+    print(f"[KGSnapshotCache] Evicted {evicted} snapshots")
+    return {"status": "success", "evicted": evicted}
+
+
+@kg_cache_router.delete("/kg/cache/{project}")
+def evict_kg_snapshots(project: str):
+    evicted = get_snapshot_cache().evict(project)
+    print(f"[KGSnapshotCache] Evicted {evicted} snapshots of {project}")
+    return {"status": "success", "project": project, "evicted": evicted}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from backend.db.neo4j_connect import driver
+from backend.db.kg_schema import ensure_schema, schema_status, explain_reads
+from backend.agents.kg_builder.Kg_reader import PROJECT_GRAPH_QUERIES
+
+kg_schema_router = APIRouter()
+
+
+@kg_schema_router.get("/kg/schema")
+def get_kg_schema():
+    try:
+        return {"status": "success", **schema_status(driver)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read KG schema: {str(e)}")
+
+
+@kg_schema_router.post("/kg/schema")
+def bootstrap_kg_schema():
+    try:
+        return {"status": "success", **ensure_schema(driver)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create KG schema: {str(e)}")
+
+
+# Verify that the reader's lookups are planned as index seeks, not label scans
+@kg_schema_router.get("/kg/schema/explain")
+def explain_kg_reads(project: str = "example"):
+    try:
+        return {"status": "success", "queries": explain_reads(driver, project, {"project_graph": PROJECT_GRAPH_QUERIES["calls"]})}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to explain KG queries: {str(e)}")
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from services.llm_engine.response_cache import get_response_cache
+
+llm_cache_router = APIRouter()
+
+
+@llm_cache_router.get("/llm-cache/stats")
+def llm_cache_stats():
+    return {"status": "success", "stats": get_response_cache().stats()}
+
+
+@llm_cache_router.delete("/llm-cache")
+def clear_llm_cache():
+    get_response_cache().clear()
+    print("[LLMCache] Cleared all cached responses")
+    return {"status": "success", "message": "LLM response cache cleared"}
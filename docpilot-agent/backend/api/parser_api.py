@@ -1,25 +1,34 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import json
 import os
+import subprocess
+import time
+from contextlib import contextmanager
 
-from backend.agents.parser.parser_manager import ParserManager
+from backend.agents.cloner.repo_retention import get_repo_retention
+from backend.agents.parser.parse_engine import ParseEngine, default_cache
+from backend.utils.git_source import GitCommitSource
+from backend.utils.repo_locks import RepoBusy, get_repo_locks
 from backend.db.data import user_repo_db  # <-- in-memory DB storing cloned repo info
 
 
 router = APIRouter()
 do_gen_router = APIRouter()
-manager = ParserManager()
+engine = ParseEngine(cache=default_cache())  # process pool is created lazily and reused across requests
 
 # Request Models
 class RepoNameRequest(BaseModel):
     proj_name: str  # Project name stored in UserRepos
 
 
-# Parse Repository by Project Name
-@router.post("/parse-repo")
-def parse_repo(request: RepoNameRequest):
-    proj_name = request.proj_name
+class ParseCommitRequest(BaseModel):
+    proj_name: str
+    commit: str | None = None  # any revision; default: the commit that was cloned (or HEAD)
+
 
+def _resolve_repo_path(proj_name: str) -> str:
     # Check if project exists in our DB
     if proj_name not in user_repo_db:
         raise HTTPException(status_code=404, detail="Project not found in UserRepos")
@@ -29,25 +38,132 @@ def parse_repo(request: RepoNameRequest):
     if not os.path.isdir(repo_path):
         raise HTTPException(status_code=404, detail="Repository directory not found")
 
-    parsed_files = []
+    get_repo_retention().touch(proj_name, repo_path)
+    return repo_path
+
+
+@contextmanager
+def _shared_lock(proj_name: str):
+    # shared with other parses, exclusive with /getRepo and the /cypher cleanup; yields the wait in ms
+    try:
+        with get_repo_locks().read(proj_name) as wait_ms:
+            yield wait_ms
+    except RepoBusy as e:
+        raise HTTPException(status_code=409, detail=f"Repository {proj_name} is busy: {e}")
 
+
+def _checked_out(proj_name: str) -> bool:
+    # fetchRepo(Checkout=False) leaves only the shared mirror: its files exist as git objects only
+    return user_repo_db[proj_name].get("checkout", True)
+
+
+def _parse_commit(proj_name: str, repo_path: str, commit: str | None, stats: dict) -> list[dict]:
+    commit = commit or user_repo_db[proj_name].get("commit") or "HEAD"
     try:
-        # Parse all code files inside repository
-        for root, dirs, files in os.walk(repo_path):
-            for f in files:
-                file_path = os.path.join(root, f)
-                result = manager.parse(file_path)
+        return engine.parse_commit(repo_path, commit, stats, user_repo_db[proj_name].get("sparse_paths"))
+    except subprocess.CalledProcessError as e:
+        raise HTTPException(status_code=404, detail=f"Commit {commit} not found: {e.stderr.decode(errors='replace').strip()}")
 
-                if not result:
-                    continue
 
-                parsed_files.append(result)
+# Parse Repository by Project Name
+@router.post("/parse-repo")
+def parse_repo(request: RepoNameRequest):
+    proj_name = request.proj_name
+
+    parsed_files = []
+    stats = {}
 
-    finally:
-        print(f"[Parsing Complete] Parsed {len(parsed_files)} files in {proj_name}")
+    with _shared_lock(proj_name) as wait_ms:
+        repo_path = _resolve_repo_path(proj_name)
+        try:
+            # Parse all code files inside repository (fanned out to the worker pool, path-ordered)
+            if _checked_out(proj_name):
+                parsed_files = engine.parse_repo(repo_path, stats)
+            else:
+                parsed_files = _parse_commit(proj_name, repo_path, None, stats)
+
+        finally:
+            print(f"[Parsing Complete] Parsed {len(parsed_files)} files in {proj_name}")
 
     return {
         "status": "success",
         "total_files": len(parsed_files),
+        "lock_wait_ms": wait_ms,
+        "stats": stats,
         "data": parsed_files
     }
+
+
+# Parse the tree of a commit straight from the git object database: no checkout is read,
+# so a concurrent pull/checkout of the same project cannot change what gets parsed
+@router.post("/parse-repo/commit")
+def parse_repo_commit(request: ParseCommitRequest):
+    proj_name = request.proj_name
+    stats = {}
+    # objects never change, but the worktree's .git link can be deleted by /cypher
+    with _shared_lock(proj_name) as wait_ms:
+        repo_path = _resolve_repo_path(proj_name)
+        parsed_files = _parse_commit(proj_name, repo_path, request.commit, stats)
+    print(f"[Parsing Complete] Parsed {len(parsed_files)} files in {proj_name} @ {stats['commit'][:12]}")
+
+    return {
+        "status": "success",
+        "commit": stats["commit"],
+        "total_files": len(parsed_files),
+        "lock_wait_ms": wait_ms,
+        "stats": stats,
+        "data": parsed_files
+    }
+
+
+# Stream parse results as NDJSON: one {"type": "file"} record per parsed file,
+# emitted as soon as it is produced, followed by a single {"type": "summary"} record.
+@router.post("/parse-repo/stream")
+def parse_repo_stream(request: RepoNameRequest):
+    proj_name = request.proj_name
+    _resolve_repo_path(proj_name)  # unknown projects get a 404 before the stream starts
+
+    def ndjson_records():
+        started = time.perf_counter()
+        total = 0
+        errors = 0
+        status = "success"
+        stats = {}
+        source = None
+        wait_ms = None
+
+        try:
+            # held until the last record is sent (or the client goes away)
+            with get_repo_locks().read(proj_name) as wait_ms:
+                # resolved under the lock: an eviction may have moved the project to its mirror meanwhile
+                repo_path = _resolve_repo_path(proj_name)
+                if _checked_out(proj_name):
+                    results = engine.iter_parse(engine.collect_files(repo_path, stats), stats, repo_path)
+                else:
+                    entry = user_repo_db[proj_name]
+                    source = GitCommitSource(repo_path, entry.get("commit") or "HEAD", entry.get("sparse_paths"))
+                    results = engine.iter_parse(source.files(), stats, repo_path, source)
+                for result in results:
+                    total += 1
+                    if "error" in result:
+                        errors += 1
+                    yield json.dumps({"type": "file", "data": result}, default=str) + "\n"
+        except Exception as e:
+            status = "error"
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            if source is not None:
+                source.close()
+            print(f"[Parsing Complete] Streamed {total} files in {proj_name}")
+
+        yield json.dumps({
+            "type": "summary",
+            "status": status,
+            "total_files": total,
+            "errors": errors,
+            "stats": stats,
+            "lock_wait_ms": wait_ms,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }) + "\n"
+
+    return StreamingResponse(ndjson_records(), media_type="application/x-ndjson")
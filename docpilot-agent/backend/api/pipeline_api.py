@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from backend.jobs.pipeline import PipelineBusy, get_pipeline_store, start_pipeline
+
+pipeline_router = APIRouter()
+
+
+class PipelineRequest(BaseModel):
+    projUrl: str
+    BranchName: str
+    AuthToken: str | None = None
+    ProjName: str
+    Commit: str | None = None       # clone options, see clone_agent.RepoModal
+    Depth: int | None = None
+    Filter: str | None = None
+    SparsePaths: list[str] | None = None
+    refresh: bool = False           # regenerate docs even if the KG did not change
+    force: list[str] = []           # stages to rerun regardless of their inputs ("*" = all)
+
+
+def _public(run: dict) -> dict:
+    # never hand the clone token back out
+    request = {k: v for k, v in run["request"].items() if k != "AuthToken"}
+    return {**run, "request": request}
+
+
+# clone -> parse -> kg -> docgen as one background run; poll GET /pipeline/runs/{run_id}
+@pipeline_router.post("/pipeline/run", status_code=202)
+def run_pipeline(request: PipelineRequest):
+    try:
+        run, created = start_pipeline(request.model_dump())
+    except PipelineBusy as e:
+        # the active run was started with other options; retry once it is done
+        raise HTTPException(status_code=409, detail={"message": str(e), "run_id": e.run["id"], "run": _public(e.run)})
+    if created:
+        print(f"[Pipeline] Queued run {run['id']} for {request.ProjName}")
+    return {"status": "queued" if created else "already_running", "run_id": run["id"], "run": _public(run)}
+
+
+@pipeline_router.get("/pipeline/runs")
+def list_pipeline_runs(project: str | None = None, limit: int = 50):
+    runs = get_pipeline_store().list_runs(project, min(limit, 500))
+    return {"status": "success", "runs": [_public(r) for r in runs]}
+
+
+@pipeline_router.get("/pipeline/runs/{run_id}")
+def get_pipeline_run(run_id: str):
+    run = get_pipeline_store().get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    return _public(run)
+
+
+# last successful artifact of every stage (what the next run compares its inputs against)
+@pipeline_router.get("/pipeline/state/{project}")
+def get_pipeline_state(project: str):
+    return {"status": "success", "project": project, "stages": get_pipeline_store().project_state(project)}
@@ -1,23 +1,67 @@
+import hashlib
+import hmac
+import json
+import os
+from urllib.parse import parse_qs
+
 from fastapi import Request,HTTPException,Header,APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from backend.jobs.webhook_trigger import WEBHOOK_DEBOUNCE, schedule_push
+
+# When set, deliveries must carry a matching X-Hub-Signature-256
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET", "")
 
 router=APIRouter()
 
 
-@router.post("/webhook")
+def _valid_signature(body: bytes, signature: str | None) -> bool:
+    expected = "sha256=" + hmac.new(GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return signature is not None and hmac.compare_digest(expected, signature)
+
+
+# Push events queue a (debounced) pipeline run and return 202 right away, so deliveries never wait on git
+@router.post("/webhook", status_code=202)
 async def webhook(
         request:Request,
-        x_github_event:str=Header(None,alias="x-github-event")
+        x_github_event:str=Header(None,alias="x-github-event"),
+        x_hub_signature_256:str=Header(None,alias="x-hub-signature-256")
 ):
-    payload=await request.json()
-    headers=request.headers
-    print(headers)
+    body=await request.body()
+    if GITHUB_WEBHOOK_SECRET and not _valid_signature(body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-www-form-urlencoded"):
+            payload=json.loads(parse_qs(body.decode())["payload"][0])
+        else:
+            payload=json.loads(body)
+    except (ValueError, KeyError) as e:  # JSONDecodeError and UnicodeDecodeError are ValueErrors
+        raise HTTPException(status_code=400, detail=f"Malformed webhook payload: {e}")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook payload must be a JSON object")
     print(f"Received event:{x_github_event}")
-    # print(payload)
-    print("=================================")
-    print(f"CommitID:{payload['after']}")
+
     if x_github_event == "push":
-        print("New push detected!")
+        ref=payload.get("ref") or ""
+        commit=payload.get("after") or ""
+        if not ref.startswith("refs/heads/") or payload.get("deleted") or not commit.strip("0"):
+            return {"message":"ignored", "reason":"not a branch update"}
+        repository=payload.get("repository") or {}
+        urls=[u for u in (repository.get("clone_url"), repository.get("html_url"), repository.get("ssh_url")) if u]
+        if not urls:
+            raise HTTPException(status_code=400, detail="Push event without repository URL")
+        branch=ref.removeprefix("refs/heads/")
+
+        job, created = await run_in_threadpool(schedule_push, urls, branch, commit)
+        print(f"[Webhook] Push to {urls[0]} ({branch}) @ {commit[:12]}: {'queued' if created else 'coalesced into'} job {job['id']}")
+        return {
+            "message":"queued" if created else "coalesced",
+            "job_id":job["id"],
+            "commit":commit,
+            "run_after":job["run_after"],
+            "debounce_seconds":WEBHOOK_DEBOUNCE,
+        }
     elif x_github_event=="pull":
         print("Pull request Detected")
 
-    return {"message":"success"}
\ No newline at end of file
+    return {"message":"success"}
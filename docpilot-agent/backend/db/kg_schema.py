@@ -0,0 +1,100 @@
+import os
+
+# Run ensure_schema() when the app starts (it is idempotent and cheap once applied)
+KG_SCHEMA_BOOTSTRAP = os.getenv("KG_SCHEMA_BOOTSTRAP", "1") == "1"
+
+# ------------------ Schema ------------------
+# Uniqueness constraints mirror the MERGE keys used by the KG writer (each one
+# is backed by a composite range index), the plain indexes cover the reader's
+# lookups that only use a prefix of those keys.
+CONSTRAINTS = {
+    "file_project_path": "CREATE CONSTRAINT file_project_path IF NOT EXISTS "
+                         "FOR (n:File) REQUIRE (n.project, n.filePath) IS UNIQUE",
+    "class_project_path_name": "CREATE CONSTRAINT class_project_path_name IF NOT EXISTS "
+                               "FOR (n:Class) REQUIRE (n.project, n.filePath, n.name) IS UNIQUE",
+    "method_project_path_class_name": "CREATE CONSTRAINT method_project_path_class_name IF NOT EXISTS "
+                                      "FOR (n:Method) REQUIRE (n.project, n.filePath, n.parentClass, n.name) IS UNIQUE",
+}
+
+INDEXES = {
+    "file_project": "CREATE INDEX file_project IF NOT EXISTS FOR (n:File) ON (n.project)",
+    "class_project_path": "CREATE INDEX class_project_path IF NOT EXISTS FOR (n:Class) ON (n.project, n.filePath)",
+    "method_project_class": "CREATE INDEX method_project_class IF NOT EXISTS FOR (n:Method) ON (n.project, n.parentClass)",
+}
+
+# Lookups on the indexed keys, checked by explain_reads() along with any
+# queries the caller passes in (e.g. the KG reader's project query)
+READ_QUERIES = {
+    "files_by_project": "MATCH (f:File {project: $project}) RETURN f",
+    "classes_by_file": "MATCH (c:Class {filePath: $file, project: $project}) RETURN c",
+    "methods_by_class": "MATCH (m:Method {parentClass: $class_name, project: $project}) RETURN m",
+    "calls_by_method": "MATCH (m:Method {name: $method, parentClass: $class_name, project: $project}) "
+                       "MATCH (m)-[:CALLS]->(target:Method) RETURN target",
+}
+
+
+def _existing_names(session) -> tuple[set, set]:
+    constraints = {r["name"] for r in session.run("SHOW CONSTRAINTS YIELD name")}
+    indexes = {r["name"] for r in session.run("SHOW INDEXES YIELD name")}
+    return constraints, indexes
+
+
+def ensure_schema(driver) -> dict:
+    """
+    Create any missing constraint / index. Safe to call repeatedly; the
+    report says what was created, what already existed and what failed
+    (e.g. a uniqueness constraint over data that already has duplicates).
+    """
+    report = {"created": [], "existing": [], "failed": {}}
+    with driver.session() as session:
+        constraints, indexes = _existing_names(session)
+        for kind, statements, existing in (("constraint", CONSTRAINTS, constraints), ("index", INDEXES, indexes)):
+            for name, statement in statements.items():
+                if name in existing:
+                    report["existing"].append(name)
+                    continue
+                try:
+                    session.run(statement).consume()
+                    report["created"].append(name)
+                except Exception as e:
+                    report["failed"][name] = str(e)
+                    print(f"[KGSchema] Could not create {kind} {name}: {e}")
+    if report["created"]:
+        print(f"[KGSchema] Created {', '.join(report['created'])}")
+    return report
+
+
+def schema_status(driver) -> dict:
+    """Expected constraints/indexes and whether each exists, plus their population state."""
+    with driver.session() as session:
+        states = {r["name"]: r["state"] for r in session.run("SHOW INDEXES YIELD name, state")}
+        constraints, _ = _existing_names(session)
+    return {
+        "constraints": {name: name in constraints for name in CONSTRAINTS},
+        "indexes": {name: states.get(name, "MISSING") for name in INDEXES},
+    }
+
+
+def _operators(plan) -> list[str]:
+    if not plan:
+        return []
+    ops = [plan.get("operatorType", "").split("@")[0]]
+    for child in plan.get("children", []):
+        ops.extend(_operators(child))
+    return ops
+
+
+def explain_reads(driver, project: str = "example", queries: dict | None = None) -> dict:
+    """EXPLAIN each read query and report whether its plan starts from an index seek."""
+    params = {"project": project, "file": "", "class_name": "", "method": ""}
+    report = {}
+    with driver.session() as session:
+        for name, query in {**READ_QUERIES, **(queries or {})}.items():
+            plan = session.run("EXPLAIN " + query, params).consume().plan
+            ops = _operators(plan)
+            report[name] = {
+                "operators": ops,
+                "index_seek": any("IndexSeek" in op for op in ops),
+                "label_scan": any(op in ("NodeByLabelScan", "AllNodesScan") for op in ops),
+            }
+    return report
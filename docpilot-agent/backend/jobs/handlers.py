@@ -0,0 +1,104 @@
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from backend.agents.cloner.clone_agent import RepoModal, fetchRepo
+from backend.agents.cloner.repo_retention import get_repo_retention
+from backend.agents.docgen.doc_generator import generate_docs
+from backend.agents.kg_builder.openAiKG import build_kg
+from backend.api.parser_api import RepoNameRequest, _resolve_repo_path, engine, parse_repo
+from backend.db.data import user_repo_db
+from backend.utils.git_source import GitCommitSource
+from backend.utils.repo_locks import get_repo_locks
+from .worker import PermanentJobError, register
+
+
+def _client_errors_are_permanent(fn, *args):
+    # endpoint functions signal bad input with 4xx HTTPExceptions; retrying those is pointless
+    # (except 409: the repository was busy, which a later attempt can get past)
+    try:
+        return fn(*args)
+    except HTTPException as e:
+        if e.status_code < 500 and e.status_code != 409:
+            raise PermanentJobError(e.detail)
+        raise
+
+
+def _request(model, payload):
+    # a payload that does not validate now never will
+    try:
+        return model(**payload)
+    except (ValidationError, TypeError) as e:
+        raise PermanentJobError(f"Invalid payload: {e}")
+
+
+def _field(payload, name: str):
+    try:
+        return payload[name]
+    except (KeyError, TypeError):
+        raise PermanentJobError(f"Invalid payload: missing {name!r}")
+
+
+# ------------------ Built-in job kinds ------------------
+# Cancellation is checked between steps; a single clone or docgen run is one
+# step, so a cancel that arrives while it is running only takes effect if the
+# job is retried.
+@register("clone")
+def clone_job(ctx, payload: dict):
+    repository = _request(RepoModal, payload)
+    ctx.progress(0.0, f"cloning {repository.projUrl}")
+    return _client_errors_are_permanent(fetchRepo, repository)
+
+
+@register("parse")
+def parse_job(ctx, payload: dict):
+    proj_name = _field(payload, "proj_name")
+
+    stats = {}
+    done = errors = 0
+    with get_repo_locks().read(proj_name):
+        repo_path = _client_errors_are_permanent(_resolve_repo_path, proj_name)
+        entry = user_repo_db[proj_name]
+        # projects fetched with Checkout=False only exist as objects in the shared mirror
+        source = None if entry.get("checkout", True) else GitCommitSource(repo_path, entry.get("commit") or "HEAD",
+                                                                          entry.get("sparse_paths"))
+        try:
+            files = engine.collect_files(repo_path, stats) if source is None else source.files()
+            total = len(files)
+            ctx.progress(0.0, f"parsing {total} files")
+            for result in engine.iter_parse(files, stats, repo_path, source):
+                done += 1
+                if "error" in result:
+                    errors += 1
+                if done % 50 == 0 or done == total:
+                    ctx.progress(done / total if total else 1.0, f"parsed {done}/{total} files")
+        finally:
+            if source is not None:
+                source.close()
+
+    # the parsed ASTs stay in the parse cache; the job result only carries the summary
+    return {"project": proj_name, "total_files": done, "errors": errors, "stats": stats}
+
+
+@register("cypher")
+def cypher_job(ctx, payload: dict):
+    # same steps as /cypher, with a cancel checkpoint before the graph is overwritten
+    request = _request(RepoNameRequest, payload)
+    ctx.progress(0.0, "parsing")
+    parsed = _client_errors_are_permanent(parse_repo, request)
+    ctx.progress(0.5, "writing knowledge graph")
+    result = build_kg(request.proj_name, parsed["data"], repo_root=user_repo_db[request.proj_name]["local_path"])
+    get_repo_retention().enforce(keep={request.proj_name})
+    return result
+
+
+@register("docgen")
+def docgen_job(ctx, payload: dict):
+    proj_name = _field(payload, "proj_name")
+    ctx.progress(0.0, "generating documentation")
+    result = generate_docs(proj_name, bypass_cache=payload.get("refresh", False))
+    return {
+        "project": proj_name,
+        "documentation": result["markdown"],
+        "stats": result["stats"],
+        "incremental": result["incremental"],
+    }
@@ -0,0 +1,282 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(BASE_DIR, ".cache", "jobs", "jobs.sqlite3"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = {SUCCEEDED, FAILED, CANCELLED}
+
+_COLUMNS = ("id, kind, payload, status, progress, message, result, error, attempts, max_attempts, "
+            "run_after, cancel_requested, worker, dedupe_key, created, started, finished, updated")
+
+
+class JobStore:
+    """
+    Persistent job table. Jobs survive restarts: a job still "running" for
+    a worker pool that stopped sending heartbeats is put back in the queue
+    (see requeue_orphaned).
+
+    claim() moves the oldest due job to "running" inside an IMMEDIATE
+    transaction, so several worker threads (or processes sharing the file)
+    never pick the same job.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or JOBS_DB_PATH
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " progress REAL NOT NULL DEFAULT 0,"
+                " message TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " run_after REAL NOT NULL,"
+                " cancel_requested INTEGER NOT NULL DEFAULT 0,"
+                " worker TEXT,"
+                " dedupe_key TEXT,"
+                " created REAL NOT NULL,"
+                " started REAL,"
+                " finished REAL,"
+                " updated REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs(status, run_after, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, status)")
+            # one row per live worker pool (process), refreshed by its heartbeat
+            conn.execute("CREATE TABLE IF NOT EXISTS workers (owner TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row) -> dict | None:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    # ------------------ Producer side ------------------
+    def enqueue(self, kind: str, payload: dict, max_attempts: int = 3, delay: float = 0.0,
+                dedupe_key: str | None = None) -> dict:
+        """
+        Add a job. With `dedupe_key`, an existing queued/running job with the
+        same key is returned instead of adding a duplicate.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if dedupe_key is not None:
+                row = conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) ORDER BY created LIMIT 1",
+                    (dedupe_key, QUEUED, RUNNING)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("COMMIT")
+                    return self._to_dict(row)
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs(id, kind, payload, status, max_attempts, run_after, dedupe_key, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=str), QUEUED, max(1, max_attempts), now + delay,
+                 dedupe_key, now, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(job_id)
+
+    def debounce(self, kind: str, payload: dict, delay: float, dedupe_key: str, max_attempts: int = 3,
+                 replace: bool = True) -> tuple[dict, bool]:
+        """
+        Coalesce bursts: if a job with `dedupe_key` is still queued, its payload
+        is replaced by this one (unless `replace` is False) and it keeps its
+        start time; otherwise a job is queued to start `delay` seconds from
+        now. Running jobs are not touched. Returns (job, created).
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status = ? ORDER BY created LIMIT 1",
+                (dedupe_key, QUEUED)
+            ).fetchone()
+            if row is not None:
+                job_id, created = row["id"], False
+                if replace:
+                    conn.execute("UPDATE jobs SET payload = ?, updated = ? WHERE id = ?",
+                                 (json.dumps(payload, default=str), now, job_id))
+            else:
+                job_id, created = uuid.uuid4().hex, True
+                conn.execute(
+                    "INSERT INTO jobs(id, kind, payload, status, max_attempts, run_after, dedupe_key, created, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload, default=str), QUEUED, max(1, max_attempts), now + delay,
+                     dedupe_key, now, now)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(job_id), created
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._connect().execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def list(self, status: str | None = None, kind: str | None = None, limit: int = 50) -> list[dict]:
+        query = f"SELECT {_COLUMNS} FROM jobs"
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created DESC LIMIT ?"
+        params.append(limit)
+        return [self._to_dict(r) for r in self._connect().execute(query, params)]
+
+    def cancel(self, job_id: str) -> dict | None:
+        """Queued jobs are cancelled at once; running ones are flagged and stop at their next checkpoint."""
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished = ?, updated = ?, message = 'cancelled before start'"
+            " WHERE id = ? AND status = ?",
+            (CANCELLED, now, now, job_id, QUEUED)
+        )
+        conn.execute("UPDATE jobs SET cancel_requested = 1, updated = ? WHERE id = ? AND status = ?",
+                     (now, job_id, RUNNING))
+        return self.get(job_id)
+
+    # ------------------ Worker side ------------------
+    def claim(self, worker: str) -> dict | None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND run_after <= ? ORDER BY run_after, created LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, started = ?, updated = ?,"
+                " progress = 0, message = NULL WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def update_progress(self, job_id: str, progress: float | None = None, message: str | None = None) -> bool:
+        """Returns True if cancellation was requested meanwhile."""
+        conn = self._connect()
+        sets, params = ["updated = ?"], [time.time()]
+        if progress is not None:
+            sets.append("progress = ?")
+            params.append(max(0.0, min(1.0, progress)))
+        if message is not None:
+            sets.append("message = ?")
+            params.append(message)
+        conn.execute(f"UPDATE jobs SET {', '.join(sets)} WHERE id = ?", params + [job_id])
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def finish(self, job_id: str, status: str, result=None, error: str | None = None):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, updated = ?,"
+            " progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END WHERE id = ?",
+            (status, json.dumps(result, default=str) if result is not None else None, error, now, now, status, job_id)
+        )
+
+    def retry_later(self, job_id: str, delay: float, error: str):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, run_after = ?, error = ?, worker = NULL, updated = ? WHERE id = ?",
+            (QUEUED, now + delay, error, now, job_id)
+        )
+
+    def heartbeat(self, owner: str):
+        self._connect().execute("INSERT OR REPLACE INTO workers(owner, heartbeat) VALUES (?, ?)", (owner, time.time()))
+
+    def requeue_orphaned(self, owner: str, stale_after: float) -> tuple[int, int]:
+        """
+        Recover running jobs whose pool (the `owner` part of "<owner>/<thread>"
+        worker names) has not sent a heartbeat for `stale_after` seconds: the
+        process crashed or was restarted. Jobs of live pools, in this process
+        or another one sharing the file, are left alone. An orphan that has used
+        all its attempts fails instead (it may be what brought the process
+        down). Returns (requeued, failed).
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            live = {r["owner"] for r in conn.execute("SELECT owner FROM workers WHERE heartbeat >= ?",
+                                                     (now - stale_after,))}
+            live.add(owner)
+            requeued = failed = 0
+            for row in conn.execute("SELECT id, worker, attempts, max_attempts FROM jobs WHERE status = ?",
+                                    (RUNNING,)).fetchall():
+                if (row["worker"] or "").rsplit("/", 1)[0] in live:
+                    continue
+                if row["attempts"] >= row["max_attempts"]:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished = ?, updated = ? WHERE id = ?",
+                        (FAILED, f"worker {row['worker']} died while running the last attempt", now, now, row["id"])
+                    )
+                    failed += 1
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = NULL, updated = ?, message = 'requeued after restart'"
+                        " WHERE id = ?",
+                        (QUEUED, now, row["id"])
+                    )
+                    requeued += 1
+            conn.execute("DELETE FROM workers WHERE heartbeat < ? AND owner != ?", (now - stale_after, owner))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return requeued, failed
+
+    def counts(self) -> dict:
+        rows = self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {r["status"]: r["n"] for r in rows}
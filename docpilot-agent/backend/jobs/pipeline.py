@@ -0,0 +1,386 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from git import Repo
+
+from backend.agents.cloner.clone_agent import RepoModal, fetchRepo
+from backend.agents.docgen.doc_generator import generate_docs
+from backend.agents.docgen.map_reduce import DOCGEN_MODEL, DOCGEN_SUMMARY_MODEL, PROMPT_VERSION
+from backend.agents.kg_builder.kg_write_log import get_kg_write_log
+from backend.agents.kg_builder.openAiKG import build_kg
+from backend.agents.cloner.git_ops import has_commit
+from backend.api.parser_api import engine
+from backend.utils.git_source import GitCommitSource
+from backend.utils.repo_locks import get_repo_locks
+from backend.db.data import user_repo_db
+from .pipeline_store import PipelineStore
+from .job_store import FINISHED_STATUSES
+from .worker import JobCancelled, PermanentJobError, enqueue, get_job_store, register
+
+
+def _hash(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class PipelineBusy(Exception):
+    """start_pipeline: the project has an active run for a different request (`run`)."""
+
+    def __init__(self, run: dict):
+        super().__init__(f"Pipeline run {run['id']} of {run['project']} is still active")
+        self.run = run
+
+
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    fingerprint(runner, upstream) -> hash of everything the stage reads (None:
+    always run); run(runner, upstream) -> artifact dict; is_valid(runner,
+    artifact) tells whether a stored artifact can still be used.
+    """
+
+    def __init__(self, name: str, deps: list[str], run, fingerprint=None, is_valid=None, on_reuse=None):
+        self.name = name
+        self.deps = deps
+        self.run = run
+        self.fingerprint = fingerprint or (lambda runner, upstream: None)
+        self.is_valid = is_valid or (lambda runner, artifact: True)
+        self.on_reuse = on_reuse
+
+
+# ------------------ clone ------------------
+def _head_commit(path: str) -> str | None:
+    try:
+        return Repo(path).head.commit.hexsha
+    except Exception:
+        return None
+
+
+def _remember_checkout(runner, artifact: dict):
+    # other endpoints (/parse-repo, /cypher...) look checkouts up here
+    request = runner.request
+    user_repo_db[runner.project] = {
+        "local_path": artifact["local_path"],
+        "repo_url": request["projUrl"],
+        "branch": request["BranchName"],
+        "auth_token": request.get("AuthToken"),
+        "commit": artifact["commit"],
+        "checkout": artifact.get("checkout", True),
+        "sparse_paths": artifact.get("sparse_paths"),
+    }
+
+
+def run_clone(runner, upstream):
+    request = runner.request
+    response = fetchRepo(RepoModal(**{k: v for k, v in request.items() if k in RepoModal.model_fields}))
+    return {
+        "local_path": user_repo_db[runner.project]["local_path"],
+        "commit": response["commit"],
+        "checkout": response["options"]["checkout"],
+        "sparse_paths": response["options"]["sparse_paths"],
+        "branch": request["BranchName"],
+        "message": response.get("message"),
+        "timing": response["timing"],
+        "bytes_transferred": response["bytes_transferred"],
+    }
+
+
+def clone_is_valid(runner, artifact):
+    if not os.path.isdir(artifact["local_path"]):
+        return False
+    if not artifact.get("checkout", True):
+        return has_commit(artifact["local_path"], artifact["commit"])
+    return _head_commit(artifact["local_path"]) == artifact["commit"]
+
+
+# ------------------ parse ------------------
+def parse_fingerprint(runner, upstream):
+    clone = upstream["clone"]
+    return _hash("parse", clone["commit"], sorted(clone.get("sparse_paths") or []), engine.parser_fingerprint())
+
+
+def run_parse(runner, upstream):
+    checkout = upstream["clone"]
+    repo_path, commit = checkout["local_path"], checkout["commit"]
+
+    stats = {}
+    results = []
+    errors = 0
+    # read the commit's blobs, not the checkout: a later pull of the same project cannot race this stage
+    # (the shared lock only keeps /cypher from deleting the worktree's .git underneath it)
+    # with a sparse checkout, only the files it selects (the rest would be lazily fetched one blob at a time)
+    with get_repo_locks().read(runner.project), GitCommitSource(repo_path, commit, checkout.get("sparse_paths")) as source:
+        files = source.files()
+        for result in engine.iter_parse(files, stats, repo_path, source):
+            results.append(result)
+            if "error" in result:
+                errors += 1
+            if len(results) % 50 == 0:
+                runner.stage_progress(len(results) / max(1, len(files)), f"parsed {len(results)}/{len(files)} files")
+    results.sort(key=lambda r: r.get("file") or "")
+
+    payload = json.dumps(results, sort_keys=True, default=str).encode("utf-8")
+    project_dir = runner.store.project_dir(runner.project)
+    path = os.path.join(project_dir, f"parse-{commit}.json.gz")
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wb", compresslevel=6) as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    # only the newest parse artifact is kept per project
+    for old in glob.glob(os.path.join(project_dir, "parse-*.json.gz")):
+        if old != path:
+            os.remove(old)
+
+    return {
+        "path": path,
+        "repo_root": repo_path,
+        "content_hash": hashlib.sha256(payload).hexdigest(),
+        "total_files": len(results),
+        "errors": errors,
+        "stats": stats,
+    }
+
+
+def load_parse_results(artifact: dict) -> list[dict]:
+    with gzip.open(artifact["path"], "rb") as f:
+        return json.loads(f.read())
+
+
+def parse_is_valid(runner, artifact):
+    return os.path.exists(artifact["path"])
+
+
+# ------------------ kg ------------------
+def kg_fingerprint(runner, upstream):
+    return _hash("kg", upstream["parse"]["content_hash"])
+
+
+def run_kg(runner, upstream):
+    parsed = upstream["parse"]
+    return build_kg(runner.project, load_parse_results(parsed), repo_root=parsed["repo_root"])
+
+
+def kg_is_valid(runner, artifact):
+    # any write to the project's graph since (another run, a direct /cypher) records a new write id
+    write_id = artifact["write"].get("write_id")
+    return write_id is not None and get_kg_write_log().last(runner.project) == write_id
+
+
+# ------------------ docgen ------------------
+def docgen_fingerprint(runner, upstream):
+    return _hash("docgen", upstream["kg"]["input_hash"], PROMPT_VERSION, DOCGEN_MODEL, DOCGEN_SUMMARY_MODEL)
+
+
+def run_docgen(runner, upstream):
+    result = generate_docs(runner.project, bypass_cache=runner.request.get("refresh", False))
+    path = os.path.join(runner.store.project_dir(runner.project), "README.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(result["markdown"])
+    return {"path": path, "stats": result["stats"], "incremental": result["incremental"]}
+
+
+def docgen_is_valid(runner, artifact):
+    return os.path.exists(artifact["path"])
+
+
+STAGES = [
+    Stage("clone", [], run_clone, is_valid=clone_is_valid, on_reuse=_remember_checkout),
+    Stage("parse", ["clone"], run_parse, parse_fingerprint, parse_is_valid),
+    Stage("kg", ["parse"], run_kg, kg_fingerprint, kg_is_valid),
+    Stage("docgen", ["kg"], run_docgen, docgen_fingerprint, docgen_is_valid),
+]
+
+
+def topological_order(stages: list[Stage]) -> list[Stage]:
+    by_name = {s.name: s for s in stages}
+    ordered, done = [], set()
+
+    def visit(stage, path=()):
+        if stage.name in done:
+            return
+        if stage.name in path:
+            raise ValueError(f"Pipeline cycle through {stage.name}")
+        for dep in stage.deps:
+            visit(by_name[dep], path + (stage.name,))
+        done.add(stage.name)
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+    return ordered
+
+
+# ------------------ Runner ------------------
+class PipelineRunner:
+    """
+    Executes one pipeline run inside a background job.
+
+    For each stage, in dependency order:
+      1. resume: this run already finished the stage (a retry after a crash
+         or failure) and its artifact is still valid -> keep it;
+      2. skip: the stage's input hash equals the one of the project's last
+         successful output and that artifact is still valid -> reuse it;
+      3. otherwise run the stage and record its artifact.
+    Stages listed in request["force"] (or all, with force=["*"]) always run;
+    refresh=true also forces docgen.
+    """
+
+    def __init__(self, store: PipelineStore, run: dict, ctx=None, stages: list[Stage] | None = None):
+        self.store = store
+        self.run_id = run["id"]
+        self.project = run["project"]
+        self.request = run["request"]
+        self.stages_state = run["stages"]
+        self.commit = run["commit_sha"]
+        self.ctx = ctx
+        self.stages = topological_order(stages or STAGES)
+        self._index = 0
+
+    def stage_progress(self, fraction: float, message: str | None = None):
+        if self.ctx is not None:
+            self.ctx.progress((self._index + max(0.0, min(1.0, fraction))) / len(self.stages), message)
+
+    def _forced(self, name: str) -> bool:
+        force = self.request.get("force") or []
+        return "*" in force or name in force or (name == "docgen" and self.request.get("refresh"))
+
+    def _save(self, **fields):
+        self.store.update_run(self.run_id, stages=self.stages_state, **fields)
+
+    def execute(self) -> dict:
+        artifacts = {}
+        self._save(status="running", error=None)
+
+        for index, stage in enumerate(self.stages):
+            self._index = index
+            record = self.stages_state.setdefault(stage.name, {"status": "pending"})
+            self.stage_progress(0.0, f"{stage.name}")
+            upstream = {dep: artifacts[dep] for dep in stage.deps}
+            input_hash = stage.fingerprint(self, upstream)
+            started = time.perf_counter()
+
+            reused = None
+            if record.get("status") in ("succeeded", "skipped") \
+                    and (input_hash is None or record.get("input_hash") == input_hash) \
+                    and stage.is_valid(self, record["artifact"]):
+                reused, outcome = record["artifact"], "resumed"
+            elif not self._forced(stage.name) and input_hash is not None:
+                state = self.store.get_state(self.project, stage.name)
+                if state and state["input_hash"] == input_hash and stage.is_valid(self, state["artifact"]):
+                    reused, outcome = state["artifact"], "skipped"
+
+            if reused is not None:
+                artifact = reused
+                if stage.on_reuse:
+                    stage.on_reuse(self, artifact)
+                record.update(status="skipped" if outcome == "skipped" else record["status"], outcome=outcome)
+                print(f"[Pipeline] {self.project} {stage.name}: {outcome} (inputs unchanged)")
+            else:
+                record.update(status="running", outcome=None, error=None)
+                self._save()
+                try:
+                    artifact = stage.run(self, upstream)
+                except JobCancelled:
+                    record.update(status="cancelled")
+                    raise
+                except Exception as e:
+                    record.update(status="failed", error=f"{type(e).__name__}: {e}")
+                    raise
+                if input_hash is None and stage.name == "clone":
+                    input_hash = _hash("clone", artifact["commit"])
+                self.store.put_state(self.project, stage.name, input_hash, self.commit or artifact.get("commit"), artifact)
+                record.update(status="succeeded", outcome="ran")
+                print(f"[Pipeline] {self.project} {stage.name}: ran in {round((time.perf_counter() - started) * 1000, 1)} ms")
+
+            artifact = {**artifact, "input_hash": input_hash}
+            artifacts[stage.name] = artifact
+            record.update(input_hash=input_hash, artifact=artifact,
+                          elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+            if stage.name == "clone":
+                self.commit = artifact["commit"]
+                self._save(commit_sha=self.commit)
+            else:
+                self._save()
+
+        self._index = len(self.stages) - 1
+        self.stage_progress(1.0, "done")
+        self._save(status="succeeded")
+        return {"run_id": self.run_id, "project": self.project, "commit": self.commit,
+                "stages": {name: r.get("outcome") for name, r in self.stages_state.items()}}
+
+
+# ------------------ Shared store / job kind ------------------
+_store = None
+_store_lock = threading.Lock()
+_start_lock = threading.Lock()
+
+
+def get_pipeline_store() -> PipelineStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PipelineStore()
+    return _store
+
+
+def _run_options(request: dict) -> dict:
+    # what a run does, whatever the spelling: defaults left out, the token does not change the result
+    return {k: v for k, v in request.items() if k != "AuthToken" and v is not None and v is not False and v != []}
+
+
+def start_pipeline(request: dict) -> tuple[dict, bool]:
+    """
+    Queue a run for request["ProjName"]; returns (run, created). An active
+    run of the project is reused if it was started with the same request;
+    for a different one (another commit, force...) PipelineBusy is raised.
+    """
+    store = get_pipeline_store()
+    project = request["ProjName"]
+    with _start_lock:
+        active = store.active_run(project)
+        if active is not None:
+            job = get_job_store().get(active["job_id"]) if active["job_id"] else None
+            if job is not None and job["status"] not in FINISHED_STATUSES:
+                if _run_options(active["request"]) != _run_options(request):
+                    raise PipelineBusy(active)
+                return active, False
+            # its job ended without the runner seeing it (cancelled while queued, lost job row...)
+            store.update_run(active["id"], status=job["status"] if job else "failed")
+
+        run = store.create_run(project, request, [s.name for s in topological_order(STAGES)])
+        job = enqueue("pipeline", {"run_id": run["id"]})
+        store.update_run(run["id"], job_id=job["id"])
+    return store.get_run(run["id"]), True
+
+
+@register("pipeline")
+def pipeline_job(ctx, payload: dict):
+    store = get_pipeline_store()
+    run_id = payload.get("run_id") if isinstance(payload, dict) else None
+    if not run_id:
+        raise PermanentJobError("Invalid payload: missing 'run_id'")
+    run = store.get_run(run_id)
+    if run is None:
+        raise PermanentJobError(f"Pipeline run {run_id} not found")
+
+    runner = PipelineRunner(store, run, ctx)
+    try:
+        return runner.execute()
+    except JobCancelled:
+        store.update_run(run["id"], status="cancelled", stages=runner.stages_state)
+        raise
+    except Exception as e:
+        final = ctx.attempt >= ctx.job["max_attempts"]
+        store.update_run(run["id"], status="failed" if final else "retrying",
+                         error=f"{type(e).__name__}: {e}", stages=runner.stages_state)
+        raise
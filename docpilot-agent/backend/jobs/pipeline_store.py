@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+PIPELINE_DIR = os.getenv("PIPELINE_DIR", os.path.join(BASE_DIR, ".cache", "pipeline"))
+
+ACTIVE_RUN_STATUSES = ("queued", "running", "retrying")
+
+
+class PipelineStore:
+    """
+    Pipeline bookkeeping, next to the artifacts in PIPELINE_DIR.
+
+    runs: one row per pipeline run (project + the commit it ended up on),
+    with the per-stage status/artifact map of that run. A run that crashed
+    keeps the stages it finished, so its retry resumes after them.
+
+    stage_state: the last successful output of every stage of a project and
+    the hash of the inputs it was computed from. A later run whose stage
+    inputs hash the same reuses that artifact instead of recomputing it.
+    """
+
+    def __init__(self, store_dir: str | None = None):
+        self.store_dir = store_dir or PIPELINE_DIR
+        self.path = os.path.join(self.store_dir, "pipeline.sqlite3")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " id TEXT PRIMARY KEY,"
+                " project TEXT NOT NULL,"
+                " commit_sha TEXT,"
+                " status TEXT NOT NULL,"
+                " request TEXT NOT NULL,"
+                " stages TEXT NOT NULL,"
+                " job_id TEXT,"
+                " error TEXT,"
+                " created REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_project ON runs(project, created)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_state ("
+                " project TEXT NOT NULL,"
+                " stage TEXT NOT NULL,"
+                " input_hash TEXT,"
+                " commit_sha TEXT,"
+                " artifact TEXT NOT NULL,"
+                " updated REAL NOT NULL,"
+                " PRIMARY KEY (project, stage))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _run_dict(row) -> dict | None:
+        if row is None:
+            return None
+        run = dict(row)
+        run["request"] = json.loads(run["request"])
+        run["stages"] = json.loads(run["stages"])
+        return run
+
+    def project_dir(self, project: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in project)
+        path = os.path.join(self.store_dir, "projects", safe)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    # ------------------ Runs ------------------
+    def create_run(self, project: str, request: dict, stages: list[str]) -> dict:
+        run_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs(id, project, status, request, stages, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, project, "queued", json.dumps(request),
+                 json.dumps({name: {"status": "pending"} for name in stages}), now, now)
+            )
+        return self.get_run(run_id)
+
+    def get_run(self, run_id: str) -> dict | None:
+        row = self._connect().execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._run_dict(row)
+
+    def active_run(self, project: str) -> dict | None:
+        row = self._connect().execute(
+            f"SELECT * FROM runs WHERE project = ? AND status IN ({','.join('?' * len(ACTIVE_RUN_STATUSES))})"
+            " ORDER BY created DESC LIMIT 1",
+            (project, *ACTIVE_RUN_STATUSES)
+        ).fetchone()
+        return self._run_dict(row)
+
+    def list_runs(self, project: str | None = None, limit: int = 50) -> list[dict]:
+        if project:
+            rows = self._connect().execute(
+                "SELECT * FROM runs WHERE project = ? ORDER BY created DESC LIMIT ?", (project, limit))
+        else:
+            rows = self._connect().execute("SELECT * FROM runs ORDER BY created DESC LIMIT ?", (limit,))
+        return [self._run_dict(r) for r in rows]
+
+    def update_run(self, run_id: str, **fields):
+        """Set any of status / commit_sha / stages / job_id / error / request."""
+        for key in ("stages", "request"):
+            if key in fields:
+                fields[key] = json.dumps(fields[key], default=str)
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE runs SET {assignments} WHERE id = ?", (*fields.values(), run_id))
+
+    # ------------------ Stage artifacts ------------------
+    def get_state(self, project: str, stage: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT * FROM stage_state WHERE project = ? AND stage = ?", (project, stage)).fetchone()
+        if row is None:
+            return None
+        state = dict(row)
+        state["artifact"] = json.loads(state["artifact"])
+        return state
+
+    def put_state(self, project: str, stage: str, input_hash: str | None, commit_sha: str | None, artifact: dict):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stage_state(project, stage, input_hash, commit_sha, artifact, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (project, stage, input_hash, commit_sha, json.dumps(artifact, default=str), time.time())
+            )
+
+    def project_state(self, project: str) -> list[dict]:
+        rows = self._connect().execute(
+            "SELECT stage, input_hash, commit_sha, artifact, updated FROM stage_state WHERE project = ?", (project,))
+        return [{**dict(r), "artifact": json.loads(r["artifact"])} for r in rows]
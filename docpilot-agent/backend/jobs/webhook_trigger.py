@@ -0,0 +1,74 @@
+import os
+
+from backend.agents.cloner.mirror_cache import normalize_url
+from backend.db.data import user_repo_db
+from backend.db.repo_queries import get_repo_by_url
+from .pipeline import PipelineBusy, start_pipeline
+from .worker import PermanentJobError, debounce, register
+
+# Pushes to the same repo/branch within this many seconds of the first one collapse into one run
+WEBHOOK_DEBOUNCE = float(os.getenv("WEBHOOK_DEBOUNCE", "30"))
+
+
+def _debounce_key(urls: list[str], branch: str) -> str:
+    return f"webhook:{normalize_url(urls[0])}:{branch}"
+
+
+def schedule_push(urls: list[str], branch: str, commit: str, replace: bool = True,
+                  projects: list[str] | None = None) -> tuple[dict, bool]:
+    """
+    Queue a pipeline run for the projects tracking `branch` of the repo
+    (`urls`: the spellings the push event gives, e.g. clone_url and
+    html_url), WEBHOOK_DEBOUNCE seconds from the first push of a burst.
+    Later pushes only move the pending run to their commit.
+    `projects` limits the run to those project names (default: all of them).
+    Returns (job, created).
+    """
+    payload = {"urls": urls, "branch": branch, "commit": commit}
+    if projects is not None:
+        payload["projects"] = projects
+    return debounce("webhook_push", payload, WEBHOOK_DEBOUNCE, _debounce_key(urls, branch), replace=replace)
+
+
+def find_projects(urls: list[str], branch: str) -> list[dict]:
+    """Imported projects of this repo and branch: the in-memory checkouts first, else the repos table."""
+    wanted = {normalize_url(u) for u in urls}
+    found = {}
+    for name, entry in list(user_repo_db.items()):
+        if normalize_url(entry["repo_url"]) in wanted and entry["branch"] == branch:
+            found[name] = {"ProjName": name, "projUrl": entry["repo_url"], "AuthToken": entry.get("auth_token")}
+    if not found:
+        for url in urls:
+            for row in get_repo_by_url(url).data:
+                if row["branch"] == branch:
+                    found[row["proj_name"]] = {"ProjName": row["proj_name"], "projUrl": row["repo_url"],
+                                               "AuthToken": row.get("auth_token")}
+    return list(found.values())
+
+
+@register("webhook_push")
+def webhook_push_job(ctx, payload: dict):
+    urls, branch, commit = payload["urls"], payload["branch"], payload["commit"]
+    projects = find_projects(urls, branch)
+    if payload.get("projects") is not None:
+        projects = [p for p in projects if p["ProjName"] in payload["projects"]]
+    if not projects:
+        raise PermanentJobError(f"No imported project tracks {urls[0]} ({branch})")
+
+    runs = []
+    deferred = []
+    for project in projects:
+        try:
+            run, created = start_pipeline({**project, "BranchName": branch, "Commit": commit})
+        except PipelineBusy as e:
+            # still busy with an older push: come back for this commit once that run is done
+            # (a newer push that is already queued wins)
+            run, created = e.run, False
+            deferred.append(project["ProjName"])
+        runs.append({"project": project["ProjName"], "run_id": run["id"], "created": created})
+        print(f"[Webhook] {project['ProjName']} @ {commit[:12]}: {'queued run ' + run['id'] if created else 'run already active'}")
+
+    if deferred:
+        # only the busy projects: the others already have a run for this commit
+        schedule_push(urls, branch, commit, replace=False, projects=deferred)
+    return {"commit": commit, "branch": branch, "runs": runs, "deferred": deferred}
@@ -0,0 +1,212 @@
+import os
+import socket
+import threading
+import traceback
+import uuid
+
+from .job_store import CANCELLED, FAILED, SUCCEEDED, JobStore
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "5.0"))
+JOB_RETRY_BACKOFF_MAX = float(os.getenv("JOB_RETRY_BACKOFF_MAX", "300"))
+# Pools refresh their heartbeat this often; running jobs of a pool silent for JOB_WORKER_TIMEOUT are recovered
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+JOB_WORKER_TIMEOUT = float(os.getenv("JOB_WORKER_TIMEOUT", "60"))
+
+HANDLERS = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad input, missing project...)."""
+
+
+def register(kind: str):
+    """Decorator: `@register("parse")` makes `fn(ctx, payload) -> result` the handler of that kind."""
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+class JobContext:
+    """What a handler sees of its job: payload, attempt number, progress reporting and cancellation."""
+
+    def __init__(self, store: JobStore, job: dict):
+        self.store = store
+        self.job = job
+        self.id = job["id"]
+        self.attempt = job["attempts"]
+
+    def progress(self, fraction: float | None = None, message: str | None = None):
+        """Record progress (0..1) and stop the job here if a cancel was requested."""
+        if self.store.update_progress(self.id, fraction, message):
+            raise JobCancelled()
+
+    def check_cancelled(self):
+        self.progress()
+
+
+def retry_delay(attempt: int) -> float:
+    return min(JOB_RETRY_BACKOFF * (2 ** (attempt - 1)), JOB_RETRY_BACKOFF_MAX)
+
+
+class WorkerPool:
+    """
+    Background threads that claim jobs from the JobStore and run their
+    handler. A failing job is put back in the queue with exponential
+    backoff until it has used `max_attempts`; JobCancelled and
+    PermanentJobError end it right away.
+
+    Cancellation of a running job is cooperative: handlers call
+    ctx.progress()/ctx.check_cancelled() between steps.
+
+    Each pool has an owner id (host, pid and a random suffix) that prefixes
+    its worker names and is kept alive by a heartbeat thread, which also
+    recovers the running jobs of pools whose heartbeat stopped.
+    """
+
+    def __init__(self, store: JobStore, workers: int | None = None, poll_interval: float | None = None):
+        self.store = store
+        self.workers = max(1, workers or JOB_WORKERS)
+        self.poll_interval = JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._recover()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+        print(f"[Jobs] Started {self.workers} workers ({self.owner})")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Wake idle workers (called after enqueue so new jobs don't wait for the next poll)."""
+        self._wake.set()
+
+    def _recover(self):
+        self.store.heartbeat(self.owner)
+        requeued, failed = self.store.requeue_orphaned(self.owner, JOB_WORKER_TIMEOUT)
+        if requeued or failed:
+            print(f"[Jobs] Recovered jobs of stopped workers: {requeued} requeued, {failed} out of attempts")
+            self._wake.set()
+
+    def _heartbeat(self):
+        while not self._stop.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                self._recover()
+            except Exception as e:
+                print(f"[Jobs] Heartbeat failed: {e}")
+
+    def _run(self):
+        worker = f"{self.owner}/{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(worker)
+            except Exception as e:
+                print(f"[Jobs] Claim failed: {e}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._execute(job)
+
+    def _execute(self, job: dict):
+        job_id, kind = job["id"], job["kind"]
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            self.store.finish(job_id, FAILED, error=f"No handler registered for job kind '{kind}'")
+            return
+
+        print(f"[Jobs] {kind} {job_id} started (attempt {job['attempts']}/{job['max_attempts']})")
+        ctx = JobContext(self.store, job)
+        try:
+            ctx.check_cancelled()
+            result = handler(ctx, job["payload"])
+        except JobCancelled:
+            self.store.finish(job_id, CANCELLED, error="cancelled")
+            print(f"[Jobs] {kind} {job_id} cancelled")
+        except PermanentJobError as e:
+            self.store.finish(job_id, FAILED, error=str(e))
+            print(f"[Jobs] {kind} {job_id} failed: {e}")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job["attempts"] < job["max_attempts"]:
+                delay = retry_delay(job["attempts"])
+                self.store.retry_later(job_id, delay, error)
+                print(f"[Jobs] {kind} {job_id} failed ({error}), retry in {delay}s")
+            else:
+                self.store.finish(job_id, FAILED, error=error)
+                print(f"[Jobs] {kind} {job_id} failed after {job['attempts']} attempts: {error}")
+                traceback.print_exc()
+        else:
+            self.store.finish(job_id, SUCCEEDED, result=result)
+            print(f"[Jobs] {kind} {job_id} succeeded")
+
+
+# ------------------ Shared instances ------------------
+_store = None
+_pool = None
+_store_lock = threading.Lock()
+_pool_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobStore()
+    return _store
+
+
+def get_worker_pool() -> WorkerPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(get_job_store())
+    return _pool
+
+
+def enqueue(kind: str, payload: dict, max_attempts: int | None = None, delay: float = 0.0,
+            dedupe_key: str | None = None) -> dict:
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    job = get_job_store().enqueue(kind, payload, max_attempts or JOB_MAX_ATTEMPTS, delay, dedupe_key)
+    if _pool is not None:
+        _pool.notify()
+    return job
+
+
+def debounce(kind: str, payload: dict, delay: float, dedupe_key: str, max_attempts: int | None = None,
+             replace: bool = True) -> tuple[dict, bool]:
+    """enqueue() that folds into a still-queued job with the same key (see JobStore.debounce)."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    job, created = get_job_store().debounce(kind, payload, delay, dedupe_key, max_attempts or JOB_MAX_ATTEMPTS, replace)
+    if created and _pool is not None:
+        _pool.notify()
+    return job, created
@@ -11,8 +11,31 @@ from backend.auth.router import router as authentication_router
 from backend.repositories.router import router as repositories_router
 from fastapi import Depends
 from backend.core.auth_dependency import get_current_user
+from backend.db.kg_schema import KG_SCHEMA_BOOTSTRAP, ensure_schema
+from backend.db.neo4j_connect import driver as neo4j_driver
+from backend.jobs.worker import get_worker_pool
 app=FastAPI()
 
+##KG SCHEMA (constraints + indexes, idempotent)
+@app.on_event("startup")
+def bootstrap_kg_schema():
+    if not KG_SCHEMA_BOOTSTRAP:
+        return
+    try:
+        report = ensure_schema(neo4j_driver)
+        print(f"[KGSchema] {len(report['created'])} created, {len(report['existing'])} already present, {len(report['failed'])} failed")
+    except Exception as e:
+        print(f"[KGSchema] Bootstrap skipped: {e}")
+
+##BACKGROUND JOBS (clone / parse / cypher / docgen run off the request thread)
+@app.on_event("startup")
+def start_job_workers():
+    get_worker_pool().start()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    get_worker_pool().stop()
+
 ##CLONING AGENT
 app.include_router(clone_agent_app.router,prefix="/api")
 ##CODE WATCHER
@@ -0,0 +1,210 @@
+import os
+import subprocess
+import threading
+from typing import NamedTuple
+
+
+class TreeEntry(NamedTuple):
+    path: str       # repo_path joined with rel_path (the same path a checkout would have)
+    rel_path: str   # relative to the repository root, "/"-separated
+    sha: str        # blob id, usable as a ParseCache key without reading the blob
+    size: int | None  # None while a partial clone has not downloaded the blob
+
+
+def resolve_commit(repo_path: str, commit: str = "HEAD") -> str:
+    out = subprocess.run(["git", "-C", repo_path, "rev-parse", "--verify", f"{commit}^{{commit}}"],
+                         capture_output=True, check=True).stdout
+    return out.decode().strip()
+
+
+def in_sparse_cone(rel_path: str, sparse_paths: list[str]) -> bool:
+    """Whether a cone-mode sparse checkout of `sparse_paths` contains `rel_path`."""
+    parent = os.path.dirname(rel_path)
+    if not parent:
+        return True  # files at the root are always checked out
+    for d in sparse_paths:
+        d = d.strip("/")
+        # inside the directory, or directly in one of its parents
+        if rel_path.startswith(d + "/") or (d + "/").startswith(parent + "/"):
+            return True
+    return False
+
+
+def list_tree(repo_path: str, commit: str, sparse_paths: list[str] | None = None) -> list[TreeEntry]:
+    """
+    Regular files of `commit`, sorted by path, straight from the object
+    database. Submodules (commit entries) and symlinks are left out; with
+    `sparse_paths`, so is everything a cone-mode sparse checkout of those
+    directories would not contain.
+    Sizes are not listed: `ls-tree -l` would lazily fetch every missing blob
+    of a partial clone, one at a time (see GitCommitSource.prefetch).
+    """
+    repo_path = os.path.abspath(repo_path)
+    out = subprocess.run(["git", "-C", repo_path, "ls-tree", "-r", "-z", "--full-tree", commit],
+                         capture_output=True, check=True).stdout
+    entries = []
+    for record in out.split(b"\0"):
+        if not record:
+            continue
+        meta, rel = record.split(b"\t", 1)
+        mode, kind, sha = meta.split()
+        if kind != b"blob" or mode == b"120000":
+            continue
+        rel_path = rel.decode("utf-8", errors="surrogateescape")
+        if sparse_paths and not in_sparse_cone(rel_path, sparse_paths):
+            continue
+        entries.append(TreeEntry(os.path.join(repo_path, rel_path), rel_path, sha.decode(), None))
+    entries.sort(key=lambda e: e.path)
+    return entries
+
+
+def promisor_remote(repo_path: str) -> str | None:
+    """The remote missing objects of a partial clone are fetched from (None for a complete repo)."""
+    out = subprocess.run(["git", "-C", repo_path, "config", "--get-regexp", r"^remote\..*\.promisor$"],
+                         capture_output=True).stdout.decode()
+    for line in out.splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().lower() in ("true", "yes", "on", "1"):
+            return key[len("remote."):-len(".promisor")]
+    return None
+
+
+def missing_objects(repo_path: str, commit: str) -> set[str]:
+    """Ids of the objects of `commit`'s tree that a partial clone has not downloaded yet."""
+    out = subprocess.run(["git", "-C", repo_path, "rev-list", "--objects", "--no-walk", "--missing=print", commit],
+                         capture_output=True, check=True).stdout.decode()
+    return {line[1:].strip() for line in out.splitlines() if line.startswith("?")}
+
+
+def object_sizes(repo_path: str, shas: list[str]) -> dict[str, int]:
+    """Sizes of objects that are present locally, in one `cat-file --batch-check` (never pass missing ones)."""
+    if not shas:
+        return {}
+    out = subprocess.run(["git", "-C", repo_path, "cat-file", "--batch-check=%(objectname) %(objectsize)"],
+                         input="\n".join(shas).encode(), capture_output=True, check=True).stdout.decode()
+    sizes = {}
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1].isdigit():
+            sizes[parts[0]] = int(parts[1])
+    return sizes
+
+
+class BlobReader:
+    """
+    One long-lived `git cat-file --batch` process: blobs are requested by id
+    over stdin and streamed back, so reading a thousand files costs one
+    process instead of a thousand (and nothing is written to disk). Missing
+    blobs of a partial clone are fetched by git on demand, one fetch per
+    blob, so GitCommitSource.prefetch them in bulk first.
+    Safe to share between threads.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._proc = subprocess.Popen(["git", "-C", self.repo_path, "cat-file", "--batch"],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def read(self, sha: str) -> bytes:
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            try:
+                self._proc.stdin.write(sha.encode() + b"\n")
+                self._proc.stdin.flush()
+                header = self._proc.stdout.readline().split()
+                if len(header) != 3:
+                    raise KeyError(f"blob {sha} not found in {self.repo_path}")
+                size = int(header[2])
+                data = self._proc.stdout.read(size)
+                self._proc.stdout.read(1)  # trailing newline
+            except (BrokenPipeError, ValueError):
+                self._close()
+                raise
+            return data
+
+    def _close(self):
+        if self._proc is not None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except Exception:
+                self._proc.kill()
+            self._proc = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+class GitCommitSource:
+    """
+    The files of one commit, read from the git object database instead of a
+    working tree: no checkout needed, and nothing else touching the checkout
+    (a pull, a reset) can change what is being parsed.
+    Use as a context manager so the cat-file process is closed.
+
+    In a partial clone, blobs that are not downloaded yet have no size
+    until prefetch() brings them in with a single fetch.
+    """
+
+    def __init__(self, repo_path: str, commit: str = "HEAD", sparse_paths: list[str] | None = None):
+        self.repo_path = os.path.abspath(repo_path)
+        self.commit = resolve_commit(self.repo_path, commit)
+        self.entries = {e.path: e for e in list_tree(self.repo_path, self.commit, sparse_paths)}
+        self.remote = promisor_remote(self.repo_path)
+        self.missing = missing_objects(self.repo_path, self.commit) if self.remote else set()
+        self.reader = BlobReader(self.repo_path)
+        self._load_sizes()
+
+    def _load_sizes(self):
+        pending = [e for e in self.entries.values() if e.size is None and e.sha not in self.missing]
+        sizes = object_sizes(self.repo_path, sorted({e.sha for e in pending}))
+        for e in pending:
+            self.entries[e.path] = e._replace(size=sizes.get(e.sha))
+
+    def files(self) -> list[str]:
+        return list(self.entries)
+
+    def blob(self, path: str) -> tuple[str, int | None]:
+        entry = self.entries[path]
+        return entry.sha, entry.size
+
+    def read(self, path: str) -> bytes:
+        return self.reader.read(self.entries[path].sha)
+
+    def prefetch(self, paths: list[str]) -> int:
+        """
+        Download the blobs of `paths` a partial clone is missing in a single
+        fetch (instead of one lazy fetch per blob on read). Returns how many
+        were fetched; failures are left to the lazy fetch.
+        """
+        wanted = {self.entries[p].sha for p in paths} & self.missing
+        if not wanted:
+            return 0
+        try:
+            subprocess.run(
+                ["git", "-C", self.repo_path, "-c", "fetch.negotiationAlgorithm=noop", "fetch", self.remote,
+                 "--no-tags", "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none", "--stdin"],
+                input="\n".join(sorted(wanted)).encode(), capture_output=True, check=True,
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"[GitSource] Batch fetch of missing blobs failed, reading them lazily: {e.stderr.decode(errors='replace').strip()}")
+            return 0
+        self.missing -= wanted
+        self._load_sizes()
+        return len(wanted)
+
+    def close(self):
+        self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,151 @@
+import os
+import re
+
+
+def _translate(pattern: str) -> str:
+    """Translate a single gitignore glob (already stripped of `!` and the trailing `/`) to a regex body."""
+    i = 0
+    out = []
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 2] == "**":
+                # "**/" -> zero or more directories, trailing "**" -> everything below
+                if pattern[i:i + 3] == "**/":
+                    out.append("(?:.*/)?")
+                    i += 3
+                else:
+                    out.append(".*")
+                    i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    Compiled matcher for .gitignore-style pattern files.
+
+    Rules are evaluated in the order they were added and the last matching
+    rule wins, so `!pattern` can re-include something an earlier rule ignored.
+    Patterns loaded from a nested .gitignore are scoped to that directory via
+    `base` (a path relative to the repository root, using "/" separators).
+    Paths passed to the match functions are relative to the repository root.
+    """
+
+    def __init__(self):
+        self.rules = []  # (regex, negate, dir_only)
+        self._combined = None  # (file regex, dir regex) when no rule negates, else False
+
+    def add_patterns(self, lines, base: str = ""):
+        base = base.strip("/")
+        prefix = re.escape(base + "/") if base else ""
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip("\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            # a slash anywhere but the end anchors the pattern to the .gitignore's directory
+            anchored = "/" in line
+            body = _translate(line.lstrip("/"))
+            if anchored:
+                regex = f"^{prefix}{body}$"
+            else:
+                regex = f"^{prefix}(?:.*/)?{body}$"
+            self.rules.append((re.compile(regex), negate, dir_only))
+        self._combined = None
+
+    def add_file(self, path: str, base: str = "") -> bool:
+        if not os.path.isfile(path):
+            return False
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            self.add_patterns(f.readlines(), base)
+        return True
+
+    def extended(self, path: str, base: str = "") -> "IgnoreRules":
+        """
+        New rule set = these rules + the patterns in `path` (a nested .gitignore
+        scoped to `base`). The parent set is left untouched, so sibling
+        directories do not see each other's rules.
+        """
+        child = IgnoreRules()
+        child.rules = list(self.rules)
+        child._combined = self._combined
+        child.add_file(path, base)
+        return child
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """True if this exact path is ignored (parents are not considered)."""
+        if self._combined is None:
+            self._combined = self._combine()
+        if self._combined:
+            file_re, dir_re = self._combined
+            regex = dir_re if is_dir else file_re
+            return bool(regex and regex.match(rel_path))
+
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+    def _combine(self):
+        # Without negations the order of rules does not matter, so every rule can be
+        # folded into one alternation and a path is checked with a single regex call.
+        if not self.rules or any(negate for _, negate, _ in self.rules):
+            return False
+        file_rules = [r.pattern for r, _, dir_only in self.rules if not dir_only]
+        dir_rules = [r.pattern for r, _, _ in self.rules]
+        file_re = re.compile("|".join(f"(?:{p})" for p in file_rules)) if file_rules else None
+        return file_re, re.compile("|".join(f"(?:{p})" for p in dir_rules))
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """True if the path or any of its parent directories is ignored."""
+        rel_path = rel_path.replace(os.sep, "/").strip("/")
+        parts = rel_path.split("/")
+        for i in range(1, len(parts)):
+            if self.match("/".join(parts[:i]), is_dir=True):
+                return True
+        return self.match(rel_path, is_dir)
+
+    @classmethod
+    def for_repo(cls, repo_path: str) -> "IgnoreRules":
+        """Rules from the repository's root .gitignore and .git/info/exclude."""
+        rules = cls()
+        rules.add_file(os.path.join(repo_path, ".git", "info", "exclude"))
+        rules.add_file(os.path.join(repo_path, ".gitignore"))
+        return rules
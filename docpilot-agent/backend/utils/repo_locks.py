@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Give up (and report the repository as busy) after waiting this long for a lock
+REPO_LOCK_TIMEOUT = float(os.getenv("REPO_LOCK_TIMEOUT", "600"))
+
+
+class RepoBusy(TimeoutError):
+    pass
+
+
+class RWLock:
+    """
+    Shared/exclusive lock. Any number of readers (parsing a checkout) can
+    hold it together; a writer (clone, pull, checkout, rmtree) holds it
+    alone. Waiting writers block new readers, so a steady stream of parse
+    requests cannot starve a pull.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    def _wait(self, ready, timeout: float | None) -> float:
+        # timeout=None: REPO_LOCK_TIMEOUT, 0: only take the lock if it is free right now
+        timeout = REPO_LOCK_TIMEOUT if timeout is None else timeout
+        started = time.perf_counter()
+        if not self._cond.wait_for(ready, timeout):
+            raise RepoBusy(f"lock not acquired within {timeout:g}s")
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    @contextmanager
+    def read(self, timeout: float | None = None):
+        """`with lock.read() as wait_ms:` -- wait_ms is how long the caller was blocked."""
+        with self._cond:
+            wait_ms = self._wait(lambda: not self.writer and not self.waiting_writers, timeout)
+            self.readers += 1
+        try:
+            yield wait_ms
+        finally:
+            with self._cond:
+                self.readers -= 1
+                if not self.readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self, timeout: float | None = None):
+        with self._cond:
+            self.waiting_writers += 1
+            try:
+                wait_ms = self._wait(lambda: not self.writer and not self.readers, timeout)
+            finally:
+                self.waiting_writers -= 1
+                # readers held back by this writer (e.g. one that timed out) can go ahead now
+                self._cond.notify_all()
+            self.writer = True
+        try:
+            yield wait_ms
+        finally:
+            with self._cond:
+                self.writer = False
+                self._cond.notify_all()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RepoLocks:
+    """
+    In-process coordination of everything that touches a repository on
+    disk, keyed by name (project name for checkouts, "mirror:<url>" for
+    shared mirrors).
+
+    single_flight(key, fn) runs fn once for all concurrent callers with the
+    same key: followers wait for the leader and get its result (or its
+    exception) instead of repeating the git work.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._flights = {}
+        self._guard = threading.Lock()
+
+    def lock(self, name: str) -> RWLock:
+        with self._guard:
+            return self._locks.setdefault(name, RWLock())
+
+    def read(self, name: str, timeout: float | None = None):
+        return self.lock(name).read(timeout)
+
+    def write(self, name: str, timeout: float | None = None):
+        return self.lock(name).write(timeout)
+
+    def single_flight(self, key, fn):
+        """Returns (result, coalesced); coalesced is True for callers that shared another call's result."""
+        with self._guard:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._guard:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self) -> dict:
+        with self._guard:
+            locks = list(self._locks.items())
+            in_flight = len(self._flights)
+        return {
+            "in_flight": in_flight,
+            "locks": [
+                {"name": name, "readers": lock.readers, "writer": lock.writer, "waiting_writers": lock.waiting_writers}
+                for name, lock in sorted(locks) if lock.readers or lock.writer or lock.waiting_writers
+            ],
+        }
+
+
+_repo_locks = None
+_repo_locks_lock = threading.Lock()
+
+
+def get_repo_locks() -> RepoLocks:
+    global _repo_locks
+    if _repo_locks is None:
+        with _repo_locks_lock:
+            if _repo_locks is None:
+                _repo_locks = RepoLocks()
+    return _repo_locks
@@ -0,0 +1,118 @@
+import os
+import subprocess
+from typing import NamedTuple
+
+from backend.utils.ignore_rules import IgnoreRules
+
+
+class WalkEntry(NamedTuple):
+    path: str       # absolute path
+    rel_path: str   # relative to the repository root, "/"-separated
+    name: str
+    is_dir: bool
+
+
+def git_common_dir(repo_path: str) -> str:
+    """The repository's .git directory; for a worktree (.git is a file) the one it shares with its main repo."""
+    git = os.path.join(repo_path, ".git")
+    if not os.path.isfile(git):
+        return git
+    try:
+        with open(git, encoding="utf-8") as f:
+            gitdir = os.path.join(repo_path, f.read().strip().removeprefix("gitdir:").strip())
+        with open(os.path.join(gitdir, "commondir"), encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(gitdir, f.read().strip()))
+    except OSError:
+        return git
+
+
+class RepoWalker:
+    """
+    Repository walker built on os.scandir.
+
+    Honours the root and nested .gitignore files plus .git/info/exclude;
+    ignored directories (and anything in `skip_dirs`) are pruned without
+    being opened. `.git` is never listed, whether it is a directory or a
+    worktree's gitdir file. Entries come back sorted by name, so walks are
+    deterministic. `list_dir` serves callers that render the tree level by
+    level, `walk_files` serves callers that only need the files.
+    """
+
+    def __init__(self, repo_path: str, skip_dirs: set[str] | None = None, respect_gitignore: bool = True):
+        self.repo_path = os.path.abspath(repo_path)
+        self.skip_dirs = skip_dirs if skip_dirs is not None else {".git"}
+        self.respect_gitignore = respect_gitignore
+        self.root_rules = IgnoreRules()
+        if respect_gitignore:
+            self.root_rules.add_file(os.path.join(git_common_dir(self.repo_path), "info", "exclude"))
+        self.pruned_dirs = 0
+
+    def _rel(self, rel_dir: str, name: str) -> str:
+        return f"{rel_dir}/{name}" if rel_dir else name
+
+    def _scan(self, abs_dir: str, rel_dir: str, rules: IgnoreRules):
+        """Returns (kept entries, rules in effect for this directory's children)."""
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return [], rules
+
+        if self.respect_gitignore:
+            for e in entries:
+                if e.name == ".gitignore" and e.is_file():
+                    rules = rules.extended(e.path, rel_dir)
+                    break
+
+        kept = []
+        for e in entries:
+            is_dir = e.is_dir(follow_symlinks=False)
+            rel_path = self._rel(rel_dir, e.name)
+            # a worktree's .git is a file pointing at its gitdir, not a directory
+            if e.name == ".git" or (is_dir and e.name in self.skip_dirs):
+                if is_dir:
+                    self.pruned_dirs += 1
+                continue
+            if self.respect_gitignore and rules.match(rel_path, is_dir):
+                if is_dir:
+                    self.pruned_dirs += 1
+                continue
+            kept.append(WalkEntry(e.path, rel_path, e.name, is_dir))
+        return kept, rules
+
+    def list_dir(self, rel_dir: str = "", rules: IgnoreRules | None = None) -> tuple[list[WalkEntry], IgnoreRules]:
+        """
+        Visible entries of one directory. Pass the returned rules back in when
+        listing a child directory so nested .gitignore files keep applying.
+        """
+        abs_dir = os.path.join(self.repo_path, rel_dir) if rel_dir else self.repo_path
+        return self._scan(abs_dir, rel_dir.strip("/"), rules or self.root_rules)
+
+    def walk_files(self):
+        """Yield a WalkEntry for every visible file, depth-first in sorted order."""
+        stack = [("", self.root_rules)]
+        while stack:
+            rel_dir, rules = stack.pop()
+            entries, child_rules = self.list_dir(rel_dir, rules)
+            dirs = []
+            for e in entries:
+                if e.is_dir:
+                    dirs.append((e.rel_path, child_rules))
+                else:
+                    yield e
+            # reversed so the alphabetically first directory is popped first
+            stack.extend(reversed(dirs))
+
+
+def list_git_index(repo_path: str, include_untracked: bool = False) -> list[str]:
+    """
+    Files known to git, relative to the repository root, without touching the
+    working tree. With `include_untracked`, untracked files that are not
+    ignored are listed too (same view as `git status`); that walks and stats
+    the whole working tree, so it is off by default.
+    """
+    cmd = ["git", "-C", repo_path, "ls-files", "-z", "--cached"]
+    if include_untracked:
+        cmd += ["--others", "--exclude-standard"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return sorted(set(p for p in out.decode("utf-8", errors="surrogateescape").split("\0") if p))
@@ -0,0 +1,146 @@
+"""
+Benchmark: single-pass JavaParser vs. the previous multi-pass regex parser.
+
+Generates a synthetic Spring code base (controllers with many annotated
+handler methods, nested DTO classes, services) and times both parsers over
+it. The baseline implementation is loaded from git, by default from the
+commit right before the single-pass scanner was introduced.
+
+Run from the docpilot-agent directory:
+
+    python -m benchmarks.java_parser_bench --files 200 --methods 60
+"""
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend.agents.parser.java_parser import JavaParser
+
+PARSER_PATH = "backend/agents/parser/java_parser.py"
+AGENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _git(*args) -> str:
+    return subprocess.run(["git", *args], cwd=AGENT_DIR, capture_output=True, check=True, text=True).stdout
+
+
+def default_baseline_rev() -> str:
+    introduced = _git("log", "--reverse", "--format=%H", "-S", "TOKEN_RE", "--", PARSER_PATH).split()
+    return f"{introduced[0]}~1" if introduced else "HEAD"
+
+
+def load_baseline(rev: str):
+    source = _git("show", f"{rev}:./{PARSER_PATH}")
+    name = "backend.agents.parser._baseline_java_parser"
+    spec = importlib.util.spec_from_loader(name, loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "backend.agents.parser"
+    sys.modules[name] = module
+    exec(compile(source, f"{rev}:{PARSER_PATH}", "exec"), module.__dict__)
+    return module.JavaParser()
+
+
+def controller_source(idx: int, methods: int, nested: int) -> str:
+    lines = [
+        f"package com.example.app.module{idx % 20}.web;",
+        "",
+        "import java.util.List;",
+        "import java.util.Map;",
+        "import org.springframework.web.bind.annotation.*;",
+        "",
+        "/** Generated controller. */",
+        "@RestController",
+        f'@RequestMapping("/api/resource{idx}")',
+        f"public class Resource{idx}Controller extends BaseController implements Auditable {{",
+        f"    private final Resource{idx}Service service;",
+        "    private static final String BASE_URL = \"http://example.com/api\"; // not a comment",
+        "",
+        f"    public Resource{idx}Controller(Resource{idx}Service service) {{",
+        "        this.service = service;",
+        "    }",
+    ]
+    verbs = ["GetMapping", "PostMapping", "PutMapping", "DeleteMapping"]
+    for m in range(methods):
+        verb = verbs[m % len(verbs)]
+        lines += [
+            "",
+            f"    /** Handler {m}. */",
+            f'    @{verb}("/item{m}/{{id}}")',
+            f"    public ResponseEntity<Map<String, Object>> handle{m}(@PathVariable(\"id\") Long id, @RequestBody Payload{m % 7} body) throws NotFoundException {{",
+            "        Map<String, Object> out = new HashMap<>();",
+            "        if (id != null && body != null) {",
+            f"            out.put(\"value\", service.compute{m}(id, body));",
+            "        }",
+            "        return ResponseEntity.ok(out);",
+            "    }",
+        ]
+    for c in range(nested):
+        lines += [
+            "",
+            f"    public static class Dto{c} {{",
+            "        private String name;",
+            "        private int count;",
+            f"        public String getName{c}() {{ return name; }}",
+            "    }",
+        ]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_codebase(root: str, files: int, methods: int, nested: int) -> list[str]:
+    paths = []
+    for i in range(files):
+        path = os.path.join(root, f"Resource{i}Controller.java")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(controller_source(i, methods, nested))
+        paths.append(path)
+    return paths
+
+
+def time_parser(parser, paths: list[str], rounds: int) -> tuple[float, list[dict]]:
+    best = float("inf")
+    results = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        results = [parser.parse_file(p) for p in paths]
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--files", type=int, default=200)
+    ap.add_argument("--methods", type=int, default=60, help="handler methods per controller")
+    ap.add_argument("--nested", type=int, default=15, help="nested classes per controller")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--baseline-rev", default=None, help="git revision holding the parser to compare against")
+    args = ap.parse_args()
+
+    rev = args.baseline_rev or default_baseline_rev()
+    baseline = load_baseline(rev)
+    scanner = JavaParser()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = generate_codebase(root, args.files, args.methods, args.nested)
+        total_lines = sum(sum(1 for _ in open(p, encoding="utf-8")) for p in paths)
+
+        old_time, old_results = time_parser(baseline, paths, args.rounds)
+        new_time, new_results = time_parser(scanner, paths, args.rounds)
+
+    missing = set(old_results[0]) - set(new_results[0])
+    old_apis = sum(len(r["apis"]) for r in old_results)
+    new_apis = sum(len(r["apis"]) for r in new_results)
+
+    print(f"files={args.files} lines={total_lines} baseline={rev}")
+    print(f"baseline (multi-pass regex): {old_time * 1000:9.1f} ms  {total_lines / old_time:12,.0f} lines/s  apis={old_apis}")
+    print(f"single-pass scanner:         {new_time * 1000:9.1f} ms  {total_lines / new_time:12,.0f} lines/s  apis={new_apis}")
+    print(f"speedup: {old_time / new_time:.2f}x")
+    print("schema: " + ("same top-level keys" if not missing else f"MISSING {sorted(missing)}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "llm"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Skip lookups everywhere (fresh answers are still written back)
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Trailing whitespace, CRLF line endings and leading/trailing blank lines do
+    not change the key. Indentation does: it is part of the prompt the model sees.
+    """
+    lines = prompt.replace("\r\n", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of model responses for deterministic prompts.
+
+    Keyed by model + sha256 of the normalized prompt (+ any extra request
+    parameters). Entries expire after `ttl_seconds` and the store is bounded
+    to `max_bytes` with least-recently-used eviction. Hit/miss counters are
+    kept per process and exposed through `stats()`.
+    """
+
+    def __init__(self, cache_dir: str | None = None, max_bytes: int | None = None, ttl_seconds: int | None = None):
+        self.cache_dir = cache_dir or LLM_CACHE_DIR
+        self.max_bytes = max_bytes or LLM_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else LLM_CACHE_TTL_SECONDS
+        self.path = os.path.join(self.cache_dir, "responses.sqlite3")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, **params) -> str:
+        h = hashlib.sha256()
+        h.update(model.encode())
+        h.update(b"\0")
+        h.update(normalize_prompt(prompt).encode("utf-8", errors="surrogatepass"))
+        if params:
+            h.update(b"\0")
+            h.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    # ------------------ Reads / writes ------------------
+    def get(self, key: str) -> str | None:
+        conn = self._connect()
+        row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            return None
+        if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+            with self._lock, conn:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+        with self._lock, conn:
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, model: str, value: str):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses(key, model, value, size, created, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, len(value), now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= target:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    # ------------------ Call-through helpers ------------------
+    def lookup(self, model: str, prompt: str, bypass: bool = False, **params):
+        """
+        (key, cached text or None), counted as a hit/miss/bypass. For callers
+        that cannot use get_or_call (e.g. streamed responses): put(key, ...)
+        the full text once it is complete.
+        """
+        key = self.make_key(model, prompt, **params)
+        if bypass or LLM_CACHE_BYPASS:
+            with self._lock:
+                self.bypassed += 1
+            return key, None
+        value = self.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return key, value
+
+    def get_or_call(self, model: str, prompt: str, call, bypass: bool = False, validate=None, **params) -> str:
+        """
+        Return the cached response for (model, prompt, params) or run `call()`
+        and store its text. `validate(text)` can veto storing a bad answer
+        (e.g. unparseable JSON) so it is retried next time.
+        """
+        key, value = self.lookup(model, prompt, bypass, **params)
+        if value is not None:
+            return value
+        value = call()
+        if value is not None and (validate is None or validate(value)):
+            self.put(key, model, value)
+        return value
+
+    async def aget_or_call(self, model: str, prompt: str, call, bypass: bool = False, validate=None, **params) -> str:
+        """Async variant of get_or_call; `call` is a coroutine function."""
+        key, value = self.lookup(model, prompt, bypass, **params)
+        if value is not None:
+            return value
+        value = await call()
+        if value is not None and (validate is None or validate(value)):
+            self.put(key, model, value)
+        return value
+
+    # ------------------ Admin ------------------
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Process-wide shared cache, created on first use."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache()
+        return _response_cache